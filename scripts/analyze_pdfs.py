@@ -1,179 +1,348 @@
 """
-Analyze the structure of two Korean exam PDF files for parser development.
+Analyze the structure of Korean exam PDF files for parser development.
+
+Each page is read once (text + image xref metadata) into a page cache, and every
+detector runs over that cache. Pages are scanned in parallel across PDFs/page
+ranges, and the cache is kept on disk keyed by the PDF's content hash.
+
+Usage: python scripts/analyze_pdfs.py [PDF ...] [--json report.json] [--workers N]
+                                      [--no-cache] [--quiet]
+       (without PDFs, the day 1/day 2 PDFs in data/ are analyzed)
 """
 
-import fitz
+import argparse
+import hashlib
+import json
 import os
-import sys
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz
 
 sys.stdout.reconfigure(encoding="utf-8")
 
-DATA_DIR = r"c:\Users\water\WaterPLE_C\Claude\PseudoANKI\data"
-DAY1_PDF = os.path.join(DATA_DIR, "2025_21\ud559\ubc88_\ucd1d\uad04\ud3c9\uac00 1\uc77c\ucc28.pdf")
-DAY2_PDF = os.path.join(DATA_DIR, "2025_21\ud559\ubc88_\ucd1d\uad04\ud3c9\uac00 2\uc77c\ucc28.pdf")
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BASE_DIR / "data"
+DAY1_PDF = DATA_DIR / "2025_21학번_총괄평가 1일차.pdf"
+DAY2_PDF = DATA_DIR / "2025_21학번_총괄평가 2일차.pdf"
+CACHE_DIR = BASE_DIR / ".cache" / "analyze_pdfs"
+CACHE_VERSION = 1
 
 SEP = "=" * 80
 THIN = "-" * 60
+PAGES_PER_TASK = 16
+IMAGE_ROWS = 10
+
+# Detectors (all run on the cached page text)
+OX_QUESTION = re.compile(r"\b12[0-4]\b\s*\.")
+EMERGENCY = ("응급", "중환자")
+CIRCLED = "①②③④⑤"
+ANSWER_MARK = "답"
+QUESTION_LINE = re.compile(r"(\d{1,3})\.(?:\s|$)")
+
+# PDF stream filter -> image format, read from the xref dictionary instead of decoding
+FILTER_EXT = {
+    "DCTDecode": "jpeg",
+    "JPXDecode": "jpx",
+    "JBIG2Decode": "jb2",
+    "CCITTFaxDecode": "fax",
+    "FlateDecode": "flate",
+    "LZWDecode": "lzw",
+    "RunLengthDecode": "rle",
+}
 
 
 def header(title):
     print(f"\n{SEP}\n  {title}\n{SEP}")
 
 
-def page_text(doc, pn, label=""):
-    if pn < 0 or pn >= len(doc):
-        print(f"  [Page {pn} out of range]")
-        return
-    text = doc[pn].get_text()
-    lbl = label or f"Page {pn+1}"
-    print(f"\n{THIN}\n  {lbl}\n{THIN}")
-    print(text)
+# --- Page cache ---------------------------------------------------------------
 
+def xref_value(doc, xref, key):
+    """Dictionary value of an xref key, following one indirect reference."""
+    kind, value = doc.xref_get_key(xref, key)
+    if kind == "xref":
+        value = doc.xref_object(int(value.split()[0])).strip()
+    return kind, value
 
-def list_images(doc, n=10):
-    print(f"\n  First {n} images:")
-    print(f"  {'xref':>6} | {'Page':>5} | {'W':>6} | {'H':>6} | {'bpc':>4} | {'cs':>12} | {'KB':>9} | {'ext':>4}")
-    print(f"  {'-'*6}-+-{'-'*5}-+-{'-'*6}-+-{'-'*6}-+-{'-'*4}-+-{'-'*12}-+-{'-'*9}-+-{'-'*4}")
-    count = 0
-    for pn in range(len(doc)):
-        if count >= n:
-            break
-        for img in doc[pn].get_images(full=True):
-            if count >= n:
-                break
-            xref, _, w, h, bpc, cs = img[0], img[1], img[2], img[3], img[4], img[5]
-            try:
-                d = doc.extract_image(xref)
-                kb = len(d["image"]) / 1024
-                ext = d["ext"]
-            except:
-                kb, ext = 0, "?"
-            print(f"  {xref:>6} | {pn+1:>5} | {w:>6} | {h:>6} | {bpc:>4} | {cs:>12} | {kb:>8.1f} | {ext}")
-            count += 1
-    tot = sum(len(doc[p].get_images(full=True)) for p in range(len(doc)))
-    pwi = sum(1 for p in range(len(doc)) if doc[p].get_images(full=True))
-    print(f"\n  Total images: {tot}, Pages with images: {pwi}")
-
-
-def analyze_day1():
-    header("DAY 1 ANALYSIS")
-    doc = fitz.open(DAY1_PDF)
-    tp = len(doc)
-    print(f"\n  Total pages: {tp}")
-
-    header("DAY 1 - First 5 pages")
-    for i in range(min(5, tp)):
-        page_text(doc, i, f"Day1 p{i+1}/{tp}")
-
-    header("DAY 1 - O/X questions (Q120-124)")
-    ox_pages = [i for i in range(tp) if re.search(r'\b12[0-4]\b\s*\.', doc[i].get_text())]
-    if ox_pages:
-        print(f"  Pages with Q120-124: {[p+1 for p in ox_pages]}")
-        for p in ox_pages:
-            page_text(doc, p, f"Day1 p{p+1} (O/X)")
+
+def image_meta(doc, xref):
+    """Stored size and format of an image xref, from its dictionary only."""
+    _, length = xref_value(doc, xref, "Length")
+    _, filters = xref_value(doc, xref, "Filter")
+    names = re.findall(r"/(\w+)", filters or "")
+    ext = FILTER_EXT.get(names[-1], names[-1].lower()) if names else "raw"
+    return {"bytes": int(length) if length.isdigit() else None, "filter": names, "ext": ext}
+
+
+def scan_pages(path, start, stop):
+    """Read pages [start, stop) once: text and image metadata per page."""
+    doc = fitz.open(str(path))
+    try:
+        pages = []
+        for pn in range(start, stop):
+            page = doc[pn]
+            images = []
+            for img in page.get_images(full=True):
+                xref, _, w, h, bpc, cs = img[:6]
+                images.append({"xref": xref, "w": w, "h": h, "bpc": bpc, "cs": cs, **image_meta(doc, xref)})
+            pages.append({"text": page.get_text(), "images": images})
+        return pages
+    finally:
+        doc.close()
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(cache_dir, digest):
+    return cache_dir / f"v{CACHE_VERSION}-{fitz.VersionBind}-{digest[:32]}.json"
+
+
+def load_page_caches(paths, pool, cache_dir):
+    """Page cache for every PDF: {path: [page, ...]}.
+    PDFs unchanged since the last run are loaded from cache_dir; the rest are
+    split into page ranges and scanned by the pool (or serially without one).
+    Repeated paths are scanned once."""
+    caches = {}
+    tasks = []
+    digests = {}
+    for path in dict.fromkeys(paths):
+        if cache_dir is not None:
+            digests[path] = file_sha256(path)
+            cached = cache_path(cache_dir, digests[path])
+            if cached.exists():
+                caches[path] = json.loads(cached.read_text(encoding="utf-8"))
+                continue
+        doc = fitz.open(str(path))
+        n = len(doc)
+        doc.close()
+        caches[path] = []
+        tasks += [(path, lo, min(lo + PAGES_PER_TASK, n)) for lo in range(0, n, PAGES_PER_TASK)]
+
+    if pool is None:
+        results = [scan_pages(*task) for task in tasks]
     else:
-        print("  Not found by regex. Last 10 pages:")
-        for i in range(max(0, tp-10), tp):
-            page_text(doc, i, f"Day1 p{i+1}/{tp}")
+        results = pool.map(scan_pages, *zip(*tasks)) if tasks else []
+    scanned = set()
+    for (path, _, _), pages in zip(tasks, results):
+        caches[path] += pages  # tasks are in page order per PDF
+        scanned.add(path)
+
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in scanned:
+            target = cache_path(cache_dir, digests[path])
+            tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(caches[path], ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, target)
+    return caches
 
-    header("DAY 1 - Last 3 pages")
-    for i in range(max(0, tp-3), tp):
-        page_text(doc, i, f"Day1 p{i+1}/{tp} (end)")
 
-    header("DAY 1 - Images")
-    list_images(doc, 10)
+# --- Detectors ----------------------------------------------------------------
 
-    header("DAY 1 - Answer format samples")
-    ans = []
-    for i in range(tp):
-        for line in doc[i].get_text().split("\n"):
+def answer_lines(pages):
+    """Lines starting with 답 (short), and answer-like lines (답 + a digit or circled number)."""
+    starts, like = [], []
+    for pn, page in enumerate(pages):
+        for line in page["text"].split("\n"):
             s = line.strip()
-            if s.startswith("\ub2f5") and len(s) < 50:
-                ans.append((i+1, s))
-    print(f"  Found {len(ans)} answer lines. First 30:")
-    for pg, ln in ans[:30]:
-        print(f"    p{pg:>3}: '{ln}'")
+            if s.startswith(ANSWER_MARK) and len(s) < 50:
+                starts.append({"page": pn + 1, "text": s})
+            if ANSWER_MARK in s and any(c.isdigit() or c in CIRCLED for c in s) and len(s) < 80:
+                like.append({"page": pn + 1, "text": s})
+    return starts, like
+
 
-    doc.close()
+def answer_formats(lines):
+    """Group answer lines by shape (digits -> N, circled numbers -> C)."""
+    formats = {}
+    for item in lines:
+        fp = re.sub(r"\d+", "N", item["text"])
+        fp = re.sub(f"[{CIRCLED}]", "C", fp)
+        if fp not in formats:
+            formats[fp] = {"pattern": fp, "example": item["text"], "page": item["page"], "count": 0}
+        formats[fp]["count"] += 1
+    return list(formats.values())
 
 
-def analyze_day2():
-    header("DAY 2 ANALYSIS")
-    doc = fitz.open(DAY2_PDF)
-    tp = len(doc)
-    print(f"\n  Total pages: {tp}")
+def question_numbers(pages):
+    """Line-initial "N." numbers per page, kept monotonic like extract_questions.split_questions."""
+    found = []
+    last = 0
+    for pn, page in enumerate(pages):
+        for line in page["text"].split("\n"):
+            m = QUESTION_LINE.match(line.strip())
+            if m and int(m.group(1)) > last:
+                last = int(m.group(1))
+                found.append({"page": pn + 1, "number": last})
+    return found
 
-    header("DAY 2 - First 5 pages")
+
+def image_stats(pages):
+    items = [{"page": pn + 1, **img} for pn, page in enumerate(pages) for img in page["images"]]
+    by_ext = {}
+    for img in items:
+        stat = by_ext.setdefault(img["ext"], {"count": 0, "bytes": 0})
+        stat["count"] += 1
+        stat["bytes"] += img["bytes"] or 0
+    unique = {img["xref"]: img["bytes"] or 0 for img in items}
+    return {
+        "count": len(items),
+        "unique": len(unique),
+        "pagesWithImages": sum(1 for page in pages if page["images"]),
+        "bytes": sum(unique.values()),
+        "byFormat": by_ext,
+        "items": items,
+    }
+
+
+def analyze(path, pages):
+    """Structured layout report for one PDF, from its page cache only."""
+    starts, like = answer_lines(pages)
+    return {
+        "path": str(path),
+        "name": path.name,
+        "bytes": path.stat().st_size,
+        "pages": len(pages),
+        "pageStats": [
+            {"page": pn + 1, "chars": len(p["text"]), "lines": p["text"].count("\n"), "images": len(p["images"])}
+            for pn, p in enumerate(pages)
+        ],
+        "questions": question_numbers(pages),
+        "oxPages": [pn + 1 for pn, p in enumerate(pages) if OX_QUESTION.search(p["text"])],
+        "emergencyPages": [pn + 1 for pn, p in enumerate(pages) if any(k in p["text"] for k in EMERGENCY)],
+        "circledPages": [pn + 1 for pn, p in enumerate(pages) if CIRCLED[0] in p["text"]],
+        "answerLines": starts,
+        "answerLikeLines": like,
+        "answerFormats": answer_formats(like),
+        "images": image_stats(pages),
+    }
+
+
+# --- Text report ----------------------------------------------------------------
+
+def page_text(pages, pn, label=""):
+    if pn < 0 or pn >= len(pages):
+        print(f"  [Page {pn} out of range]")
+        return
+    lbl = label or f"Page {pn+1}"
+    print(f"\n{THIN}\n  {lbl}\n{THIN}")
+    print(pages[pn]["text"])
+
+
+def list_images(stats, n=IMAGE_ROWS):
+    print(f"\n  First {n} images:")
+    print(f"  {'xref':>6} | {'Page':>5} | {'W':>6} | {'H':>6} | {'bpc':>4} | {'cs':>12} | {'KB':>9} | {'ext':>5}")
+    print(f"  {'-'*6}-+-{'-'*5}-+-{'-'*6}-+-{'-'*6}-+-{'-'*4}-+-{'-'*12}-+-{'-'*9}-+-{'-'*5}")
+    for img in stats["items"][:n]:
+        kb = (img["bytes"] or 0) / 1024
+        print(
+            f"  {img['xref']:>6} | {img['page']:>5} | {img['w']:>6} | {img['h']:>6} | {img['bpc']:>4} | "
+            f"{img['cs']:>12} | {kb:>8.1f} | {img['ext']:>5}"
+        )
+    print(f"\n  Total images: {stats['count']} ({stats['unique']} unique, {stats['bytes'] / 1024:.1f} KB stored), "
+          f"Pages with images: {stats['pagesWithImages']}")
+    for ext, stat in sorted(stats["byFormat"].items()):
+        print(f"    {ext:>6}: {stat['count']} images, {stat['bytes'] / 1024:.1f} KB")
+
+
+def print_report(report, pages):
+    name = report["name"]
+    tp = report["pages"]
+    header(f"{name} ANALYSIS")
+    print(f"\n  Total pages: {tp}, questions found: {len(report['questions'])}")
+
+    header(f"{name} - First 5 pages")
     for i in range(min(5, tp)):
-        page_text(doc, i, f"Day2 p{i+1}/{tp}")
+        page_text(pages, i, f"p{i+1}/{tp}")
 
-    header("DAY 2 - 응급중환자 section")
-    em_pages = [i for i in range(tp) if "\uc751\uae09" in doc[i].get_text() or "\uc911\ud658\uc790" in doc[i].get_text()]
-    if em_pages:
-        print(f"  Pages with 응급/중환자: {[p+1 for p in em_pages]}")
-        s = em_pages[0]
+    header(f"{name} - O/X questions (Q120-124)")
+    if report["oxPages"]:
+        print(f"  Pages with Q120-124: {report['oxPages']}")
+        for p in report["oxPages"]:
+            page_text(pages, p - 1, f"p{p} (O/X)")
+    else:
+        print("  Not found")
+
+    header(f"{name} - 응급중환자 section")
+    if report["emergencyPages"]:
+        print(f"  Pages with 응급/중환자: {report['emergencyPages']}")
+        s = report["emergencyPages"][0] - 1
         for p in range(max(0, s-1), min(tp, s+4)):
-            page_text(doc, p, f"Day2 p{p+1} (around 응급중환자)")
+            page_text(pages, p, f"p{p+1} (around 응급중환자)")
     else:
         print("  Not found")
 
-    header("DAY 2 - Last 3 pages")
+    header(f"{name} - Last 3 pages")
     for i in range(max(0, tp-3), tp):
-        page_text(doc, i, f"Day2 p{i+1}/{tp} (end)")
-
-    header("DAY 2 - Images")
-    list_images(doc, 10)
-
-    header("DAY 2 - Circled number format (\u2460\u2461\u2462\u2463\u2464)")
-    cp = []
-    first_shown = False
-    for i in range(tp):
-        text = doc[i].get_text()
-        if "\u2460" in text:
-            cp.append(i+1)
-            if not first_shown:
-                page_text(doc, i, f"Day2 p{i+1} (first \u2460)")
-                first_shown = True
-    if cp:
-        print(f"\n  All pages with \u2460: {cp}")
+        page_text(pages, i, f"p{i+1}/{tp} (end)")
+
+    header(f"{name} - Images")
+    list_images(report["images"])
+
+    header(f"{name} - Circled number format ({CIRCLED})")
+    if report["circledPages"]:
+        page_text(pages, report["circledPages"][0] - 1, f"p{report['circledPages'][0]} (first {CIRCLED[0]})")
+        print(f"\n  All pages with {CIRCLED[0]}: {report['circledPages']}")
     else:
         print("  No circled numbers found")
 
-    header("DAY 2 - Answer format variations")
-    ans = []
-    for i in range(tp):
-        for line in doc[i].get_text().split("\n"):
-            s = line.strip()
-            if "\ub2f5" in s and any(c.isdigit() or c in "\u2460\u2461\u2462\u2463\u2464" for c in s) and len(s) < 80:
-                ans.append((i+1, s))
-    print(f"  Found {len(ans)} answer-like lines.")
-    seen = set()
+    header(f"{name} - Answer format variations")
+    print(f"  Found {len(report['answerLines'])} answer lines, {len(report['answerLikeLines'])} answer-like lines.")
     print("\n  Unique format patterns:")
-    for pg, ln in ans:
-        fp = re.sub(r"\d+", "N", ln)
-        fp = re.sub(r"[\u2460-\u2464]", "C", fp)
-        if fp not in seen:
-            seen.add(fp)
-            print(f"    p{pg:>3}: '{ln}'")
-    print(f"\n  All {len(ans)} raw answer lines:")
-    for pg, ln in ans:
-        print(f"    p{pg:>3}: '{ln}'")
-
-    doc.close()
+    for fmt in report["answerFormats"]:
+        print(f"    p{fmt['page']:>3}: '{fmt['example']}'  (x{fmt['count']})")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Exam PDF layout analysis")
+    parser.add_argument("pdfs", nargs="*", type=Path, help="PDF paths (default: day 1/day 2 PDFs in data/)")
+    parser.add_argument("--json", type=Path, help="write the structured layout report to this file")
+    parser.add_argument("--workers", type=int, default=0, help="scan processes (default 0 = CPU count, 1 = serial)")
+    parser.add_argument("--no-cache", action="store_true", help=f"rescan every page instead of using {CACHE_DIR}")
+    parser.add_argument("--quiet", action="store_true", help="skip the page-by-page text report")
+    args = parser.parse_args()
+
+    # the same PDF given twice (or via another relative path) is scanned and reported once
+    paths = list(dict.fromkeys(path.resolve() for path in args.pdfs)) or [DAY1_PDF, DAY2_PDF]
     print("PDF Structure Analysis for PseudoANKI")
     print(f"PyMuPDF: {fitz.__version__}")
-    for path in [DAY1_PDF, DAY2_PDF]:
-        if not os.path.exists(path):
+    for path in paths:
+        if not path.exists():
             print(f"ERROR: {path} not found")
             sys.exit(1)
-        mb = os.path.getsize(path) / (1024*1024)
-        print(f"  {os.path.basename(path)}: {mb:.1f} MB")
-    analyze_day1()
-    analyze_day2()
+        print(f"  {path.name}: {path.stat().st_size / (1024*1024):.1f} MB")
+
+    workers = args.workers or os.cpu_count() or 1
+    cache_dir = None if args.no_cache else CACHE_DIR
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            caches = load_page_caches(paths, pool, cache_dir)
+    else:
+        caches = load_page_caches(paths, None, cache_dir)
+
+    reports = []
+    for path in paths:
+        report = analyze(path, caches[path])
+        reports.append(report)
+        if not args.quiet:
+            print_report(report, caches[path])
+        else:
+            print(f"  {path.name}: {report['pages']} pages, {len(report['questions'])} questions, "
+                  f"{report['images']['count']} images")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({"pdfs": reports}, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nReport written: {args.json}")
     print(f"\n{SEP}\n  Analysis complete.\n{SEP}")
 
 
@@ -0,0 +1,287 @@
+"""
+추출 파이프라인 벤치마크
+PyMuPDF로 합성 시험 PDF를 만들고 extract_questions.py의 단계별 처리 시간을 측정.
+data/의 비공개 PDF 없이도 커밋 간 회귀 확인과 규모별 곡선 작성이 가능.
+
+사용법: python scripts/bench_extract.py [--questions N] [--pages N] [--scale 1,2,4]
+                                       [--choices number|circled|mixed]
+                                       [--answer "답:"] [--explanation 해설|풀이]
+                                       [--image-every N] [--image-sizes 300x200,1600x900]
+                                       [--repeat N] [--out results.jsonl] [--keep DIR]
+                                       [--no-release | --compare-release]
+        (결과는 실행마다 한 줄씩 JSON Lines로 추가 기록)
+"""
+
+import argparse
+import io
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import PIL
+from PIL import Image
+
+import extract_questions
+from extract_questions import (
+    BASE_DIR,
+    assign_images_to_questions,
+    build_image_positions,
+    build_question_positions,
+    collect_line_anchors,
+    extract_text_with_page_markers,
+    lex_question,
+    peak_rss,
+    save_optimized_image,
+    split_questions,
+)
+
+DEFAULT_OUT = BASE_DIR / ".cache" / "bench" / "extract.jsonl"
+CHOICE_STYLES = ("number", "circled", "mixed")
+CIRCLED = "①②③④⑤"
+
+# 페이지 레이아웃 (pt, A4)
+PAGE_TOP = 50
+PAGE_BOTTOM = 780
+LINE_HEIGHT = 13
+IMAGE_HEIGHT = 100
+
+
+# ─── 합성 PDF 생성 ───────────────────────────────────────────────
+
+def image_bytes(rng: random.Random, w: int, h: int) -> bytes:
+    """단색 배경 + 잡음 띠가 있는 JPEG (같은 크기라도 매번 다른 xref가 되도록)."""
+    img = Image.new("RGB", (w, h), (rng.randrange(256), rng.randrange(256), 40))
+    band = Image.effect_noise((w, max(1, h // 8)), 64).convert("RGB")
+    img.paste(band, (0, h // 2))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def generate_exam_pdf(
+    path: Path,
+    questions: int = 124,
+    pages: int | None = None,
+    choices: str = "mixed",
+    answer: str = "답:",
+    explanation: str = "해설",
+    image_every: int = 7,
+    image_sizes: list[tuple[int, int]] | None = None,
+    seed: int = 1,
+) -> dict:
+    """실제 문제집과 같은 형식의 합성 PDF 생성.
+    pages가 주어지면 문제를 페이지에 고르게 나눔 (넘치면 다음 페이지로 이어짐).
+    해설마다 "1. ..." 목록을 넣어 단조 증가 필터도 함께 측정.
+    Returns: {"pages", "questions", "images"}"""
+    rng = random.Random(seed)
+    image_sizes = image_sizes or [(300, 200), (1200, 800), (2400, 1600)]
+    per_page = math.ceil(questions / pages) if pages else None
+    doc = fitz.open()
+    page = doc.new_page()
+    y = PAGE_TOP
+    n_images = 0
+
+    def line(text: str) -> None:
+        nonlocal page, y
+        if y > PAGE_BOTTOM:
+            page = doc.new_page()
+            y = PAGE_TOP
+        page.insert_text((50, y), text, fontname="korea", fontsize=9)
+        y += LINE_HEIGHT
+
+    for q in range(1, questions + 1):
+        if per_page and q > 1 and (q - 1) % per_page == 0:
+            page = doc.new_page()
+            y = PAGE_TOP
+        line(f"{q}. 다음 환자에서 가장 적절한 처치는? (합성 문제 {q}번)")
+        line("  추가 설명 줄 - 검사 수치 12. 와 같은 중간 숫자 포함")
+        if image_every and q % image_every == 0:
+            if y > PAGE_BOTTOM - IMAGE_HEIGHT:
+                page = doc.new_page()
+                y = PAGE_TOP
+            w, h = rng.choice(image_sizes)
+            page.insert_image(fitz.Rect(50, y, 250, y + IMAGE_HEIGHT), stream=image_bytes(rng, w, h))
+            y += IMAGE_HEIGHT + 10
+            n_images += 1
+        style = choices if choices != "mixed" else rng.choice(CHOICE_STYLES[:2])
+        for i in range(1, 6):
+            mark = f"{i})" if style == "number" else CIRCLED[i - 1]
+            line(f"{mark} 선지 {i} 내용")
+        line(f"{answer} {rng.randint(1, 5)}")
+        line(f"{explanation}: 합성 해설입니다.")
+        line("1. 첫 번째 요점")
+        line("2. 두 번째 요점")
+
+    doc.save(str(path), garbage=3, deflate=True)
+    result = {"pages": len(doc), "questions": questions, "images": n_images}
+    doc.close()
+    return result
+
+
+# ─── 단계별 측정 ─────────────────────────────────────────────────
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def run_stages(pdf_path: Path, expected_max: int, img_dir: Path) -> dict[str, float]:
+    """extract_questions.py의 각 단계를 한 번씩 실행하고 소요 시간(초) 반환."""
+    stages: dict[str, float] = {}
+    doc = fitz.open(str(pdf_path))
+    full_text, stages["extract_text"] = timed(extract_text_with_page_markers, doc)
+    raw, stages["split_questions"] = timed(split_questions, full_text, expected_max)
+    q_numbers = [n for n, _ in raw]
+    anchors, stages["line_anchors"] = timed(collect_line_anchors, doc, 0, None)
+    positions, stages["build_question_positions"] = timed(build_question_positions, anchors, q_numbers)
+    img_positions, stages["image_positions"] = timed(build_image_positions, doc)
+    image_map, stages["assign_images_to_questions"] = timed(
+        assign_images_to_questions, positions, img_positions, q_numbers
+    )
+    _, stages["parse"] = timed(lambda: [lex_question(text) for _, text in raw])
+
+    def save_all():
+        for q_num, images in image_map.items():
+            for idx, (xref, _, _) in enumerate(images, 1):
+                save_optimized_image(doc, xref, img_dir / f"q{q_num:03d}_{idx}.jpg")
+
+    _, stages["save_optimized_image"] = timed(save_all)
+    doc.close()
+    return stages
+
+
+def best_stages(pdf_path: Path, expected_max: int, img_dir: Path, repeat: int) -> dict[str, float]:
+    """repeat회 측정해 단계마다 최솟값."""
+    best: dict[str, float] = {}
+    for _ in range(repeat):
+        for name, sec in run_stages(pdf_path, expected_max, img_dir).items():
+            best[name] = min(best.get(name, float("inf")), sec)
+    best["total"] = sum(best.values())
+    return best
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def parse_sizes(value: str) -> list[tuple[int, int]]:
+    sizes = []
+    for item in value.split(","):
+        w, _, h = item.strip().partition("x")
+        sizes.append((int(w), int(h)))
+    return sizes
+
+
+def compare_release(argv: list[str], out: Path) -> None:
+    """MuPDF 캐시 해제(release_page_cache) 유무를 각각 새 프로세스에서 측정해 최대 RSS 비교.
+    최대 RSS는 프로세스 단위라 한 프로세스 안에서는 두 경우를 나눠 잴 수 없음."""
+    argv = [arg for arg in argv if arg != "--compare-release"]
+    peaks = {}
+    for label, extra in (("해제", []), ("해제 안 함", ["--no-release"])):
+        subprocess.run([sys.executable, __file__, *argv, *extra], check=True)
+        with open(out, encoding="utf-8") as f:
+            peaks[label] = json.loads(f.readlines()[-1])["peakRss"]
+    print("\n최대 RSS (MuPDF 캐시):")
+    for label, peak in peaks.items():
+        print(f"  {label:<10} {'-' if peak is None else f'{peak / 2**20:.1f} MB'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 PDF로 추출 단계별 시간 측정")
+    parser.add_argument("--questions", type=int, default=124, help="기준 문제 수 (기본 124)")
+    parser.add_argument("--pages", type=int, help="기준 페이지 수 (기본: 내용에 맞춰 자동)")
+    parser.add_argument("--scale", default="1", help="문제/페이지 수 배율 목록 (예: 1,2,4,8)")
+    parser.add_argument("--choices", choices=CHOICE_STYLES, default="mixed", help="선지 형식")
+    parser.add_argument("--answer", default="답:", help='답 표기 (예: "답:", "정답:", "정답;")')
+    parser.add_argument("--explanation", choices=("해설", "풀이"), default="해설", help="해설 표기")
+    parser.add_argument("--image-every", type=int, default=7, help="N문제마다 이미지 1개 (0 = 없음)")
+    parser.add_argument("--image-sizes", type=parse_sizes, help="이미지 원본 크기 목록 (예: 300x200,2400x1600)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="반복 측정 횟수 (단계별 최솟값 사용)")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"결과 JSON Lines (기본 {DEFAULT_OUT})")
+    parser.add_argument("--keep", type=Path, help="생성한 PDF/이미지를 이 폴더에 남김")
+    release = parser.add_mutually_exclusive_group()
+    release.add_argument("--no-release", action="store_true", help="MuPDF 캐시를 비우지 않고 측정")
+    release.add_argument(
+        "--compare-release", action="store_true",
+        help="캐시 해제 유무를 각각 별도 프로세스로 측정해 최대 RSS 비교",
+    )
+    args = parser.parse_args()
+    if args.compare_release:
+        compare_release(sys.argv[1:], args.out)
+        return
+    if args.no_release:
+        extract_questions.RELEASE_PAGE_CACHE = False
+
+    scales = [int(s) for s in args.scale.split(",")]
+    settings = {
+        "choices": args.choices,
+        "answer": args.answer,
+        "explanation": args.explanation,
+        "imageEvery": args.image_every,
+        "imageSizes": args.image_sizes,
+        "seed": args.seed,
+        "releasePageCache": not args.no_release,
+    }
+    cases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work = args.keep or Path(tmp)
+        for scale in scales:
+            case_dir = work / f"x{scale}"
+            img_dir = case_dir / "images"
+            img_dir.mkdir(parents=True, exist_ok=True)
+            pdf_path = case_dir / "exam.pdf"
+            n_questions = args.questions * scale
+            info = generate_exam_pdf(
+                pdf_path,
+                questions=n_questions,
+                pages=args.pages * scale if args.pages else None,
+                choices=args.choices,
+                answer=args.answer,
+                explanation=args.explanation,
+                image_every=args.image_every,
+                image_sizes=args.image_sizes,
+                seed=args.seed,
+            )
+            stages = best_stages(pdf_path, n_questions, img_dir, args.repeat)
+            cases.append({"scale": scale, **info, "bytes": pdf_path.stat().st_size, "stages": stages})
+
+            print(f"\nx{scale}: {info['pages']}페이지, {info['questions']}문제, {info['images']}이미지")
+            for name, sec in stages.items():
+                print(f"  {name:<28} {sec * 1000:9.2f} ms")
+
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL.__version__,
+        "repeat": args.repeat,
+        "settings": settings,
+        "cases": cases,
+        "peakRss": peak_rss(),  # 실행 전체 (배율 목록 중 가장 큰 경우가 결정)
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if record["peakRss"] is not None:
+        print(f"\n최대 RSS: {record['peakRss'] / 2**20:.1f} MB")
+    print(f"\n결과 기록: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+문제 렉서 벤치마크
+lex_question과 기존 파싱 함수(get_question_text/parse_choices/parse_answer/
+parse_explanation)의 결과가 같은지 확인하고 처리 시간을 비교.
+
+사용법: python scripts/bench_parse.py [PDF ...] [--scale N] [--repeat N]
+        (PDF를 주지 않으면 data/의 1일차/2일차 PDF 사용)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from extract_questions import (
+    DAY1_PDF,
+    DAY2_PDF,
+    extract_text_with_page_markers,
+    get_question_text,
+    lex_question,
+    parse_answer,
+    parse_choices,
+    parse_explanation,
+    split_questions,
+)
+
+
+def legacy_parse(raw: str) -> tuple[str, list[str], int | None, str]:
+    return get_question_text(raw), parse_choices(raw), parse_answer(raw), parse_explanation(raw)
+
+
+def load_raw_questions(pdf_paths: list[Path]) -> list[tuple[str, int, str]]:
+    """PDF마다 문제를 분할. Returns: [(PDF 이름, 문제 번호, 원문), ...]"""
+    raw: list[tuple[str, int, str]] = []
+    for path in pdf_paths:
+        doc = fitz.open(str(path))
+        full_text = extract_text_with_page_markers(doc)
+        doc.close()
+        for num, text in split_questions(full_text, 999):
+            raw.append((path.name, num, text))
+    return raw
+
+
+def best_time(fn, texts: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lex_question vs 기존 파싱 함수")
+    parser.add_argument("pdfs", nargs="*", type=Path, help="PDF 경로 (기본: 1일차/2일차)")
+    parser.add_argument("--scale", type=int, default=1, help="문제 목록을 N배로 늘려 측정 (선형성 확인)")
+    parser.add_argument("--repeat", type=int, default=5, help="반복 측정 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    pdf_paths = args.pdfs or [DAY1_PDF, DAY2_PDF]
+    raw = load_raw_questions(pdf_paths)
+    print(f"문제 수: {len(raw)} ({', '.join(p.name for p in pdf_paths)})")
+
+    mismatches = 0
+    for name, num, text in raw:
+        expected = legacy_parse(text)
+        actual = lex_question(text)
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  불일치: {name} Q{num}")
+                for label, a, b in zip(("본문", "선지", "답", "해설"), expected, actual):
+                    if a != b:
+                        print(f"    {label}: 기존={a!r}")
+                        print(f"    {label}: 렉서={b!r}")
+    print(f"결과 일치: {len(raw) - mismatches}/{len(raw)}")
+
+    texts = [text for _, _, text in raw] * args.scale
+    legacy = best_time(legacy_parse, texts, args.repeat)
+    lexer = best_time(lex_question, texts, args.repeat)
+    print(f"\n{len(texts)}문제 x 최소 {args.repeat}회 측정")
+    print(f"  기존 함수 4개: {legacy * 1000:8.1f} ms ({legacy / len(texts) * 1e6:.1f} us/문제)")
+    print(f"  lex_question : {lexer * 1000:8.1f} ms ({lexer / len(texts) * 1e6:.1f} us/문제)")
+    print(f"  속도 향상: {legacy / lexer:.2f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
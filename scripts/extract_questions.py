@@ -2,25 +2,94 @@
 PseudoANKI PDF 추출 스크립트
 PDF 문제집에서 텍스트/이미지를 추출하여 questions.json + 이미지 파일 생성.
 
-사용법: python scripts/extract_questions.py
+사용법: python scripts/extract_questions.py [--workers N | --stream] [--no-cache] [--shards]
+                                           [--compact] [--dict-encode] [--variants] [--search-index]
+                                           [--near-duplicates] [--vector-figures] [--image-bundles]
+                                           [--hashed-assets | --delta] [--progress-stats stats.json]
+                                           [--watch [--watch-interval SEC]]
+                                           [--config exams.json] [--jsonl out.jsonl]
+                                           [--profile [--profile-top N] [--cprofile]]
+
+라이브러리로 쓸 때는 extract()/export() (아래 "라이브러리 API" 절 참고).
 """
 
-import fitz  # PyMuPDF
+from __future__ import annotations  # 주석의 fitz/Image 타입이 import 시 평가되지 않도록
+
+import argparse
+import bisect
+import contextlib
+import cProfile
+import filecmp
+import functools
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import inspect
 import json
+import math
+import os
 import re
+import shutil
 import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from PIL import Image, ImageOps
+from typing import Iterable, Iterator, Protocol
+import base64
 import io
 
-# Windows cp949 인코딩 문제 방지
-sys.stdout.reconfigure(encoding="utf-8")
+from search_index import build_index as build_search_index
+
+
+class LazyModule:
+    """처음 속성에 접근할 때 import하는 모듈 대리 객체.
+    PyMuPDF/Pillow/numpy는 import만 수백 ms라, 라이브러리로 import하거나
+    PDF를 열지 않는 작업에서는 불러오지 않는다."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+fitz = LazyModule("fitz")  # PyMuPDF
+PIL = LazyModule("PIL")
+Image = LazyModule("PIL.Image")
+ImageOps = LazyModule("PIL.ImageOps")
+features = LazyModule("PIL.features")
+
+try:
+    import brotli  # 선택 의존성: --compact에서 .br 생성
+except ImportError:
+    brotli = None
+
+# 선택 의존성: --near-duplicates (numpy 필요)
+near_duplicates = LazyModule("near_duplicates") if importlib.util.find_spec("numpy") else None
+
+try:
+    import resource  # --profile의 최대 RSS (Windows에는 없음)
+except ImportError:
+    resource = None
 
 # ─── 경로 설정 ───────────────────────────────────────────────────
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 OUT_DIR = BASE_DIR / "public" / "data"
 IMG_DIR = OUT_DIR / "images"
+SHARD_DIR = OUT_DIR / "shards"
+BUNDLE_DIR = OUT_DIR / "bundles"
+ASSET_DIR = OUT_DIR / "assets"
+PATCH_DIR = OUT_DIR / "patches"
+CACHE_DIR = BASE_DIR / ".cache" / "extract_questions"
 
 DAY1_PDF = DATA_DIR / "2025_21학번_총괄평가 1일차.pdf"
 DAY2_PDF = DATA_DIR / "2025_21학번_총괄평가 2일차.pdf"
@@ -53,48 +122,187 @@ MAX_IMG_WIDTH = 800
 JPEG_QUALITY = 85
 
 
-def get_subject(original_num: int, day: str) -> str:
-    subjects = SUBJECTS_DAY1 if day == "day1" else SUBJECTS_DAY2
-    for subj in subjects:
-        lo, hi = subj["range"]
-        if lo <= original_num <= hi:
-            return subj["id"]
+# ─── 시험 설정 ───────────────────────────────────────────────────
+# 기본은 위의 두 PDF/과목 표. --config로 여러 시험/일차를 JSON으로 지정할 수 있다
+# (형식은 scripts/exams.example.json 참고, pdf 경로는 설정 파일 기준 상대 경로).
+# idOffset/imagePrefix를 생략하면 앞 일차에 이어서 배정하므로, 새 시험을 뒤에
+# 추가하는 한 기존 문제의 ID와 이미지 이름은 바뀌지 않는다.
+
+SAFE_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def build_subject_index(subjects: list[dict]) -> tuple[list[int], list[tuple[int, int, str]]]:
+    """과목 범위를 시작 번호 순으로 정렬한 구간 색인. 범위가 겹치면 ValueError."""
+    entries = sorted((s["range"][0], s["range"][1], s["id"]) for s in subjects)
+    for (lo1, hi1, id1), (lo2, hi2, id2) in zip(entries, entries[1:]):
+        if lo2 <= hi1:
+            raise ValueError(f"과목 범위 겹침: {id1} {lo1}-{hi1}, {id2} {lo2}-{hi2}")
+    return [lo for lo, _, _ in entries], entries
+
+
+def lookup_subject(index: tuple[list[int], list[tuple[int, int, str]]], original_num: int) -> str:
+    """구간 색인에서 이분 탐색으로 과목 id 조회."""
+    starts, entries = index
+    i = bisect.bisect_right(starts, original_num) - 1
+    if i >= 0 and original_num <= entries[i][1]:
+        return entries[i][2]
     return "unknown"
 
 
-def extract_text_with_page_markers(doc: fitz.Document) -> str:
-    """전체 텍스트를 합치되, 페이지 경계에 마커를 삽입."""
+def make_day(
+    day_id: str,
+    name: str,
+    pdf: Path,
+    expected_count: int,
+    id_offset: int,
+    image_prefix: str,
+    subjects: list[dict],
+    ox_ranges: list[tuple[int, int]],
+    exam: str | None = None,
+) -> dict:
+    """일차 하나의 처리 설정 (process_pdf 입력)."""
+    for value in (day_id, image_prefix):
+        if not SAFE_ID.fullmatch(value):
+            raise ValueError(f"id/imagePrefix에는 영문/숫자/_/-만 사용: {value!r}")
+    subjects = [{"id": s["id"], "name": s["name"], "range": tuple(s["range"])} for s in subjects]
+    return {
+        "exam": exam,
+        "id": day_id,
+        "name": name,
+        "pdf": Path(pdf),
+        "expectedCount": expected_count,
+        "idOffset": id_offset,
+        "imagePrefix": image_prefix,
+        "subjects": subjects,
+        "oxRanges": [tuple(r) for r in ox_ranges],
+        "subjectIndex": build_subject_index(subjects),
+    }
+
+
+def default_days() -> list[dict]:
+    return [
+        make_day("day1", "1일차", DAY1_PDF, 124, 0, "d1", SUBJECTS_DAY1, [(120, 124)]),
+        make_day("day2", "2일차", DAY2_PDF, 89, 124, "d2", SUBJECTS_DAY2, []),
+    ]
+
+
+def load_corpus(config_path: Path | None) -> list[dict]:
+    """시험 설정 JSON을 일차 목록으로 펼침. config_path가 없으면 기본 두 PDF.
+    일차 id/이미지 접두사 중복, ID 구간 겹침은 ValueError."""
+    if config_path is None:
+        return default_days()
+
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    days: list[dict] = []
+    next_offset = 0
+    for exam in config["exams"]:
+        for d in exam["days"]:
+            offset = d.get("idOffset", next_offset)
+            days.append(
+                make_day(
+                    d["id"],
+                    d.get("name", d["id"]),
+                    config_path.parent / d["pdf"],
+                    d["expectedCount"],
+                    offset,
+                    d.get("imagePrefix", f"d{len(days) + 1}"),
+                    d["subjects"],
+                    d.get("oxRanges", []),
+                    exam.get("id"),
+                )
+            )
+            next_offset = max(next_offset, offset + d["expectedCount"])
+
+    for key in ("id", "imagePrefix"):
+        values = [d[key] for d in days]
+        dup = {v for v in values if values.count(v) > 1}
+        if dup:
+            raise ValueError(f"{key} 중복: {sorted(dup)}")
+    spans = sorted((d["idOffset"] + 1, d["idOffset"] + d["expectedCount"], d["id"]) for d in days)
+    for (lo1, hi1, id1), (lo2, hi2, id2) in zip(spans, spans[1:]):
+        if lo2 <= hi1:
+            raise ValueError(f"ID 구간 겹침: {id1} {lo1}-{hi1}, {id2} {lo2}-{hi2}")
+    return days
+
+
+RELEASE_PAGE_CACHE = True  # bench_extract.py --no-release로 끄고 최대 메모리 비교
+TEXT_CACHE_PAGES = 16  # 텍스트/앵커 패스는 이 페이지 수마다 캐시를 비움
+
+
+def release_page_cache(page_idx: int | None = None) -> None:
+    """MuPDF 리소스 캐시를 비움. 페이지를 읽을 때 이미지 스트림/디코딩 결과가 캐시(기본 최대
+    256MB)에 남아 문서를 닫을 때까지 쌓이므로, 페이지/이미지 단위 루프에서 호출해 해제.
+    page_idx가 주어지면(텍스트/앵커 패스) TEXT_CACHE_PAGES 페이지마다만 비움: 이미지를 디코딩하지
+    않는 패스에서 매 페이지 비우면 폰트를 페이지마다 다시 읽어 4배 넘게 느려진다."""
+    if not RELEASE_PAGE_CACHE:
+        return
+    if page_idx is None or (page_idx + 1) % TEXT_CACHE_PAGES == 0:
+        fitz.TOOLS.store_shrink(100)
+
+
+def extract_text_with_page_markers(doc: fitz.Document, start: int = 0, stop: int | None = None) -> str:
+    """전체(또는 [start, stop) 페이지) 텍스트를 합치되, 페이지 경계에 마커를 삽입."""
     parts = []
-    for page_idx in range(len(doc)):
+    for page_idx in range(start, len(doc) if stop is None else stop):
         parts.append(f"\n<<PAGE:{page_idx}>>\n")
         parts.append(doc[page_idx].get_text())
+        release_page_cache(page_idx)
     return "".join(parts)
 
 
 # ─── y좌표 기반 이미지 매핑 ──────────────────────────────────────
 
-def build_question_positions(doc: fitz.Document, question_numbers: list[int]) -> dict[int, tuple[int, float]]:
+QUESTION_ANCHOR = re.compile(r"(\d{1,3})\.")
+
+
+def find_line_anchors(page: fitz.Page) -> list[tuple[int, float]]:
+    """페이지에서 줄 맨 앞의 "N." 단어를 한 번의 단어 추출로 수집.
+    Returns: [(q_num, y_pos), ...] (읽기 순서)"""
+    anchors: list[tuple[int, float]] = []
+    for x0, y0, x1, y1, word, block_no, line_no, word_no in page.get_text("words"):
+        if word_no != 0:
+            continue
+        m = QUESTION_ANCHOR.fullmatch(word)
+        if m:
+            anchors.append((int(m.group(1)), y0))
+    return anchors
+
+
+def collect_line_anchors(doc: fitz.Document, start: int = 0, stop: int | None = None) -> list[tuple[int, int, float]]:
+    """페이지마다 단어 추출을 한 번만 수행해 줄 시작 앵커 수집.
+    Returns: [(page_idx, q_num, y_pos), ...] (읽기 순서)"""
+    anchors: list[tuple[int, int, float]] = []
+    for page_idx in range(start, len(doc) if stop is None else stop):
+        for q_num, y in find_line_anchors(doc[page_idx]):
+            anchors.append((page_idx, q_num, y))
+        release_page_cache(page_idx)
+    return anchors
+
+
+def build_question_positions(
+    anchors: list[tuple[int, int, float]], question_numbers: list[int]
+) -> dict[int, tuple[int, float]]:
     """각 문제 번호가 PDF에서 어디에 위치하는지 반환.
+    split_questions와 같은 단조 증가 규칙으로 줄 시작 앵커만 인정
+    ("112. " 안의 "12. " 무시).
     Returns: {q_num: (page_idx, y_pos)}"""
     positions: dict[int, tuple[int, float]] = {}
     q_set = set(question_numbers)
-    for page_idx in range(len(doc)):
-        page = doc[page_idx]
-        for q_num in sorted(q_set):
-            if q_num in positions:
-                continue
-            # "N. " 패턴을 페이지에서 검색
-            rects = page.search_for(f"{q_num}. ")
-            if rects:
-                positions[q_num] = (page_idx, rects[0].y0)
+    last_num = 0
+    for page_idx, q_num, y in anchors:
+        if q_num > last_num and q_num in q_set:
+            positions[q_num] = (page_idx, y)
+            last_num = q_num
     return positions
 
 
-def build_image_positions(doc: fitz.Document) -> list[tuple[int, int, float, int, int]]:
-    """모든 이미지의 페이지와 y좌표 반환.
+def build_image_positions(
+    doc: fitz.Document, start: int = 0, stop: int | None = None
+) -> list[tuple[int, int, float, int, int]]:
+    """모든(또는 [start, stop) 페이지) 이미지의 페이지와 y좌표 반환.
     Returns: [(page_idx, xref, y_pos, w, h), ...]"""
     result: list[tuple[int, int, float, int, int]] = []
-    for page_idx in range(len(doc)):
+    for page_idx in range(start, len(doc) if stop is None else stop):
         page = doc[page_idx]
         for img_info in page.get_images(full=True):
             xref = img_info[0]
@@ -103,6 +311,7 @@ def build_image_positions(doc: fitz.Document) -> list[tuple[int, int, float, int
             rects = page.get_image_rects(xref)
             if rects:
                 result.append((page_idx, xref, rects[0].y0, w, h))
+        release_page_cache()  # get_image_rects가 디코딩한 이미지
     return result
 
 
@@ -113,62 +322,74 @@ def assign_images_to_questions(
 ) -> dict[int, list[tuple[int, int, int]]]:
     """각 이미지를 y좌표 기준 가장 가까운 위의 문제에 할당.
     Returns: {q_num: [(xref, w, h), ...]}"""
-    # 각 페이지별로 문제 시작 위치를 정렬
-    page_questions: dict[int, list[tuple[float, int]]] = {}
-    for q_num, (page_idx, y) in q_positions.items():
-        page_questions.setdefault(page_idx, []).append((y, q_num))
-    for pg in page_questions:
-        page_questions[pg].sort()
-
-    # 전체 문제를 (page, y) 순서로 정렬 (이전 페이지 fallback용)
-    all_sorted: list[tuple[int, float, int]] = []
-    for q_num, (pg, y) in q_positions.items():
-        all_sorted.append((pg, y, q_num))
-    all_sorted.sort()
+    # 전체 문제를 (page, y) 순서로 정렬 → 이미지마다 bisect 한 번으로 탐색
+    all_sorted = sorted((pg, y, q_num) for q_num, (pg, y) in q_positions.items())
+    keys = [(pg, y) for pg, y, _ in all_sorted]
 
     result: dict[int, list[tuple[int, int, int]]] = {n: [] for n in question_numbers}
 
     for page_idx, xref, img_y, w, h in img_positions:
-        candidates = page_questions.get(page_idx, [])
-        assigned = None
+        # 이미지 위(또는 같은 위치)의 가장 가까운 문제, 없으면 이전 페이지의 마지막 문제
+        i = bisect.bisect_right(keys, (page_idx, img_y)) - 1
+        if i >= 0:
+            assigned = all_sorted[i][2]
+        elif all_sorted and all_sorted[0][0] == page_idx:
+            # 여전히 없으면 같은 페이지의 첫 문제
+            assigned = all_sorted[0][2]
+        else:
+            continue
+        result[assigned].append((xref, w, h))
 
-        # 같은 페이지에서 이미지 위(또는 같은 위치)의 문제 중 가장 가까운 것
-        for y, q_num in reversed(candidates):
-            if y <= img_y:
-                assigned = q_num
-                break
+    return result
 
-        if assigned is None:
-            # 이미지가 이 페이지의 모든 문제보다 위에 있음 → 이전 페이지의 마지막 문제
-            for pg, y, q_num in reversed(all_sorted):
-                if pg < page_idx:
-                    assigned = q_num
-                    break
-                elif pg == page_idx and y <= img_y:
-                    assigned = q_num
-                    break
 
-        # 여전히 없으면 첫 문제
-        if assigned is None and candidates:
-            assigned = candidates[0][1]
+# ─── 이미지 변환 ────────────────────────────────────────────────
 
-        if assigned is not None:
-            result[assigned].append((xref, w, h))
+EXIF_ORIENTATION = 0x0112
+DRAFT_MIN_RATIO = 2  # 원본이 목표 폭의 이 배수 이상일 때만 JPEG 축소 디코딩
 
-    return result
 
+def open_embedded_image(doc: fitz.Document, xref: int) -> tuple[bytes | fitz.Pixmap, Image.Image] | None:
+    """이미지를 필요할 때 하나씩 열어 원본과 Pillow 이미지를 반환.
+    JPEG(/DCTDecode) 스트림은 원본 바이트를 그대로 쓰고 헤더만 읽으며(디코딩은 지연),
+    그 외 형식은 MuPDF가 디코딩한 Pixmap의 샘플 버퍼를 복사 없이 감싼다.
+    (extract_image는 이런 이미지를 PNG로 다시 인코딩해 반환하므로 바이트가 한 벌 더 생긴다.)
+    Pixmap이 반환되면 img가 그 버퍼를 참조하므로 인코딩이 끝날 때까지 함께 유지해야 한다.
+    MuPDF 캐시에 남은 디코딩 결과는 바로 비움 (release_page_cache)."""
+    try:
+        if doc.xref_get_key(xref, "Filter") == ("name", "/DCTDecode"):
+            source = doc.xref_stream_raw(xref)
+            return source, Image.open(io.BytesIO(source))  # BytesIO는 bytes를 복사하지 않음
+        pix = fitz.Pixmap(doc, xref)
+        if pix.alpha or pix.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)  # CMYK 등은 extract_image와 같은 MuPDF 변환
+        mode = "L" if pix.n == 1 else "RGB"
+        img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+    except Exception:
+        return None
+    finally:
+        release_page_cache()
+    return pix, img
 
-def save_optimized_image(doc: fitz.Document, xref: int, out_path: Path) -> bool:
-    """이미지를 추출하고 리사이즈/포맷 변환 후 저장."""
-    img_data = doc.extract_image(xref)
-    if not img_data:
-        return False
 
-    image_bytes = img_data["image"]
+def encode_image(source: bytes | fitz.Pixmap, img: Image.Image, out_path: Path) -> None:
+    """리사이즈/포맷 변환 후 JPEG로 저장 (source, img는 open_embedded_image 결과).
+    이미 목표 폭 이하의 RGB JPEG는 디코딩 없이 원본 바이트를 그대로 복사하고,
+    목표 폭보다 훨씬 큰 JPEG는 draft 모드로 축소 디코딩한다."""
     try:
-        img = Image.open(io.BytesIO(image_bytes))
+        orientation = img.getexif().get(EXIF_ORIENTATION, 1)
     except Exception:
-        return False
+        orientation = 1
+    # 90도 회전(EXIF 5~8)이면 회전 후의 폭은 원본 높이
+    final_width = img.height if orientation in (5, 6, 7, 8) else img.width
+
+    if img.format == "JPEG":
+        if img.mode == "RGB" and orientation == 1 and final_width <= MAX_IMG_WIDTH:
+            out_path.write_bytes(source)
+            return
+        if final_width >= MAX_IMG_WIDTH * DRAFT_MIN_RATIO:
+            scale = MAX_IMG_WIDTH / final_width
+            img.draft(img.mode, (math.ceil(img.width * scale), math.ceil(img.height * scale)))
 
     # EXIF 회전 정보 적용 (폰 카메라 사진 등)
     try:
@@ -197,9 +418,703 @@ def save_optimized_image(doc: fitz.Document, xref: int, out_path: Path) -> bool:
 
     # JPEG 저장
     img.save(out_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+
+
+def save_optimized_image(doc: fitz.Document, xref: int, out_path: Path) -> bool:
+    """이미지를 추출하고 리사이즈/포맷 변환 후 저장."""
+    opened = open_embedded_image(doc, xref)
+    if opened is None:
+        return False
+    encode_image(*opened, out_path)
     return True
 
 
+# ─── 벡터 그림 (--vector-figures) ────────────────────────────────
+# 심전도/그래프/표처럼 벡터로 그린 그림은 get_images에 나오지 않는다.
+# 페이지의 그리기 경로 영역을 가까운 것끼리 묶어 그림 영역을 찾고 그 부분만 렌더링.
+# 경로 영역은 get_drawings와 같은 값을 get_bboxlog로 얻는다 (경로 좌표를 만들지 않고,
+# 래스터 이미지 영역도 디코딩 없이 함께 나옴).
+
+FIGURE_GAP = 6.0  # pt, 이 거리 안의 경로는 한 그림으로 묶음
+FIGURE_MIN_SIZE = 40.0  # pt, 가로/세로가 모두 이 이상인 묶음만 그림으로 인정
+FIGURE_MIN_PATHS = 4  # 경로가 이보다 적은 묶음(밑줄, 선지 테두리 등)은 제외
+FIGURE_MAX_PAGE_RATIO = 0.8  # 페이지 면적의 이 비율 이상인 경로(배경/쪽 테두리)는 제외
+FIGURE_PAD = 4.0  # pt, 렌더링 영역 여백
+FIGURE_MAX_DPI = 300  # 작은 그림을 목표 폭(MAX_IMG_WIDTH)까지 키울 때의 상한
+PATH_BOXES = {"fill-path", "stroke-path"}
+IMAGE_BOXES = {"fill-image", "fill-imgmask"}
+
+
+def boxes_near(a: list[float], b: list[float], gap: float = FIGURE_GAP) -> bool:
+    return a[0] - gap <= b[2] and b[0] - gap <= a[2] and a[1] - gap <= b[3] and b[1] - gap <= a[3]
+
+
+def merge_boxes(boxes: list[list[float]]) -> list[list[float]]:
+    """FIGURE_GAP 이내로 닿는 영역을 더 이상 합칠 것이 없을 때까지 합침.
+    boxes: [[x0, y0, x1, y1, 경로 수], ...]"""
+    while True:
+        merged: list[list[float]] = []
+        for box in sorted(boxes, key=lambda b: b[1]):
+            box = list(box)
+            rest = []
+            for c in merged:
+                if boxes_near(c, box):
+                    box = [min(c[0], box[0]), min(c[1], box[1]), max(c[2], box[2]), max(c[3], box[3]), c[4] + box[4]]
+                else:
+                    rest.append(c)
+            merged = rest + [box]
+        if len(merged) == len(boxes):
+            return merged
+        boxes = merged
+
+
+def find_vector_figures(page: fitz.Page) -> list[fitz.Rect]:
+    """벡터 그림 영역 목록 (위→아래). 래스터 이미지와 겹치는 묶음(사진 위 화살표 등)은
+    get_images 쪽에서 이미 저장되므로 제외."""
+    page_area = abs(page.rect)
+    paths: list[list[float]] = []
+    images: list[list[float]] = []
+    for kind, (x0, y0, x1, y1) in page.get_bboxlog():
+        if kind in PATH_BOXES and (x1 - x0) * (y1 - y0) < page_area * FIGURE_MAX_PAGE_RATIO:
+            paths.append([x0, y0, x1, y1, 1])
+        elif kind in IMAGE_BOXES:
+            images.append([x0, y0, x1, y1])
+    figures = [
+        fitz.Rect(box[:4])
+        for box in merge_boxes(paths)
+        if box[4] >= FIGURE_MIN_PATHS
+        and box[2] - box[0] >= FIGURE_MIN_SIZE
+        and box[3] - box[1] >= FIGURE_MIN_SIZE
+        and not any(boxes_near(box, img, 0) for img in images)
+    ]
+    return sorted(figures, key=lambda r: (r.y0, r.x0))
+
+
+def build_figure_positions(doc: fitz.Document) -> tuple[list[tuple[int, int, float, int, int]], list[tuple[int, fitz.Rect]]]:
+    """모든 페이지의 벡터 그림. assign_images_to_questions에 이미지 위치처럼 넘길 수 있도록
+    xref 자리에 그림 번호를 넣음.
+    Returns: ([(page_idx, 그림 번호, y0, w, h), ...], [(page_idx, 영역), ...])"""
+    positions: list[tuple[int, int, float, int, int]] = []
+    figures: list[tuple[int, fitz.Rect]] = []
+    for page_idx in range(len(doc)):
+        for rect in find_vector_figures(doc[page_idx]):
+            positions.append((page_idx, len(figures), rect.y0, int(rect.width), int(rect.height)))
+            figures.append((page_idx, rect))
+    return positions, figures
+
+
+@functools.cache
+def figure_fingerprint() -> str:
+    h = hashlib.sha256()
+    h.update(encoder_fingerprint().encode())
+    h.update(f"{FIGURE_PAD}:{FIGURE_MAX_DPI}:{fitz.VersionBind}".encode())
+    h.update(inspect.getsource(render_figure).encode())
+    return h.hexdigest()
+
+
+def figure_cache_path(cache_dir: Path, page_hash: str, rect: fitz.Rect) -> Path:
+    """페이지 내용 해시 + 영역 기준 캐시 경로 (페이지가 그대로면 다시 렌더링하지 않음)."""
+    h = hashlib.sha256()
+    h.update(figure_fingerprint().encode())
+    h.update(page_hash.encode())
+    h.update(f"{rect.x0:.2f},{rect.y0:.2f},{rect.x1:.2f},{rect.y1:.2f}".encode())
+    key = h.hexdigest()
+    return cache_dir / "figures" / key[:2] / f"{key}.jpg"
+
+
+def render_figure(page: fitz.Page, rect: fitz.Rect, out_path: Path, cached: Path | None) -> None:
+    """그림 영역(+여백)만 목표 폭에 맞는 dpi로 렌더링해 JPEG로 저장."""
+    clip = fitz.Rect(rect.x0 - FIGURE_PAD, rect.y0 - FIGURE_PAD, rect.x1 + FIGURE_PAD, rect.y1 + FIGURE_PAD) & page.rect
+    dpi = min(FIGURE_MAX_DPI, int(72 * MAX_IMG_WIDTH / clip.width))
+    pix = page.get_pixmap(clip=clip, dpi=dpi, alpha=False)
+    img = Image.frombuffer("RGB", (pix.width, pix.height), pix.samples_mv, "raw", "RGB", pix.stride, 1)
+    encode_image_cached(pix, img, out_path, cached)
+
+
+def save_vector_figures(
+    doc: fitz.Document,
+    spec: dict,
+    anchors: list[tuple[int, int, float]],
+    q_numbers: list[int],
+    cache_dir: Path | None = None,
+) -> dict[int, list[str]]:
+    """벡터 그림을 찾아 문제에 배정(래스터 이미지와 같은 규칙)하고 렌더링.
+    Returns: {q_num: ["images/d1_q001_f1.jpg", ...]}  (prefix="d1")"""
+    positions, figures = build_figure_positions(doc)
+    if not figures:
+        return {}
+    assigned = assign_images_to_questions(build_question_positions(anchors, q_numbers), positions, q_numbers)
+    page_hashes: dict[int, str] = {}
+    saved: dict[int, list[str]] = {}
+    for q_num, items in assigned.items():
+        for idx, (fig, _, _) in enumerate(items, 1):
+            page_idx, rect = figures[fig]
+            page = doc[page_idx]
+            img_name = f"{spec['imagePrefix']}_q{q_num:03d}_f{idx}.jpg"
+            cached = None
+            if cache_dir is not None:
+                if page_idx not in page_hashes:
+                    page_hashes[page_idx] = page_digest(doc, page)
+                cached = figure_cache_path(cache_dir, page_hashes[page_idx], rect)
+            if cached is not None and cached.exists():
+                restore_cached_image(cached, IMG_DIR / img_name)
+            else:
+                render_figure(page, rect, IMG_DIR / img_name, cached)
+            saved.setdefault(q_num, []).append(f"images/{img_name}")
+    return saved
+
+
+# ─── 증분 빌드 캐시 ──────────────────────────────────────────────
+# PDF 단위: PDF 내용 해시 + 이 스크립트 소스 해시(파서/과목 표 포함) + 인코더 설정
+# 이미지 단위: xref 스트림 해시 + 인코더 소스/설정
+
+CACHE_VERSION = 1
+
+
+@functools.cache
+def encoder_fingerprint() -> str:
+    """이미지 변환 결과에 영향을 주는 코드/설정의 해시."""
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}:{MAX_IMG_WIDTH}:{JPEG_QUALITY}:{DRAFT_MIN_RATIO}:{PIL.__version__}".encode())
+    h.update(inspect.getsource(encode_image).encode())
+    return h.hexdigest()
+
+
+@functools.cache
+def code_fingerprint() -> str:
+    """파싱 결과에 영향을 주는 코드/설정의 해시 (스크립트 전체 소스 포함)."""
+    h = hashlib.sha256()
+    h.update(encoder_fingerprint().encode())
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()
+
+
+def file_digest(path: Path, cache_dir: Path) -> str:
+    """파일 내용 SHA-256. 크기/수정시각이 같으면 이전에 계산한 값을 재사용."""
+    memo_path = cache_dir / "digests.json"
+    try:
+        memo = json.loads(memo_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        memo = {}
+    st = path.stat()
+    entry = memo.get(str(path))
+    if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+        return entry[2]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    memo[str(path)] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    write_atomic(memo_path, json.dumps(memo).encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 교체하여 중간 상태의 파일이 보이지 않게 함.
+    임시 파일 이름에 스레드 id를 넣어 여러 스레드(--encode-threads)가 같은 경로에 써도 겹치지 않음
+    (mkstemp는 권한이 0600이라 웹에 올리는 출력에 쓰지 않음)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def pdf_cache_path(cache_dir: Path, spec: dict, figures: bool = False) -> Path:
+    h = hashlib.sha256()
+    h.update(code_fingerprint().encode())
+    h.update(file_digest(spec["pdf"], cache_dir).encode())
+    # 일차 설정(과목 범위, OX 범위, ID/이미지 이름 규칙) — PDF 경로는 결과와 무관
+    settings = {k: v for k, v in spec.items() if k not in ("pdf", "subjectIndex")}
+    h.update(json.dumps(settings, sort_keys=True, ensure_ascii=False).encode())
+    if figures:
+        h.update(b"vector-figures")
+    return cache_dir / "pdf" / f"{h.hexdigest()}.json"
+
+
+def load_pdf_cache(path: Path, shared_images: dict[str, str]) -> list[dict] | None:
+    """캐시된 문제 목록 반환.
+    참조하는 이미지 파일이 없거나 내용이 바뀌었으면, 또는 앞선 PDF의 공유 이미지와
+    중복되어 새로 빌드하면 참조가 달라지는 경우 무효."""
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    for img, digest in entry["images"].items():
+        if shared_images.get(digest, img) != img:
+            return None
+        try:
+            if file_sha256(OUT_DIR / img) != digest:
+                return None
+        except OSError:
+            return None
+    for img, digest in entry["images"].items():
+        shared_images[digest] = img
+    return entry["questions"]
+
+
+def store_pdf_cache(path: Path, questions: list[dict], image_digests: dict[str, str]) -> None:
+    entry = {"questions": questions, "images": image_digests}
+    write_atomic(path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+
+def image_cache_path(cache_dir: Path, doc: fitz.Document, xref: int) -> Path:
+    h = hashlib.sha256()
+    h.update(encoder_fingerprint().encode())
+    h.update(doc.xref_object(xref, compressed=True).encode())
+    h.update(doc.xref_stream_raw(xref) or b"")
+    key = h.hexdigest()
+    return cache_dir / "images" / key[:2] / f"{key}.jpg"
+
+
+def restore_cached_image(cached: Path, out_path: Path) -> None:
+    """캐시된 변환 결과를 출력 경로로 복사 (내용이 같으면 건너뜀)."""
+    if out_path.exists() and filecmp.cmp(cached, out_path, shallow=False):
+        return
+    shutil.copyfile(cached, out_path)
+
+
+def encode_image_cached(source: bytes | fitz.Pixmap, img: Image.Image, out_path: Path, cached: Path | None) -> None:
+    encode_image(source, img, out_path)
+    if cached is not None:
+        write_atomic(cached, out_path.read_bytes())
+
+
+# ─── 이미지 중복 제거 ────────────────────────────────────────────
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def dedupe_images(questions: list[dict], shared_images: dict[str, str]) -> dict[str, str]:
+    """변환 결과가 같은 이미지는 처음 나온 파일 하나만 남기고 참조를 그쪽으로 돌림.
+    shared_images: {내용 해시: 이미지 경로} — 여러 PDF에 걸쳐 누적.
+    Returns: {이 PDF가 참조하는 이미지 경로: 내용 해시}"""
+    resolved: dict[str, str] = {}
+    digests: dict[str, str] = {}
+    for q in questions:
+        refs: list[str] = []
+        for img in q["images"]:
+            if img not in resolved:
+                path = OUT_DIR / img
+                digest = file_sha256(path)
+                first = shared_images.setdefault(digest, img)
+                if first != img:
+                    path.unlink()
+                resolved[img] = first
+                digests[first] = digest
+            if resolved[img] not in refs:
+                refs.append(resolved[img])
+        q["images"] = refs
+    return digests
+
+
+def report_image_sharing(questions: list[dict]) -> None:
+    """공유 이미지로 줄어든 용량 출력 (참조마다 파일을 따로 둘 때와 비교)."""
+    sizes: dict[str, int] = {}
+    ref_bytes = 0
+    ref_count = 0
+    for q in questions:
+        for img in q["images"]:
+            if img not in sizes:
+                sizes[img] = (OUT_DIR / img).stat().st_size
+            ref_bytes += sizes[img]
+            ref_count += 1
+    unique_bytes = sum(sizes.values())
+    print(
+        f"이미지 공유: 참조 {ref_count}개 → 파일 {len(sizes)}개, "
+        f"{(ref_bytes - unique_bytes) / 1024:.1f} KB 절약 ({unique_bytes / 1024:.1f} KB 저장)"
+    )
+
+
+def referenced_image_names(questions: list[dict]) -> set[str]:
+    return {Path(img).name for q in questions for img in q["images"]}
+
+
+def prune_unreferenced_images(referenced: set[str]) -> int:
+    """이번 빌드에서 참조하지 않는 이미지 파일 삭제 (이전 빌드/중복 제거 잔여물).
+    referenced: 남길 파일 이름 (문제 이미지 + 반응형 변형 등)"""
+    removed = 0
+    for path in IMG_DIR.iterdir():
+        if path.suffix in IMAGE_SUFFIXES and path.name not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+# ─── 반응형 이미지 변형 ──────────────────────────────────────────
+# 마스터 JPEG(MAX_IMG_WIDTH 이하)에서 작은 폭/WebP/AVIF 변형과 placeholder를 만든다.
+
+IMAGE_SUFFIXES = {".jpg", ".webp", ".avif"}
+VARIANT_WIDTHS = (320, 480)  # + 마스터 폭
+VARIANT_FORMATS = {
+    # 확장자: (Pillow 포맷, MIME, 저장 옵션)
+    "avif": ("AVIF", "image/avif", {"quality": 60}),
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 6}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": JPEG_QUALITY, "optimize": True}),
+}
+PLACEHOLDER_WIDTH = 16
+
+
+@functools.cache
+def variant_fingerprint() -> str:
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}:{VARIANT_WIDTHS}:{VARIANT_FORMATS}:{PLACEHOLDER_WIDTH}:{PIL.__version__}".encode())
+    h.update(inspect.getsource(build_image_variants).encode())
+    return h.hexdigest()
+
+
+def build_image_variants(img_ref: str) -> dict:
+    """이미지 하나의 폭/높이/바이트 수, 평균 색, 저해상도 data URI, 변형 목록 생성.
+    변형은 images/{이름}.w{폭}.{확장자}로 저장 (마스터 폭의 JPEG은 마스터 자체)."""
+    master = OUT_DIR / img_ref
+    with Image.open(master) as img:
+        img = img.convert("RGB")
+
+    r, g, b = img.resize((1, 1), Image.BOX).getpixel((0, 0))
+    tiny_h = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    # WebP는 헤더가 작아 data URI가 JPEG의 몇 분의 1
+    fmt, mime = ("WEBP", "image/webp") if features.check("webp") else ("JPEG", "image/jpeg")
+    buf = io.BytesIO()
+    img.resize((PLACEHOLDER_WIDTH, tiny_h), Image.LANCZOS).save(buf, fmt, quality=50)
+    info = {
+        "src": img_ref,
+        "width": img.width,
+        "height": img.height,
+        "bytes": master.stat().st_size,
+        "color": f"#{r:02x}{g:02x}{b:02x}",
+        "placeholder": f"data:{mime};base64," + base64.b64encode(buf.getvalue()).decode("ascii"),
+        "variants": [],
+    }
+
+    formats = [ext for ext in VARIANT_FORMATS if ext == "jpg" or features.check(ext)]
+    for width in [w for w in VARIANT_WIDTHS if w < img.width] + [img.width]:
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        for ext in formats:
+            if ext == "jpg" and width == img.width:
+                continue
+            fmt, mime, options = VARIANT_FORMATS[ext]
+            path = master.with_name(f"{master.stem}.w{width}.{ext}")
+            resized.save(path, fmt, **options)
+            info["variants"].append(
+                {
+                    "src": f"images/{path.name}",
+                    "width": width,
+                    "height": height,
+                    "type": mime,
+                    "bytes": path.stat().st_size,
+                }
+            )
+    return info
+
+
+def cached_image_variants(img_ref: str, cache_dir: Path | None) -> dict:
+    """마스터 내용과 변형 설정이 같고 변형 파일이 그대로 있으면 이전 결과 재사용."""
+    if cache_dir is None:
+        return build_image_variants(img_ref)
+    key = hashlib.sha256(f"{variant_fingerprint()}:{file_sha256(OUT_DIR / img_ref)}".encode()).hexdigest()
+    cache_path = cache_dir / "variants" / f"{key}.json"
+    try:
+        info = json.loads(cache_path.read_text(encoding="utf-8"))
+        if info["src"] == img_ref and all(
+            (OUT_DIR / v["src"]).stat().st_size == v["bytes"] for v in info["variants"]
+        ):
+            return info
+    except (OSError, ValueError):
+        pass
+    info = build_image_variants(img_ref)
+    write_atomic(cache_path, json.dumps(info).encode("utf-8"))
+    return info
+
+
+def build_all_variants(questions: list[dict], cache_dir: Path | None, threads: int = 1) -> dict[str, dict]:
+    """참조되는 모든 이미지의 변형 생성. Returns: {이미지 경로: 정보}"""
+    refs = list(dict.fromkeys(img for q in questions for img in q["images"]))
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
+        infos = list(ex.map(cached_image_variants, refs, [cache_dir] * len(refs)))
+    return dict(zip(refs, infos))
+
+
+def attach_image_info(questions: list[dict], image_info: dict[str, dict]) -> list[dict]:
+    """images[]의 경로 문자열을 크기/placeholder/변형 정보 객체로 바꾼 사본 반환."""
+    return [{**q, "images": [image_info[img] for img in q["images"]]} for q in questions]
+
+
+# ─── 유사 문제 군집 (--near-duplicates) ──────────────────────────
+
+def question_signatures(questions: list[dict]):
+    """본문 + 선지의 MinHash 서명. Returns: (서명, 유효 여부) — near_duplicates.minhash_signatures 참고"""
+    return near_duplicates.minhash_signatures([near_duplicates.dedupe_text(q) for q in questions])
+
+
+def attach_duplicate_groups(questions: list[dict], groups: dict[int, int]) -> list[dict]:
+    """군집에 속한 문제에만 duplicateGroup(군집 안 가장 작은 문제 id)을 붙인 사본 반환."""
+    return [{**q, "duplicateGroup": groups[q["id"]]} if q["id"] in groups else q for q in questions]
+
+
+def write_duplicate_report(path: Path, clusters: list[dict], total: int) -> None:
+    write_json_output(path, near_duplicates.build_report(clusters, total))
+    near_duplicates.print_clusters(clusters)
+    print(f"유사 문제 보고서: {path}")
+
+
+# ─── 학습 통계 병합 (--progress-stats) ───────────────────────────
+
+def load_question_stats(path: Path) -> dict[int, dict]:
+    """scripts/progress_stats.py 결과의 문제별 열을 문제 id → stats 객체로 변환.
+    stats: {"attempts", "accuracy", "difficulty"} (+ 선택 선지가 기록됐으면 "picks").
+    풀이 기록 없이 srData만 있는 문제는 제외."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != 1:
+        raise ValueError(f"{path}: 지원하지 않는 통계 버전 {data.get('version')}")
+    cols = data["questions"]
+    stats = {}
+    for i, qid in enumerate(cols["id"]):
+        if not cols["attempts"][i]:
+            continue
+        entry = {
+            "attempts": cols["attempts"][i],
+            "accuracy": cols["accuracy"][i],
+            "difficulty": cols["difficulty"][i],
+        }
+        if any(cols["picks"][i]):
+            entry["picks"] = cols["picks"][i]
+        stats[qid] = entry
+    return stats
+
+
+def attach_question_stats(questions: list[dict], stats: dict[int, dict]) -> list[dict]:
+    """통계가 있는 문제에만 stats를 붙인 사본 반환."""
+    return [{**q, "stats": stats[q["id"]]} if q["id"] in stats else q for q in questions]
+
+
+# ─── 프로파일링 (--profile) ──────────────────────────────────────
+# 단계/PDF별 wall·CPU 시간과 최대 메모리, 이미지별 변환 시간과 입출력 바이트를 기록.
+# 메모리: tracemalloc은 Python 할당 최댓값, RSS는 C 확장(PyMuPDF/Pillow) 포함 프로세스 최댓값.
+
+PROFILE: dict | None = None  # --profile일 때 start_profile()이 채움
+PROFILE_TOP = 10
+
+
+def start_profile() -> None:
+    global PROFILE
+    tracemalloc.start()
+    PROFILE = {"stages": [], "images": [], "questions": [], "stack": []}
+
+
+def peak_rss() -> int | None:
+    """프로세스 최대 RSS (bytes). resource가 없는 Windows에서는 psutil이 있을 때만."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return getattr(psutil.Process().memory_info(), "peak_wset", None)
+
+
+@contextlib.contextmanager
+def profile_stage(name: str, day: str | None = None):
+    """with 블록 하나를 단계로 기록. 단계가 중첩되면 바깥 단계의 최대 메모리에도 반영.
+    CPU 시간은 이 프로세스의 모든 스레드 합 (워커 프로세스 제외)."""
+    if PROFILE is None:
+        yield
+        return
+    stack = PROFILE["stack"]
+    traced, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]["peakPy"] = max(stack[-1]["peakPy"], peak)
+    tracemalloc.reset_peak()
+    rec = {"stage": name, "day": day, "peakPy": traced}
+    stack.append(rec)
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        rec["wall"] = time.perf_counter() - wall0
+        rec["cpu"] = time.process_time() - cpu0
+        rec["peakPy"] = max(rec["peakPy"], tracemalloc.get_traced_memory()[1])
+        rec["peakRss"] = peak_rss()
+        stack.pop()
+        if stack:
+            stack[-1]["peakPy"] = max(stack[-1]["peakPy"], rec["peakPy"])
+        PROFILE["stages"].append(rec)
+
+
+def encode_image_profiled(
+    rec: dict, source: bytes | fitz.Pixmap, img: Image.Image, out_path: Path, cached: Path | None
+) -> None:
+    """encode_image_cached + 이미지 하나의 변환 시간/출력 크기 기록 (변환 스레드에서 실행)."""
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    encode_image_cached(source, img, out_path, cached)
+    rec["wall"] = time.perf_counter() - wall0
+    rec["cpu"] = time.thread_time() - cpu0
+    rec["bytesOut"] = out_path.stat().st_size
+
+
+def profile_report(top: int = PROFILE_TOP) -> dict:
+    """기록을 JSON 보고서 형태로 요약 (가장 느린 문제/이미지 top개 포함)."""
+    stages = [{k: v for k, v in rec.items() if v is not None} for rec in PROFILE["stages"]]
+    images = PROFILE["images"]
+    encoded = [img for img in images if not img["cached"]]
+    image_wall: dict[str, float] = {}
+    for img in encoded:
+        image_wall[img["file"]] = image_wall.get(img["file"], 0.0) + img["wall"]
+    questions = []
+    for q in PROFILE["questions"]:
+        img_time = sum(image_wall.get(ref, 0.0) for ref in q["images"])
+        questions.append({**q, "imageWall": img_time, "wall": q["parseWall"] + img_time})
+
+    pdfs = []
+    for rec in stages:
+        if rec["stage"] != "pdf":
+            continue
+        day_images = [img for img in images if img["day"] == rec["day"]]
+        pdfs.append({
+            **rec,
+            "images": len(day_images),
+            "cachedImages": sum(img["cached"] for img in day_images),
+            "bytesIn": sum(img["bytesIn"] for img in day_images if not img["cached"]),
+            "bytesOut": sum(img["bytesOut"] for img in day_images),
+        })
+    return {
+        "python": sys.version.split()[0],
+        "pymupdf": fitz.VersionBind,
+        "pillow": PIL.__version__,
+        "stages": stages,
+        "pdfs": pdfs,
+        "images": {
+            "count": len(images),
+            "encoded": len(encoded),
+            "cached": len(images) - len(encoded),
+            "bytesIn": sum(img["bytesIn"] for img in encoded),
+            "bytesOut": sum(img["bytesOut"] for img in images),
+            "wall": sum(img["wall"] for img in encoded),
+            "cpu": sum(img["cpu"] for img in encoded),
+            "slowest": sorted(encoded, key=lambda img: img["wall"], reverse=True)[:top],
+        },
+        "questions": {
+            "count": len(questions),
+            "slowest": sorted(questions, key=lambda q: q["wall"], reverse=True)[:top],
+        },
+    }
+
+
+def print_profile_summary(report: dict) -> None:
+    def mb(n: int | None) -> str:
+        return "-" if n is None else f"{n / 1024 / 1024:.1f} MB"
+
+    print("\n단계별 시간 (wall / cpu / Python 최대 / RSS 최대):")
+    for rec in report["stages"]:
+        label = f"{rec['stage']} ({rec['day']})" if rec.get("day") else rec["stage"]
+        print(
+            f"  {label:<24} {rec['wall'] * 1000:9.1f} ms {rec['cpu'] * 1000:9.1f} ms "
+            f"{mb(rec['peakPy']):>10} {mb(rec.get('peakRss')):>10}"
+        )
+    images = report["images"]
+    if images["count"]:
+        print(
+            f"이미지: {images['encoded']}개 변환 + {images['cached']}개 캐시, "
+            f"{images['bytesIn'] / 1024:.1f} KB → {images['bytesOut'] / 1024:.1f} KB, "
+            f"변환 {images['wall'] * 1000:.1f} ms"
+        )
+    for q in report["questions"]["slowest"][:3]:
+        print(f"  느린 문제: {q['day']} Q{q['question']} {q['wall'] * 1000:.1f} ms (이미지 {len(q['images'])}개)")
+
+
+# ─── 병렬 처리 (페이지 범위 샤딩) ────────────────────────────────
+
+def scan_pages(
+    doc: fitz.Document, start: int = 0, stop: int | None = None
+) -> tuple[str, list[tuple[int, int, float]], list[tuple[int, int, float, int, int]]]:
+    """페이지 범위 하나에서 텍스트, 줄 시작 앵커, 이미지 위치를 읽음."""
+    return (
+        extract_text_with_page_markers(doc, start, stop),
+        collect_line_anchors(doc, start, stop),
+        build_image_positions(doc, start, stop),
+    )
+
+
+def _scan_pages_worker(pdf_path: str, start: int, stop: int):
+    """워커 프로세스: 문서를 직접 열어 [start, stop) 페이지를 스캔."""
+    doc = fitz.open(pdf_path)
+    try:
+        return scan_pages(doc, start, stop)
+    finally:
+        doc.close()
+
+
+def _save_images_worker(
+    pdf_path: str,
+    prefix: str,
+    items: list[tuple[int, list[tuple[int, int, int]]]],
+    cache_dir: Path | None,
+    day: str | None = None,
+    profile: bool = False,
+):
+    """워커 프로세스: 문서를 직접 열어 할당된 문제들의 이미지를 저장.
+    items에는 xref가 처음 나온 곳만 들어 있음 (first_occurrences 참고).
+    profile이면 이미지별 기록도 함께 돌려줌. Returns: ({xref: 저장 경로}, 이미지 기록)"""
+    global PROFILE
+    PROFILE = {"images": []} if profile else None
+    doc = fitz.open(pdf_path)
+    writer = QuestionImageWriter(doc, prefix, cache_dir=cache_dir, day=day)
+    try:
+        for q_num, images in items:
+            writer.save(q_num, images)
+        return writer.saved_xrefs, PROFILE["images"] if profile else []
+    finally:
+        writer.close()
+        doc.close()
+        PROFILE = None
+
+
+def page_shards(page_count: int, n: int) -> list[tuple[int, int]]:
+    """[0, page_count)를 최대 n개의 연속된 페이지 범위로 분할."""
+    n = max(1, min(n, page_count))
+    bounds = [page_count * i // n for i in range(n + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n)]
+
+
+def first_occurrences(
+    items: list[tuple[int, list[tuple[int, int, int]]]],
+) -> list[tuple[int, list[tuple[int, int, int]]]]:
+    """각 xref를 처음 나온 문제에만 남김. 직렬 처리에서 다시 나온 xref는 번호를 쓰지 않으므로,
+    이렇게 나눠 저장해야 워커가 달라도 파일명(번호)이 직렬 처리와 같다."""
+    seen: set[int] = set()
+    result = []
+    for q_num, images in items:
+        first = []
+        for image in images:
+            if image[0] not in seen:
+                seen.add(image[0])
+                first.append(image)
+        result.append((q_num, first))
+    return result
+
+
+def image_shards(
+    items: list[tuple[int, list[tuple[int, int, int]]]], n: int
+) -> list[list[tuple[int, list[tuple[int, int, int]]]]]:
+    """이미지가 있는 문제들을 이미지 수가 비슷하도록 최대 n개의 연속 묶음으로 분할."""
+    items = [item for item in items if item[1]]
+    total = sum(len(imgs) for _, imgs in items)
+    shards: list[list[tuple[int, list[tuple[int, int, int]]]]] = [[]]
+    done = 0
+    for item in items:
+        if shards[-1] and done >= total * len(shards) / n:
+            shards.append([])
+        shards[-1].append(item)
+        done += len(item[1])
+    return [shard for shard in shards if shard]
+
+
 def split_questions(full_text: str, expected_max: int) -> list[tuple[int, str]]:
     """
     문제 번호와 텍스트로 분할.
@@ -324,131 +1239,756 @@ def get_question_text(raw: str) -> str:
     return text
 
 
+# ─── 문제 렉서 ──────────────────────────────────────────────────
+# 위의 get_question_text/parse_choices/parse_answer/parse_explanation은 문제마다
+# 원문을 각각 다시 훑는다. lex_question은 페이지 마커 제거를 한 번만 하고
+# 미리 컴파일한 패턴으로 경계를 찾아 같은 결과를 낸다 (bench_parse.py로 비교).
+
+# 원문 앞에 "\n"을 하나 붙여 "(?:^|\n)"을 "\n"으로 바꿔 씀 (리터럴 접두사로 빠르게 탐색)
+PAGE_MARKER = re.compile(r"<<PAGE:\d+>>")
+NEWLINE_RUN = re.compile(r"\s*\n\s*")
+QUESTION_START = re.compile(r"\n\d{1,3}\.\s")
+# 본문 끝: 첫 "1)" 선지, ①, 또는 답 (선지 없는 경우)
+STEM_END = re.compile(r"\n\s*1\)\s|①|\n\s*정?답\s*[:;]")
+# 선지 영역 끝: 줄 머리의 답/해설/풀이 중 가장 앞
+CHOICES_END = re.compile(r"\n\s*(?:정?답\s*[:;]|해설\s*:|풀이\s*:)")
+NUMBER_CHOICE = re.compile(r"\n\s*(\d)\)\s?")
+CIRCLED_CHOICE = re.compile(r"([①②③④⑤])\s?")
+ANSWER = re.compile(r"(?:정답|답)\s*[:;]\s*(\d|[①②③④⑤])")
+EXPLANATION = re.compile(r"(?:해설|풀이)\s*[:]\s*(.*)", re.DOTALL)
+
+
+def _collect_choices(clean: str, marks: list[re.Match], end: int) -> list[str]:
+    choices: list[str] = []
+    for i, m in enumerate(marks):
+        stop = marks[i + 1].start() if i + 1 < len(marks) else end
+        choice_text = NEWLINE_RUN.sub(" ", clean[m.end():stop].strip()).strip()
+        if not choice_text:
+            num = CIRCLED_MAP.get(m.group(1), m.group(1))
+            choice_text = f"(보기 {num} - 이미지 참조)"
+        choices.append(choice_text)
+    return choices
+
+
+def lex_question(raw: str) -> tuple[str, list[str], int | None, str]:
+    """문제 원문을 한 번 정규화한 뒤 본문/선지/답/해설로 나눔.
+    Returns: (questionText, choices, answer, explanation)"""
+    clean = "\n" + PAGE_MARKER.sub("", raw)
+
+    # 본문: 문제 번호 다음부터 첫 선지/답 표시 전까지
+    m = QUESTION_START.search(clean)
+    body_start = m.end() if m else 1
+    m = STEM_END.search(clean, body_start)
+    stem = clean[body_start:m.start() if m else len(clean)]
+    q_text = NEWLINE_RUN.sub(" ", stem).strip()
+
+    # 선지: 답/해설 이전 영역에서 N) 형식과 ①②③④⑤ 형식 중 많은 쪽
+    m = CHOICES_END.search(clean, 1)
+    choices_end = m.start() if m else len(clean)
+    n_marks = list(NUMBER_CHOICE.finditer(clean, 0, choices_end))
+    c_marks = list(CIRCLED_CHOICE.finditer(clean, 0, choices_end))
+    if n_marks and len(n_marks) >= len(c_marks):
+        choices = _collect_choices(clean, n_marks, choices_end)
+    else:
+        choices = _collect_choices(clean, c_marks, choices_end)
+
+    m = ANSWER.search(clean)
+    answer = None
+    if m:
+        val = m.group(1)
+        answer = CIRCLED_MAP[val] if val in CIRCLED_MAP else int(val)
+
+    m = EXPLANATION.search(clean)
+    explanation = NEWLINE_RUN.sub(" ", m.group(1).strip()).strip() if m else ""
+
+    return q_text, choices, answer, explanation
+
+
+# ─── 스트리밍 분할 ───────────────────────────────────────────────
+# extract_text_with_page_markers + split_questions는 문서 전체를 문자열 하나로
+# 합친 뒤에야 분할을 시작한다. 아래는 페이지를 하나씩 읽으며 다음 문제 번호가
+# 보이는 즉시 앞 문제를 내보내는 같은 규칙의 스트리밍 버전 (페이지 마커 없음).
+
+SPLIT_ANCHOR = re.compile(r"(?:^|\n)(\d{1,3})\.\s", re.MULTILINE)  # split_questions와 같은 패턴
+
+
+class QuestionSplitter:
+    """split_questions의 단조 증가 분할을 페이지 단위로 수행.
+    페이지 경계는 텍스트 대신 조각 목록의 None으로 기록하고, 닫을 때 마커를
+    지운 것과 같은 텍스트를 만들어 lex_question 결과가 같음.
+    메모리에는 아직 끝나지 않은 문제 하나의 텍스트만 남는다."""
+
+    def __init__(self, expected_max: int):
+        self.expected_max = expected_max
+        self.last_num = 0
+        self.accepted: set[int] = set()
+        self._current: int | None = None  # 열려 있는 문제 번호 (첫 번호 전에는 머리말)
+        self._parts: list[str | None] = []
+        self._first_page = 0
+        self._last_page = 0
+
+    def feed(self, page_idx: int, page_text: str, more: bool = True) -> list[tuple[int, str, tuple[int, int]]]:
+        """페이지 하나를 넣고 이 페이지에서 끝난 문제들을 반환.
+        more: 뒤에 페이지가 더 있는지 (페이지 끝 "N." 뒤의 경계 문자를 흉내 냄)
+        Returns: [(q_num, text, (first_page, last_page)), ...]"""
+        # "\n<<PAGE:n>>\n" + 본문에서 마커만 뺀 것 (마커 자리는 seg[0]과 seg[1] 사이)
+        seg = "\n\n" + page_text
+        done = []
+        pos = 0
+        if self._current is None and not self._parts:
+            self._first_page = page_idx
+        for m in SPLIT_ANCHOR.finditer(seg + "\n" if more else seg):
+            if m.start() >= len(seg):
+                break
+            num = int(m.group(1))
+            if num > self.last_num and num <= self.expected_max:
+                self._append(seg, pos, m.start(), page_idx)
+                if self._current is not None:
+                    # 첫 문제는 머리말부터 이어지므로 앞 조각을 버리지 않음
+                    done.append(self._close())
+                    self._parts = []
+                    self._first_page = self._last_page = page_idx
+                self._current = num
+                self.last_num = num
+                self.accepted.add(num)
+                pos = m.start()
+        self._append(seg, pos, len(seg), page_idx)
+        return done
+
+    def finish(self) -> tuple[int, str, tuple[int, int]] | None:
+        """마지막 문제를 닫아 반환 (문제가 하나도 없으면 None)."""
+        if self._current is None:
+            return None
+        last = self._close()
+        self._current = None
+        self._parts = []
+        return last
+
+    def _append(self, seg: str, start: int, stop: int, page_idx: int) -> None:
+        if start == 0 and stop > 0:
+            self._parts += ["\n", None]
+            start = 1
+        piece = seg[start:stop]
+        if piece.strip():
+            self._last_page = page_idx
+        self._parts.append(piece)
+
+    def _close(self) -> tuple[int, str, tuple[int, int]]:
+        # split_questions는 마커가 든 원문을 strip하므로 공백 제거가 페이지 경계에서 멈춤
+        parts = self._parts
+        i, j = 0, len(parts)
+        while i < j and parts[i] is not None and not parts[i].strip():
+            i += 1
+        while j > i and parts[j - 1] is not None and not parts[j - 1].strip():
+            j -= 1
+        body = parts[i:j]
+        if body and body[0] is not None:
+            body[0] = body[0].lstrip()
+        if body and body[-1] is not None:
+            body[-1] = body[-1].rstrip()
+        text = "".join(p for p in body if p is not None)
+        return self._current, text, (self._first_page, self._last_page)
+
+
+def iter_questions(
+    doc: fitz.Document, expected_max: int, stats: dict | None = None
+) -> Iterator[tuple[int, str, tuple[int, int], list[tuple[int, int, int]]]]:
+    """페이지를 하나씩 읽어 완성된 문제를 순서대로 내보냄.
+    split_questions + build_question_positions + assign_images_to_questions와
+    같은 결과를 내되, 문제는 다음 문제 번호가 나오고 그 사이 이미지의 주인이
+    확정되는 즉시 나온다 (뒤 페이지를 읽는 동안 파싱/이미지 저장 가능).
+    stats가 주어지면 "positions"/"images" 감지 수를 기록.
+    Yields: (q_num, text, (first_page, last_page), [(xref, w, h), ...])"""
+    splitter = QuestionSplitter(expected_max)
+    done: deque[tuple[int, str, tuple[int, int]]] = deque()
+    q_images: dict[int, list[tuple[int, int, int]]] = {}
+    q_keys: dict[int, tuple[int, float, int]] = {}
+    # 앵커 번호가 텍스트 분할보다 앞선 페이지는 번호 인정 여부가 정해질 때까지 대기
+    # (앵커/이미지 좌표만 보관하므로 텍스트보다 훨씬 작음)
+    waiting: deque[tuple[list[tuple[int, int, float]], list[tuple[int, int, float, int, int]]]] = deque()
+    pos_last = 0
+    last_key: tuple[int, float, int] | None = None  # 지금까지 가장 뒤(page, y)의 문제 위치
+    n_positions = n_images = 0
+
+    def resolve(anchors, img_positions) -> None:
+        nonlocal pos_last, last_key, n_positions, n_images
+        page_keys = []
+        for page_idx, q_num, y in anchors:
+            if q_num > pos_last and q_num in splitter.accepted:
+                page_keys.append((page_idx, y, q_num))
+                q_keys[q_num] = (page_idx, y, q_num)
+                pos_last = q_num
+        page_keys.sort()
+        keys = [(pg, y) for pg, y, _ in page_keys]
+        n_positions += len(page_keys)
+        n_images += len(img_positions)
+        for page_idx, xref, img_y, w, h in img_positions:
+            i = bisect.bisect_right(keys, (page_idx, img_y)) - 1
+            if i >= 0:
+                assigned = page_keys[i][2]
+            elif last_key is not None:
+                assigned = last_key[2]
+            elif page_keys:
+                assigned = page_keys[0][2]
+            else:
+                continue
+            q_images.setdefault(assigned, []).append((xref, w, h))
+        if page_keys:
+            last_key = page_keys[-1]
+
+    def finished(q_num: int) -> bool:
+        # 위치가 있으면 더 뒤의 위치가 생긴 뒤에는 이미지가 오지 않고,
+        # 위치가 없으면 더 큰 번호가 인정된 뒤에는 위치가 생기지 않음
+        if q_num in q_keys:
+            return last_key != q_keys[q_num]
+        return pos_last > q_num
+
+    def emit():
+        q_num, text, pages = done.popleft()
+        q_keys.pop(q_num, None)
+        return q_num, text, pages, q_images.pop(q_num, [])
+
+    page_count = len(doc)
+    for page_idx in range(page_count):
+        page = doc[page_idx]
+        for q in splitter.feed(page_idx, page.get_text(), page_idx + 1 < page_count):
+            done.append(q)
+        waiting.append((
+            [(page_idx, q_num, y) for q_num, y in find_line_anchors(page)],
+            build_image_positions(doc, page_idx, page_idx + 1),
+        ))
+        while waiting and all(q_num <= splitter.last_num for _, q_num, _ in waiting[0][0]):
+            resolve(*waiting.popleft())
+        while done and finished(done[0][0]):
+            yield emit()
+
+    last = splitter.finish()
+    if last is not None:
+        done.append(last)
+    while waiting:
+        resolve(*waiting.popleft())
+    while done:
+        yield emit()
+    if stats is not None:
+        stats["positions"] = n_positions
+        stats["images"] = n_images
+
+
+class QuestionImageWriter:
+    """문제별 이미지를 순서대로 받아 저장.
+    추출과 헤더 확인은 save() 호출 순서대로 하고(파일명이 여기서 정해짐), 디코딩/인코딩은
+    threads > 1이면 스레드 풀에서 수행 (Pillow는 코덱 실행 중 GIL을 해제).
+    cache_dir가 주어지면 xref 스트림 해시가 같은 이미지는 변환 결과를 재사용.
+    같은 xref가 여러 문제에 다시 나오면 처음 저장한 파일을 함께 참조.
+    day는 --profile 기록용 일차 id, out_dir는 저장 폴더 (기본 IMG_DIR)."""
+
+    def __init__(
+        self,
+        doc: fitz.Document,
+        prefix: str,
+        threads: int = 1,
+        cache_dir: Path | None = None,
+        day: str | None = None,
+        out_dir: Path | None = None,
+    ):
+        self.doc = doc
+        self.prefix = prefix
+        self.day = day
+        self.out_dir = out_dir if out_dir is not None else IMG_DIR
+        self.threads = threads
+        self.cache_dir = cache_dir
+        self.saved_xrefs: dict[int, str] = {}
+        self.encoder = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        self.pending: deque[Future] = deque()
+
+    def save(self, q_num: int, images: list[tuple[int, int, int]]) -> list[str]:
+        """Returns: ["images/d1_q001_1.jpg", ...]  (prefix="d1")"""
+        q_images: list[str] = []
+        img_idx = 1
+        for xref, w, h in images:
+            if xref in self.saved_xrefs:
+                q_images.append(self.saved_xrefs[xref])
+                continue
+            img_name = f"{self.prefix}_q{q_num:03d}_{img_idx}.jpg"
+            img_path = self.out_dir / img_name
+            cached = image_cache_path(self.cache_dir, self.doc, xref) if self.cache_dir is not None else None
+            rec = None
+            if PROFILE is not None:
+                rec = {"day": self.day, "question": q_num, "file": f"images/{img_name}", "xref": xref}
+                PROFILE["images"].append(rec)
+            if cached is not None and cached.exists():
+                restore_cached_image(cached, img_path)
+                if rec is not None:
+                    rec.update(cached=True, bytesIn=0, bytesOut=img_path.stat().st_size, wall=0.0, cpu=0.0)
+                self.saved_xrefs[xref] = f"images/{img_name}"
+                q_images.append(f"images/{img_name}")
+                img_idx += 1
+                continue
+            opened = open_embedded_image(self.doc, xref)
+            if opened is None:
+                if rec is not None:
+                    PROFILE["images"].remove(rec)
+                continue
+            task, args = encode_image_cached, (*opened, img_path, cached)
+            if rec is not None:
+                rec.update(cached=False, bytesIn=len(opened[0]), source=list(opened[1].size))
+                task, args = encode_image_profiled, (rec, *args)
+            if self.encoder is None:
+                task(*args)
+            else:
+                # 대기 작업 수를 제한해 원본/디코딩 버퍼가 메모리에 쌓이지 않게 함
+                while len(self.pending) >= self.threads:
+                    self.pending.popleft().result()
+                self.pending.append(self.encoder.submit(task, *args))
+            del opened, args  # 다음 이미지를 열기 전에 참조 해제 (스레드 작업은 끝나면 해제)
+            self.saved_xrefs[xref] = f"images/{img_name}"
+            q_images.append(f"images/{img_name}")
+            img_idx += 1
+        return q_images
+
+    def close(self) -> None:
+        """남은 변환 작업을 기다린 뒤 스레드 풀 종료."""
+        try:
+            while self.pending:
+                self.pending.popleft().result()
+        finally:
+            if self.encoder is not None:
+                self.encoder.shutdown()
+
+
+def save_question_images(
+    doc: fitz.Document,
+    prefix: str,
+    items: list[tuple[int, list[tuple[int, int, int]]]],
+    threads: int = 1,
+    cache_dir: Path | None = None,
+    day: str | None = None,
+) -> dict[int, list[str]]:
+    """문제별 이미지를 저장하고 저장된 경로 목록 반환 (QuestionImageWriter 참고).
+    Returns: {q_num: ["images/d1_q001_1.jpg", ...]}  (prefix="d1")"""
+    writer = QuestionImageWriter(doc, prefix, threads, cache_dir, day)
+    try:
+        return {q_num: writer.save(q_num, images) for q_num, images in items}
+    finally:
+        writer.close()
+
+
+def report_question_count(q_numbers: list[int], expected_count: int) -> None:
+    print(f"발견된 문제 수: {len(q_numbers)}")
+    if len(q_numbers) != expected_count:
+        print(f"  주의: 기대 {expected_count}개, 실제 {len(q_numbers)}개")
+        expected_nums = set(range(1, expected_count + 1))
+        missing = expected_nums - set(q_numbers)
+        if missing:
+            print(f"  누락된 번호: {sorted(missing)}")
+
+
+def build_question(spec: dict, q_num: int, q_raw: str, q_images: list[str]) -> dict:
+    """분할된 문제 원문 하나를 questions.json 항목으로 변환."""
+    t0 = time.perf_counter()
+    q_text, choices, answer, explanation = lex_question(q_raw)
+
+    global_id = q_num + spec["idOffset"]
+    subject = lookup_subject(spec["subjectIndex"], q_num)
+    is_ox = any(lo <= q_num <= hi for lo, hi in spec["oxRanges"])
+
+    # 선지가 없으면서 이미지가 있으면 이미지 선지로 간주
+    if not choices and answer is not None:
+        for i in range(1, answer + 1):
+            choices.append(f"(보기 {i} - 이미지 참조)")
+        while len(choices) < 5 and not is_ox:
+            choices.append(f"(보기 {len(choices)+1} - 이미지 참조)")
+        if is_ox:
+            choices = ["O", "X"]
+
+    if not choices:
+        print(f"  경고: Q{q_num} 선지 없음")
+    if answer is None:
+        print(f"  경고: Q{q_num} 답 없음")
+
+    if PROFILE is not None:
+        PROFILE["questions"].append({
+            "day": spec["id"],
+            "question": q_num,
+            "chars": len(q_raw),
+            "parseWall": time.perf_counter() - t0,
+            "images": q_images,
+        })
+    return {
+        "id": global_id,
+        "day": spec["id"],
+        "originalNumber": q_num,
+        "subject": subject,
+        "questionText": q_text,
+        "images": q_images,
+        "choices": choices,
+        "answer": answer if answer else 1,
+        "explanation": explanation,
+        "isOX": is_ox,
+    }
+
+
 def process_pdf(
-    pdf_path: Path, day: str, global_id_offset: int, expected_count: int
+    spec: dict,
+    pool: ProcessPoolExecutor | None = None,
+    workers: int = 1,
+    encode_threads: int = 1,
+    cache_dir: Path | None = None,
+    shared_images: dict[str, str] | None = None,
+    stream: bool = False,
+    figures: bool = False,
 ) -> list[dict]:
-    """PDF를 처리하여 문제 목록 반환."""
+    """PDF를 처리하여 문제 목록 반환. spec: make_day로 만든 일차 설정.
+    pool이 주어지면 페이지 범위/이미지 묶음을 워커에 나눠 처리하고,
+    페이지 순서대로 이어 붙여 직렬 처리와 같은 결과를 만든다.
+    stream이면 iter_questions로 페이지를 읽는 동안 완성된 문제부터 파싱/이미지 저장.
+    figures이면 벡터 그림도 렌더링해 래스터 이미지 뒤에 붙임 (stream과 함께 쓸 수 없음).
+    cache_dir가 주어지면 PDF/코드/설정이 그대로일 때 이전 결과를 재사용.
+    shared_images를 여러 PDF에 넘기면 PDF 간에도 같은 이미지를 한 파일로 공유."""
+    if shared_images is None:
+        shared_images = {}
+    pdf_path = spec["pdf"]
+    day = spec["id"]
+    expected_count = spec["expectedCount"]
     print(f"\n{'='*60}")
     print(f"처리 중: {pdf_path.name} ({day})")
     print(f"{'='*60}")
 
+    cache_path = None
+    if cache_dir is not None:
+        with profile_stage("cache", day):
+            cache_path = pdf_cache_path(cache_dir, spec, figures)
+            cached = load_pdf_cache(cache_path, shared_images)
+        if cached is not None:
+            img_count = sum(len(q["images"]) for q in cached)
+            print(f"캐시 사용 (변경 없음): {len(cached)}문제, {img_count}이미지")
+            return cached
+
     doc = fitz.open(str(pdf_path))
-    full_text = extract_text_with_page_markers(doc)
+    if stream:
+        questions = []
+        stats: dict[str, int] = {}
+        writer = QuestionImageWriter(doc, spec["imagePrefix"], encode_threads, cache_dir, day)
+        try:
+            with profile_stage("stream", day):
+                for q_num, q_raw, _pages, image_items in iter_questions(doc, expected_count, stats):
+                    questions.append(build_question(spec, q_num, q_raw, writer.save(q_num, image_items)))
+        finally:
+            writer.close()
+            doc.close()
+        report_question_count([q["originalNumber"] for q in questions], expected_count)
+        print(f"  문제 위치 감지: {stats['positions']}/{len(questions)}개")
+        print(f"  이미지 위치 감지: {stats['images']}개")
+        img_count = sum(len(q["images"]) for q in questions)
+        return finish_pdf(questions, img_count, shared_images, cache_path, day)
+
+    with profile_stage("scan", day):
+        if pool is None:
+            full_text, anchors, img_positions = scan_pages(doc)
+        else:
+            # 샤드 경계에 걸친 문제는 텍스트를 페이지 순서대로 합친 뒤 분할하므로 자연히 이어짐
+            shards = page_shards(len(doc), workers)
+            results = pool.map(
+                _scan_pages_worker,
+                [str(pdf_path)] * len(shards),
+                [lo for lo, _ in shards],
+                [hi for _, hi in shards],
+            )
+            texts, anchors, img_positions = [], [], []
+            for text, shard_anchors, shard_images in results:
+                texts.append(text)
+                anchors += shard_anchors
+                img_positions += shard_images
+            full_text = "".join(texts)
 
     # 문제 분할 (단조 증가 필터 적용)
-    raw_questions = split_questions(full_text, expected_count)
-    print(f"발견된 문제 수: {len(raw_questions)}")
-    if len(raw_questions) != expected_count:
-        print(f"  주의: 기대 {expected_count}개, 실제 {len(raw_questions)}개")
-        nums = [n for n, _ in raw_questions]
-        expected_nums = set(range(1, expected_count + 1))
-        missing = expected_nums - set(nums)
-        if missing:
-            print(f"  누락된 번호: {sorted(missing)}")
+    with profile_stage("split", day):
+        raw_questions = split_questions(full_text, expected_count)
+    q_numbers = [n for n, _ in raw_questions]
+    report_question_count(q_numbers, expected_count)
 
     # y좌표 기반 이미지 매핑
-    q_numbers = [n for n, _ in raw_questions]
-    q_positions = build_question_positions(doc, q_numbers)
-    img_positions = build_image_positions(doc)
-    image_map = assign_images_to_questions(q_positions, img_positions, q_numbers)
+    with profile_stage("assign", day):
+        q_positions = build_question_positions(anchors, q_numbers)
+        image_map = assign_images_to_questions(q_positions, img_positions, q_numbers)
 
     print(f"  문제 위치 감지: {len(q_positions)}/{len(q_numbers)}개")
     print(f"  이미지 위치 감지: {len(img_positions)}개")
 
-    questions = []
-    img_count = 0
-
-    for q_num, q_raw in raw_questions:
-        q_text = get_question_text(q_raw)
-        choices = parse_choices(q_raw)
-        answer = parse_answer(q_raw)
-        explanation = parse_explanation(q_raw)
+    # 이미지 저장 (사전 계산된 매핑 사용)
+    image_items = [(q_num, image_map.get(q_num, [])) for q_num in q_numbers]
+    with profile_stage("images", day):
+        if pool is None:
+            saved_images = save_question_images(
+                doc, spec["imagePrefix"], image_items, encode_threads, cache_dir, day
+            )
+        else:
+            # 다시 나온 xref는 처음 저장한 파일을 참조 (워커마다 따로 저장하면 번호가 밀림)
+            xref_names: dict[int, str] = {}
+            batches = image_shards(first_occurrences(image_items), workers)
+            n = len(batches)
+            profile = PROFILE is not None
+            for part, records in pool.map(
+                _save_images_worker,
+                [str(pdf_path)] * n,
+                [spec["imagePrefix"]] * n,
+                batches,
+                [cache_dir] * n,
+                [day] * n,
+                [profile] * n,
+            ):
+                xref_names.update(part)
+                if profile:
+                    PROFILE["images"] += records
+            saved_images = {
+                q_num: [xref_names[xref] for xref, _, _ in images if xref in xref_names]
+                for q_num, images in image_items
+            }
+    if figures:
+        with profile_stage("figures", day):
+            saved_figures = save_vector_figures(doc, spec, anchors, q_numbers, cache_dir)
+        for q_num, names in saved_figures.items():
+            saved_images[q_num] = saved_images.get(q_num, []) + names
+        print(f"  벡터 그림: {sum(len(names) for names in saved_figures.values())}개")
+    doc.close()
+    img_count = sum(len(imgs) for imgs in saved_images.values())
 
-        global_id = q_num + global_id_offset
-        subject = get_subject(q_num, day)
-        is_ox = day == "day1" and 120 <= q_num <= 124
+    with profile_stage("parse", day):
+        questions = [
+            build_question(spec, q_num, q_raw, saved_images.get(q_num, [])) for q_num, q_raw in raw_questions
+        ]
+    return finish_pdf(questions, img_count, shared_images, cache_path, day)
 
-        # 이미지 저장 (사전 계산된 매핑 사용)
-        q_images: list[str] = []
-        img_idx = 1
-        for xref, w, h in image_map.get(q_num, []):
-            day_num = 1 if day == "day1" else 2
-            img_name = f"d{day_num}_q{q_num:03d}_{img_idx}.jpg"
-            img_path = IMG_DIR / img_name
-            if save_optimized_image(doc, xref, img_path):
-                q_images.append(f"images/{img_name}")
-                img_idx += 1
-                img_count += 1
-
-        # 선지가 없으면서 이미지가 있으면 이미지 선지로 간주
-        if not choices and answer is not None:
-            for i in range(1, answer + 1):
-                choices.append(f"(보기 {i} - 이미지 참조)")
-            while len(choices) < 5 and not is_ox:
-                choices.append(f"(보기 {len(choices)+1} - 이미지 참조)")
-            if is_ox:
-                choices = ["O", "X"]
-
-        if not choices:
-            print(f"  경고: Q{q_num} 선지 없음")
-        if answer is None:
-            print(f"  경고: Q{q_num} 답 없음")
-
-        questions.append(
-            {
-                "id": global_id,
-                "day": day,
-                "originalNumber": q_num,
-                "subject": subject,
-                "questionText": q_text,
-                "images": q_images,
-                "choices": choices,
-                "answer": answer if answer else 1,
-                "explanation": explanation,
-                "isOX": is_ox,
-            }
-        )
 
-    doc.close()
-    print(f"파싱 완료: {len(questions)}문제, {img_count}이미지")
+def finish_pdf(
+    questions: list[dict],
+    img_count: int,
+    shared_images: dict[str, str],
+    cache_path: Path | None,
+    day: str | None = None,
+) -> list[dict]:
+    """이미지 중복 제거 후 결과를 캐시에 기록."""
+    with profile_stage("dedupe", day):
+        image_digests = dedupe_images(questions, shared_images)
+        if cache_path is not None:
+            store_pdf_cache(cache_path, questions, image_digests)
+    print(f"파싱 완료: {len(questions)}문제, {img_count}이미지 (고유 파일 {len(image_digests)}개)")
     return questions
 
 
-def build_meta(day1_count: int, day2_count: int) -> dict:
-    """메타데이터 구성."""
+def build_meta(days: list[dict], counts: list[int]) -> dict:
+    """메타데이터 구성. counts: 일차별 문제 수"""
     subjects = []
-    for s in SUBJECTS_DAY1:
-        subjects.append(
-            {
-                "id": s["id"],
-                "name": s["name"],
-                "day": "day1",
-                "questionRange": list(s["range"]),
-            }
-        )
-    for s in SUBJECTS_DAY2:
-        lo, hi = s["range"]
-        subjects.append(
-            {
-                "id": s["id"],
-                "name": s["name"],
-                "day": "day2",
-                "questionRange": [lo + 124, hi + 124],
-            }
-        )
+    for spec in days:
+        offset = spec["idOffset"]
+        for s in spec["subjects"]:
+            lo, hi = s["range"]
+            subjects.append(
+                {
+                    "id": s["id"],
+                    "name": s["name"],
+                    "day": spec["id"],
+                    "questionRange": [lo + offset, hi + offset],
+                }
+            )
+
+    day_meta = []
+    for spec, count in zip(days, counts):
+        entry = {"id": spec["id"], "name": spec["name"], "questionCount": count}
+        if spec["exam"]:
+            entry["exam"] = spec["exam"]
+        day_meta.append(entry)
 
     return {
-        "totalQuestions": day1_count + day2_count,
-        "days": [
-            {"id": "day1", "name": "1일차", "questionCount": day1_count},
-            {"id": "day2", "name": "2일차", "questionCount": day2_count},
-        ],
+        "totalQuestions": sum(counts),
+        "days": day_meta,
         "subjects": subjects,
     }
 
 
-def validate(questions: list[dict]) -> int:
-    """결과 검증."""
+def expected_ids(spec: dict, count: int) -> list[int]:
+    """일차 안에서 기대하는 연속 ID (idOffset+1부터 count개)."""
+    return list(range(spec["idOffset"] + 1, spec["idOffset"] + count + 1))
+
+
+# ─── JSON 출력 ──────────────────────────────────────────────────
+
+DICT_FIELDS = ("day", "subject")
+
+
+def encode_strings(questions: list[dict]) -> dict:
+    """반복되는 문자열(일차/과목 id, 이미지 선지 문구 등)을 문자열 표의 인덱스로 치환.
+    day/subject 값과 선지 중 두 번 이상 나오는 문자열만 표에 넣는다.
+    Returns: {"strings": [...], "questions": [...]}"""
+    counts: dict[str, int] = {}
+    for q in questions:
+        for field in DICT_FIELDS:
+            counts[q[field]] = counts.get(q[field], 0) + 1
+        for choice in q["choices"]:
+            counts[choice] = counts.get(choice, 0) + 1
+    # 많이 나오는 문자열에 작은 인덱스 (JSON 숫자 길이 최소화)
+    strings = sorted((t for t, n in counts.items() if n > 1), key=lambda t: (-counts[t], t))
+    index = {t: i for i, t in enumerate(strings)}
+
+    encoded = []
+    for q in questions:
+        eq = dict(q)
+        for field in DICT_FIELDS:
+            eq[field] = index.get(q[field], q[field])
+        eq["choices"] = [index.get(c, c) for c in q["choices"]]
+        encoded.append(eq)
+    return {"strings": strings, "questions": encoded}
+
+
+def dump_json(obj, compact: bool) -> bytes:
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_json_output(path: Path, obj, compact: bool = False) -> dict[str, int]:
+    """JSON 저장. compact면 최소화하고 최대 압축률의 .gz/.br도 함께 저장
+    (CDN이 미리 압축된 파일을 그대로 내려줄 수 있도록).
+    Returns: {"json": 바이트, "gz": 바이트, "br": 바이트}"""
+    data = dump_json(obj, compact)
+    write_atomic(path, data)
+    sizes = {"json": len(data)}
+    siblings = {
+        "gz": lambda: gzip.compress(data, compresslevel=9, mtime=0),
+        "br": (lambda: brotli.compress(data, quality=11)) if brotli is not None else None,
+    }
+    for ext, compress in siblings.items():
+        sibling = path.with_name(f"{path.name}.{ext}")
+        if compact and compress is not None:
+            packed = compress()
+            write_atomic(sibling, packed)
+            sizes[ext] = len(packed)
+        elif sibling.exists():
+            # 원본과 어긋난 이전 압축본이 서빙되지 않도록 삭제
+            sibling.unlink()
+    return sizes
+
+
+def format_sizes(sizes: dict[str, int]) -> str:
+    labels = {"json": "JSON", "gz": "gzip", "br": "brotli"}
+    return ", ".join(f"{labels[k]} {v / 1024:.1f} KB" for k, v in sizes.items())
+
+
+def remove_stale_output(*paths: Path) -> list[str]:
+    """이번 빌드에서 끈 선택 출력 삭제 (파일은 .gz/.br 포함, 폴더는 통째로).
+    남겨 두면 클라이언트가 이전 빌드의 매니페스트/색인을 계속 따라간다.
+    Returns: 삭제한 경로 (OUT_DIR 기준)"""
+    removed = []
+    for path in paths:
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            for sibling in (path.with_name(f"{path.name}.gz"), path.with_name(f"{path.name}.br")):
+                sibling.unlink(missing_ok=True)
+            path.unlink()
+        else:
+            continue
+        removed.append(path.relative_to(OUT_DIR).as_posix())
+    return removed
+
+
+def write_shards(
+    meta: dict, questions: list[dict], compact: bool = False, dict_encode: bool = False, search: bool = False
+) -> Path:
+    """일차/과목별 샤드 파일과 매니페스트(meta + 샤드 URL/개수/해시) 저장.
+    과목 필터를 건 학습 세션은 매니페스트와 필요한 샤드만 받으면 된다.
+    search이면 샤드마다 검색 색인({샤드}.search.json)도 만들어 "search"에 기록."""
+    groups: dict[tuple[str, str], list[dict]] = {}
+    for subj in meta["subjects"]:
+        groups[(subj["day"], subj["id"])] = []
+    for q in questions:
+        groups.setdefault((q["day"], q["subject"]), []).append(q)
+
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    shards = []
+    for (day, subject), qs in groups.items():
+        if not qs:
+            continue
+        path = SHARD_DIR / f"{day}-{subject}.json"
+        write_json_output(path, encode_strings(qs) if dict_encode else qs, compact)
+        data = path.read_bytes()
+        shard = {
+            "url": path.relative_to(OUT_DIR).as_posix(),
+            "day": day,
+            "subject": subject,
+            "count": len(qs),
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        if search:
+            search_path = SHARD_DIR / f"{day}-{subject}.search.json"
+            write_json_output(search_path, build_search_index(qs), compact)
+            shard["search"] = search_path.relative_to(OUT_DIR).as_posix()
+        shards.append(shard)
+
+    # 이번 빌드에 없는 샤드/색인 삭제 (과목 표가 바뀐 경우 등)
+    current = {Path(shard[key]).name for shard in shards for key in ("url", "search") if key in shard}
+    for path in SHARD_DIR.glob("*.json*"):
+        if path.name.split(".json")[0] + ".json" not in current:
+            path.unlink()
+
+    manifest = {"version": 1, "meta": meta, "shards": shards}
+    manifest_path = OUT_DIR / "manifest.json"
+    write_json_output(manifest_path, manifest, compact)
+    return manifest_path
+
+
+def write_image_bundles(questions: list[dict], compact: bool = False) -> tuple[Path, dict]:
+    """과목별로 이미지 파일을 이어 붙인 묶음(bundles/{과목}.bin)과 색인(bundles.json) 저장.
+    이미지는 처음 참조한 문제의 과목 묶음에 한 번만, 문제 순서대로 넣는다 (과목을 차례로
+    풀 때 앞에서부터 읽힘). 색인의 images는 "images/..." → [bundles 인덱스, 오프셋, 길이]로,
+    클라이언트는 과목 묶음을 한 번에 받거나 HTTP Range로 이미지 하나만 받는다.
+    images/의 개별 파일은 그대로 두어 묶음을 못 쓰는 경우의 대체 경로로 사용.
+    Returns: (색인 경로, 색인)"""
+    groups: dict[str, list[str]] = {}
+    seen: set[str] = set()
+    for q in questions:
+        for img in q["images"]:
+            if img not in seen:
+                seen.add(img)
+                groups.setdefault(q["subject"], []).append(img)
+
+    BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+    bundles = []
+    images: dict[str, list[int]] = {}
+    for subject, refs in groups.items():
+        parts = []
+        offset = 0
+        for img in refs:
+            data = (OUT_DIR / img).read_bytes()
+            images[img] = [len(bundles), offset, len(data)]
+            parts.append(data)
+            offset += len(data)
+        blob = b"".join(parts)
+        path = BUNDLE_DIR / f"{subject}.bin"
+        write_atomic(path, blob)
+        bundles.append({
+            "subject": subject,
+            "url": path.relative_to(OUT_DIR).as_posix(),
+            "count": len(refs),
+            "bytes": len(blob),
+            "sha256": hashlib.sha256(blob).hexdigest(),
+        })
+
+    # 이번 빌드에 없는 과목의 묶음 삭제
+    current = {Path(bundle["url"]).name for bundle in bundles}
+    for path in BUNDLE_DIR.glob("*.bin"):
+        if path.name not in current:
+            path.unlink()
+
+    index = {"version": 1, "bundles": bundles, "images": images}
+    index_path = OUT_DIR / "bundles.json"
+    write_json_output(index_path, index, compact)
+    return index_path, index
+
+
+def validate(questions: list[dict], expected: list[int] | None = None) -> int:
+    """결과 검증. expected: 기대 ID 목록 (기본: 1부터 연속)"""
     print(f"\n{'='*60}")
     print("검증")
     print(f"{'='*60}")
@@ -456,7 +1996,8 @@ def validate(questions: list[dict]) -> int:
     issues = 0
 
     ids = [q["id"] for q in questions]
-    expected = list(range(1, len(questions) + 1))
+    if expected is None:
+        expected = list(range(1, len(questions) + 1))
     if ids != expected:
         print(f"  ID 불연속!")
         missing = set(expected) - set(ids)
@@ -504,23 +2045,947 @@ def validate(questions: list[dict]) -> int:
     return issues
 
 
-def main():
-    IMG_DIR.mkdir(parents=True, exist_ok=True)
+def run_batch(
+    days: list[dict], out_path: Path, process, near_dup: bool = False, question_stats: dict[int, dict] | None = None
+) -> int:
+    """코퍼스 배치: 일차마다 처리한 문제를 JSON Lines로 바로 쓰고 메모리에서 버림.
+    메모리 사용은 가장 큰 PDF 하나 분량으로 제한된다. 메타는 {out}.meta.json에 기록.
+    question_stats(load_question_stats 결과)가 주어지면 각 문제에 stats를 붙여 씀.
+    near_dup이면 일차마다 MinHash 서명(문제당 NUM_PERM x 4바이트)만 모아 두었다가
+    끝에 군집을 구하고, 임시 파일을 한 줄씩 다시 쓰며 duplicateGroup을 붙인다.
+    Returns: 이슈 수"""
+    counts: list[int] = []
+    referenced: set[str] = set()
+    issues = 0
+    keys: list[dict] = []
+    signatures: list = []
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for spec in days:
+            questions = process(spec)
+            issues += validate(questions, expected_ids(spec, len(questions)))
+            if question_stats:
+                questions = attach_question_stats(questions, question_stats)
+            for q in questions:
+                f.write(json.dumps(q, ensure_ascii=False) + "\n")
+            counts.append(len(questions))
+            referenced |= referenced_image_names(questions)
+            if near_dup:
+                with profile_stage("near_duplicates", spec["id"]):
+                    signatures.append(question_signatures(questions))
+                keys += [{k: q[k] for k in ("id", "day", "subject", "originalNumber")} for q in questions]
+
+    if near_dup:
+        with profile_stage("near_duplicates"):
+            clusters = near_duplicates.cluster_questions(keys, *near_duplicates.stack_signatures(signatures))
+            groups = near_duplicates.duplicate_groups(clusters)
+            if groups:
+                grouped = tmp.with_name(f"{tmp.name}.groups")
+                with open(tmp, encoding="utf-8") as src, open(grouped, "w", encoding="utf-8") as dst:
+                    for line in src:
+                        q = json.loads(line)
+                        if q["id"] in groups:
+                            q["duplicateGroup"] = groups[q["id"]]
+                            line = json.dumps(q, ensure_ascii=False) + "\n"
+                        dst.write(line)
+                os.replace(grouped, tmp)
+        write_duplicate_report(out_path.with_name(f"{out_path.stem}.duplicates.json"), clusters, len(keys))
+    else:
+        stale_report = out_path.with_name(f"{out_path.stem}.duplicates.json")
+        if stale_report.exists():
+            stale_report.unlink()
+            print(f"이전 실행의 유사 문제 보고서 삭제: {stale_report}")
+    os.replace(tmp, out_path)
+
+    meta = build_meta(days, counts)
+    meta_path = out_path.with_name(f"{out_path.stem}.meta.json")
+    write_json_output(meta_path, meta)
+    removed = prune_unreferenced_images(referenced)
+    if removed:
+        print(f"참조되지 않는 이미지 {removed}개 삭제")
+    print(f"\n저장 완료: {out_path} ({sum(counts)}문제, {len(days)}개 일차, {out_path.stat().st_size / 1024:.1f} KB)")
+    print(f"메타 저장: {meta_path}")
+    return issues
+
+
+# ─── 해시 파일명 (--hashed-assets) ───────────────────────────────
+# 내용 해시가 들어간 이름은 내용이 바뀌면 이름도 바뀌므로 CDN/서비스 워커가 immutable로
+# 캐시할 수 있다. 클라이언트는 고정 이름의 assets.json만 재검증하고 바뀐 파일만 새로 받는다.
+
+ASSET_HASH_LEN = 12  # 파일 이름에 넣는 sha256 hex 길이
+
+
+def hashed_name(path: Path, digest: str) -> str:
+    """x.w320.webp → x.w320.{해시}.webp"""
+    return f"{path.stem}.{digest[:ASSET_HASH_LEN]}{path.suffix}"
+
+
+def rewrite_refs(obj, urls: dict[str, str]):
+    """JSON 값과 객체 키 중 data/ 기준 경로와 정확히 같은 문자열을 해시 경로로 바꾼 사본."""
+    if isinstance(obj, str):
+        return urls.get(obj, obj)
+    if isinstance(obj, list):
+        return [rewrite_refs(v, urls) for v in obj]
+    if isinstance(obj, dict):
+        return {urls.get(k, k): rewrite_refs(v, urls) for k, v in obj.items()}
+    return obj
+
+
+def write_hashed_assets(files: list[Path], documents: list[Path], compact: bool = False) -> tuple[Path, dict, int]:
+    """이번 빌드 출력의 해시 이름 사본을 assets/에 저장하고 매니페스트(assets.json) 작성.
+    files: 그대로 복사할 파일 (이미지/변형/이미지 묶음)
+    documents: 안의 경로를 해시 경로로 바꿔 저장할 JSON — 참조되는 쪽이 먼저 오도록
+               (샤드 → manifest.json 등). data/ 바로 아래 문서는 entries에 기록.
+    고정 이름 출력은 그대로 두고, 이전 빌드의 해시 파일은 삭제.
+    Returns: (매니페스트 경로, 매니페스트, 삭제한 파일 수)"""
+    urls: dict[str, str] = {}
+    assets = []
+    for path in files:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        target = ASSET_DIR / hashed_name(path, digest)
+        if not target.exists():  # 이름이 같으면 내용도 같음
+            write_atomic(target, data)
+        name = path.relative_to(OUT_DIR).as_posix()
+        urls[name] = target.relative_to(OUT_DIR).as_posix()
+        assets.append({"url": urls[name], "bytes": len(data), "sha256": digest})
+
+    entries = {}
+    for path in documents:
+        obj = rewrite_refs(json.loads(path.read_bytes()), urls)
+        data = dump_json(obj, compact)
+        digest = hashlib.sha256(data).hexdigest()
+        target = ASSET_DIR / hashed_name(path, digest)
+        write_json_output(target, obj, compact)
+        name = path.relative_to(OUT_DIR).as_posix()
+        urls[name] = target.relative_to(OUT_DIR).as_posix()
+        if path.parent == OUT_DIR:
+            entries[name] = urls[name]
+        assets.append({"url": urls[name], "bytes": len(data), "sha256": digest})
+
+    # 이전 빌드의 해시 파일 삭제 (.gz/.br은 원본 이름 기준)
+    current = {Path(asset["url"]).name for asset in assets}
+    removed = 0
+    for path in ASSET_DIR.iterdir():
+        if path.name.removesuffix(".gz").removesuffix(".br") not in current:
+            path.unlink()
+            removed += 1
+
+    manifest = {"version": 1, "entries": entries, "assets": assets}
+    manifest_path = OUT_DIR / "assets.json"
+    write_json_output(manifest_path, manifest, compact)
+    return manifest_path, manifest, removed
+
+
+# ─── 빌드 간 변경분 (--delta) ────────────────────────────────────
+# 이전 빌드의 questions.json과 비교해 추가/삭제/변경 문제(바뀐 필드만)를 패치로 저장.
+# 저장된 사본의 version에서 시작하는 패치 사슬이 있으면 클라이언트는 패치만 받고,
+# 사슬이 끊겼거나(DELTA_CHAIN_MAX보다 오래됨) 사본이 없으면 전체를 다시 받는다.
+
+DELTA_VERSION = 1
+DELTA_CHAIN_MAX = 10  # patches/index.json에 남길 최근 패치 수
+
+
+def decode_strings(data: dict) -> list[dict]:
+    """encode_strings의 역변환."""
+    strings = data["strings"]
+
+    def decode(v):
+        return strings[v] if isinstance(v, int) else v
+
+    return [
+        {**q, **{field: decode(q[field]) for field in DICT_FIELDS}, "choices": [decode(c) for c in q["choices"]]}
+        for q in data["questions"]
+    ]
+
+
+def bank_version(meta: dict, questions: list[dict]) -> str:
+    """meta + 문제 내용의 해시 (--dict-encode/--compact 여부와 무관)."""
+    return hashlib.sha256(dump_json({"meta": meta, "questions": questions}, compact=True)).hexdigest()[:16]
+
+
+def load_previous_bank(path: Path) -> tuple[str, dict, list[dict]] | None:
+    """덮어쓰기 전의 questions.json. Returns: (version, meta, 문제 목록) — 없거나 읽을 수 없으면 None"""
+    try:
+        data = json.loads(path.read_bytes())
+        questions = decode_strings(data) if "strings" in data else data["questions"]
+        return data.get("version") or bank_version(data["meta"], questions), data["meta"], questions
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def question_key(q: dict) -> tuple[int, str, int]:
+    return q["id"], q["day"], q["originalNumber"]
+
+
+def diff_questions(old: list[dict], new: list[dict]) -> dict:
+    """id/day/originalNumber가 같은 문제끼리 비교 (사전 한 번 — 문제 수에 선형).
+    Returns: {"added": [문제], "removed": [id], "changed": [{"id", "set": {바뀐 필드}, "unset"?: [없어진 필드]}],
+              "order"?: [id]} — order는 (남은 문제 + added) 순서가 새 순서와 다를 때만"""
+    remaining = {question_key(q): q for q in old}
+    added = []
+    changed = []
+    for q in new:
+        prev = remaining.pop(question_key(q), None)
+        if prev is None:
+            added.append(q)
+            continue
+        if prev == q:
+            continue
+        change = {"id": q["id"], "set": {k: v for k, v in q.items() if k not in prev or prev[k] != v}}
+        unset = [k for k in prev if k not in q]
+        if unset:
+            change["unset"] = unset
+        changed.append(change)
+
+    patch = {"added": added, "removed": [q["id"] for q in remaining.values()], "changed": changed}
+    removed = set(patch["removed"])
+    kept = [q["id"] for q in old if q["id"] not in removed]
+    order = [q["id"] for q in new]
+    if kept + [q["id"] for q in added] != order:
+        patch["order"] = order
+    return patch
+
+
+def apply_patch(questions: list[dict], patch: dict) -> list[dict]:
+    """diff_questions의 패치 적용 (src/data/questionLoader.ts의 applyPatch와 같은 규칙)."""
+    removed = set(patch["removed"])
+    changes = {c["id"]: c for c in patch["changed"]}
+    result = []
+    for q in questions:
+        if q["id"] in removed:
+            continue
+        change = changes.get(q["id"])
+        if change:
+            q = {k: v for k, v in q.items() if k not in change.get("unset", ())} | change["set"]
+        result.append(q)
+    result += patch["added"]
+    if "order" in patch:
+        by_id = {q["id"]: q for q in result}
+        result = [by_id[i] for i in patch["order"]]
+    return result
+
+
+def write_delta(
+    previous: tuple[str, dict, list[dict]] | None, meta: dict, questions: list[dict], version: str,
+    compact: bool = False,
+) -> tuple[Path, dict | None]:
+    """이전 빌드 → 이번 빌드 패치(patches/{이전}-{이번}.json)를 쓰고 사슬 색인(patches/index.json) 갱신.
+    색인의 마지막 패치가 이전 빌드에서 끝나지 않으면(--delta 없이 빌드한 경우 등) 사슬을 새로 시작.
+    Returns: (색인 경로, 이번 패치 — 내용이 같으면 None)"""
+    index_path = PATCH_DIR / "index.json"
+    try:
+        index = json.loads(index_path.read_bytes())
+    except (OSError, ValueError):
+        index = {}
+    chain = index.get("patches", []) if previous is not None and index.get("current") == previous[0] else []
+
+    patch = None
+    if previous is not None and previous[0] != version:
+        prev_version, prev_meta, prev_questions = previous
+        patch = {"version": DELTA_VERSION, "from": prev_version, "to": version}
+        patch.update(diff_questions(prev_questions, questions))
+        if prev_meta != meta:
+            patch["meta"] = meta
+        path = PATCH_DIR / f"{prev_version}-{version}.json"
+        write_json_output(path, patch, compact)
+        chain = [*chain, {
+            "from": prev_version,
+            "to": version,
+            "url": path.relative_to(OUT_DIR).as_posix(),
+            "bytes": path.stat().st_size,
+        }][-DELTA_CHAIN_MAX:]
+
+    # 사슬에서 빠진 패치 삭제
+    PATCH_DIR.mkdir(parents=True, exist_ok=True)
+    current = {Path(entry["url"]).name for entry in chain}
+    for path in PATCH_DIR.glob("*.json*"):
+        if path.name.split(".json")[0] + ".json" not in current | {index_path.name}:
+            path.unlink()
+
+    write_json_output(index_path, {"version": DELTA_VERSION, "current": version, "patches": chain}, compact)
+    return index_path, patch
+
+
+# ─── 감시 모드 (--watch) ────────────────────────────────────────
+# PDF/설정 파일을 주기적으로 확인해, 바뀐 PDF는 페이지 해시를 직전 결과와 비교하고
+# 바뀐 페이지만 다시 스캔한다. 문제는 원문과 이미지 xref 내용이 바뀐 것만 다시 파싱하고
+# 그 문제의 이미지만 다시 변환하며, questions.json 등은 write_atomic으로 교체한다.
+
+WATCH_INTERVAL = 1.0  # 초
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def xref_digest(doc: fitz.Document, xref: int) -> str:
+    h = hashlib.sha256(doc.xref_object(xref, compressed=True).encode())
+    h.update(doc.xref_stream_raw(xref) or b"")
+    return h.hexdigest()
+
+
+def page_digest(doc: fitz.Document, page: fitz.Page) -> str:
+    """페이지 객체 + 내용 스트림 + 이미지 xref 내용의 해시 (텍스트 추출 없이 계산)."""
+    h = hashlib.sha256(doc.xref_object(page.xref, compressed=True).encode())
+    h.update(page.read_contents())
+    for xref, *_ in page.get_images(full=True):
+        h.update(xref_digest(doc, xref).encode())
+    return h.hexdigest()
+
+
+def image_owner_prefix(spec: dict, q_num: int) -> str:
+    """QuestionImageWriter가 이 문제 이미지에 붙이는 경로 접두사."""
+    return f"images/{spec['imagePrefix']}_q{q_num:03d}_"
+
+
+class WatchedDay:
+    """--watch에서 일차 하나의 직전 처리 결과.
+    페이지별 해시/스캔 결과와 문제별 키(원문 + 이미지 xref 내용 해시)를 기억해 두고,
+    update()에서 바뀐 페이지만 다시 스캔하고 키가 바뀐 문제만 다시 파싱/이미지 변환.
+    이미지 중복 제거로 다른 문제가 다시 쓰일 파일을 참조하고 있으면 그 문제도 함께 다시 처리."""
+
+    def __init__(self, spec: dict, threads: int = 1, cache_dir: Path | None = None):
+        self.spec = spec
+        self.threads = threads
+        self.cache_dir = cache_dir
+        self.signature: tuple[int, int] | None = None  # 마지막으로 처리한 (크기, 수정 시각)
+        self.pending: tuple[int, int] | None = None  # 쓰기가 끝났는지 확인 중인 값
+        self.page_digests: list[str] = []
+        self.pages: list[tuple[str, list, list]] = []  # 페이지별 scan_pages 결과
+        self.items: dict[int, tuple[str, list[tuple[int, int, int]]]] = {}  # q_num → (원문, 이미지)
+        self.keys: dict[int, str] = {}
+        self.questions: list[dict] = []
+        self.image_digests: dict[str, str] = {}  # 참조 이미지 경로 → 내용 해시
+
+    def settled_change(self) -> bool:
+        """PDF가 직전 처리 이후 바뀌었고 두 번 연속 같은 크기/시각이면(쓰기 완료) True."""
+        sig = file_signature(self.spec["pdf"])
+        if sig is None or sig == self.signature:
+            self.pending = None
+            return False
+        if sig != self.pending:
+            self.pending = sig
+            return False
+        return True
+
+    def rescan(self, doc: fitz.Document) -> int:
+        """페이지 해시를 비교해 바뀐 페이지만 scan_pages. 페이지 수가 바뀌면 전부.
+        Returns: 다시 스캔한 페이지 수"""
+        digests = [page_digest(doc, page) for page in doc]
+        if len(digests) != len(self.page_digests):
+            self.pages = [None] * len(digests)
+            changed = range(len(digests))
+        else:
+            changed = [i for i, (a, b) in enumerate(zip(digests, self.page_digests)) if a != b]
+        for i in changed:
+            self.pages[i] = scan_pages(doc, i, i + 1)
+        self.page_digests = digests
+        return len(changed)
+
+    def split(self, doc: fitz.Document) -> tuple[dict[int, tuple[str, list]], dict[int, str]]:
+        """스캔 결과로 문제를 분할하고 이미지를 배정. Returns: (items, keys)"""
+        full_text = "".join(text for text, _, _ in self.pages)
+        anchors = [a for _, page_anchors, _ in self.pages for a in page_anchors]
+        img_positions = [p for _, _, page_images in self.pages for p in page_images]
+        raw_questions = split_questions(full_text, self.spec["expectedCount"])
+        q_numbers = [n for n, _ in raw_questions]
+        report_question_count(q_numbers, self.spec["expectedCount"])
+        image_map = assign_images_to_questions(build_question_positions(anchors, q_numbers), img_positions, q_numbers)
+
+        items: dict[int, tuple[str, list]] = {}
+        keys: dict[int, str] = {}
+        xref_digests: dict[int, str] = {}
+        for q_num, q_raw in raw_questions:
+            images = image_map.get(q_num, [])
+            h = hashlib.sha256(q_raw.encode())
+            for xref, w, h_ in images:
+                if xref not in xref_digests:
+                    xref_digests[xref] = xref_digest(doc, xref)
+                h.update(f"{xref_digests[xref]}:{w}:{h_}".encode())
+            items[q_num] = (q_raw, images)
+            keys[q_num] = h.hexdigest()
+        return items, keys
+
+    def update(self, pdf_changed: bool, dirty: set[str], shared_images: dict[str, str]) -> set[str]:
+        """pdf_changed이면 다시 스캔/분할. 키가 바뀐 문제와 dirty(앞 일차에서 다시 쓴 이미지
+        접두사)나 이번에 다시 쓸 이미지를 참조하는 문제만 다시 처리. 나머지 문제의 이미지는
+        shared_images에 등록해 다음 중복 제거가 참조하도록 함.
+        Returns: 이번에 다시 쓴 이미지 경로 접두사"""
+        day = self.spec["id"]
+        doc = None
+        items, keys = self.items, self.keys
+        if pdf_changed:
+            doc = fitz.open(str(self.spec["pdf"]))
+            with profile_stage("scan", day):
+                rescanned = self.rescan(doc)
+                items, keys = self.split(doc)
+            print(f"  페이지 {rescanned}/{len(self.pages)}개 다시 스캔")
+
+        previous = {q["originalNumber"]: q for q in self.questions}
+        redo = {n for n in items if keys[n] != self.keys.get(n) or n not in previous}
+        owned = {image_owner_prefix(self.spec, n) for n in redo}
+        for n in items:
+            if n not in redo and any(img.startswith(tuple(dirty | owned)) for img in previous[n]["images"]):
+                redo.add(n)
+        if not redo:
+            if doc is not None:
+                doc.close()
+            self.items, self.keys = items, keys
+            self.questions = [previous[n] for n in items]
+            self.register(shared_images)
+            return set()
+
+        if doc is None:
+            doc = fitz.open(str(self.spec["pdf"]))
+        kept = [previous[n] for n in items if n not in redo]
+        for q in kept:
+            for img in q["images"]:
+                shared_images.setdefault(self.image_digests[img], img)
+
+        writer = QuestionImageWriter(doc, self.spec["imagePrefix"], self.threads, self.cache_dir, day)
+        try:
+            with profile_stage("parse", day):
+                rebuilt = {n: build_question(self.spec, n, items[n][0], writer.save(n, items[n][1])) for n in sorted(redo)}
+        finally:
+            writer.close()
+            doc.close()
+        digests = dedupe_images(list(rebuilt.values()), shared_images)
+
+        self.items, self.keys = items, keys
+        self.questions = [rebuilt.get(n) or previous[n] for n in items]
+        self.image_digests = {img: d for img, d in self.image_digests.items() if any(img in q["images"] for q in kept)}
+        self.image_digests.update(digests)
+        print(f"  {day}: 문제 {len(redo)}/{len(items)}개 다시 파싱")
+        return {image_owner_prefix(self.spec, n) for n in redo}
+
+    def register(self, shared_images: dict[str, str]) -> None:
+        for q in self.questions:
+            for img in q["images"]:
+                shared_images.setdefault(self.image_digests[img], img)
+
+
+def watch(args: argparse.Namespace, cache_dir: Path | None, encode_threads: int) -> None:
+    """처음에 전체를 빌드한 뒤 PDF/설정 파일이 바뀔 때마다 바뀐 문제만 다시 처리해 출력 갱신.
+    설정 파일이 바뀌면 일차 구성이 달라질 수 있으므로 처음부터 다시 빌드.
+    재빌드가 실패하면(편집 프로그램이 아직 쓰는 중인 PDF 등) 다음 변경 때 처음부터 다시 빌드.
+    Ctrl+C로 종료."""
+    config_signature = None
+    reload = True
+    stale = False
+    watched: list[WatchedDay] = []
+    print(f"감시 시작 (Ctrl+C로 종료, {args.watch_interval:g}초 간격)")
+    try:
+        while True:
+            if args.config and file_signature(args.config) != config_signature:
+                config_signature = file_signature(args.config)
+                reload = True
+            if reload:
+                reload = False
+                try:
+                    days = load_corpus(args.config)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"설정 오류 (수정될 때까지 대기): {e}")
+                    watched = []
+                else:
+                    watched = [WatchedDay(spec, encode_threads, cache_dir) for spec in days]
+                changed = [True] * len(watched)
+            else:
+                changed = [wd.settled_change() for wd in watched]
+                if stale and any(changed):
+                    watched = [WatchedDay(wd.spec, encode_threads, cache_dir) for wd in watched]
+                    changed = [True] * len(watched)
+
+            if any(changed):
+                t0 = time.perf_counter()
+                try:
+                    rebuild_watched(args, watched, changed, cache_dir, encode_threads)
+                except (RuntimeError, ValueError, OSError) as e:
+                    print(f"재빌드 실패 (다음 변경 때 다시 시도): {e}")
+                    for wd in watched:
+                        wd.signature = file_signature(wd.spec["pdf"])
+                    stale = True
+                else:
+                    print(f"갱신 완료 ({time.perf_counter() - t0:.2f}초), 변경 대기 중...")
+                    stale = False
+            time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        print("\n감시 종료")
+
+
+def rebuild_watched(
+    args: argparse.Namespace, watched: list[WatchedDay], changed: list[bool], cache_dir: Path | None, threads: int
+) -> None:
+    """앞 일차부터 update하며 다시 쓴 이미지 접두사를 뒤 일차로 넘긴 뒤,
+    문제 목록이 달라졌으면 출력 전체를 씀."""
+    shared_images: dict[str, str] = {}
+    dirty: set[str] = set()
+    before = [wd.questions for wd in watched]
+    for wd, pdf_changed in zip(watched, changed):
+        signature = file_signature(wd.spec["pdf"])
+        if pdf_changed:
+            print(f"\n변경 감지: {wd.spec['pdf'].name} ({wd.spec['id']})")
+        dirty |= wd.update(pdf_changed, dirty, shared_images)
+        if pdf_changed:
+            wd.signature = signature
+    if [wd.questions for wd in watched] == before:
+        print("문제 변경 없음 (출력 유지)")
+        return
+    write_outputs(args, [wd.spec for wd in watched], [wd.questions for wd in watched], cache_dir, threads)
+
+
+# ─── 라이브러리 API ──────────────────────────────────────────────
+# 수집 서비스 등에서 subprocess 없이 PDF 하나를 파싱:
+#     from extract_questions import extract, export, JsonLinesWriter
+#     questions = extract("시험.pdf", {"id": "day1", "expectedCount": 124, "subjects": [...]})
+#     export(questions, JsonLinesWriter(Path("out.jsonl")))
+# import만으로는 PyMuPDF/Pillow를 불러오지 않고 sys.stdout도 건드리지 않는다.
+
+QUESTION_FIELDS = (
+    # (속성, questions.json 필드)
+    ("id", "id"),
+    ("day", "day"),
+    ("original_number", "originalNumber"),
+    ("subject", "subject"),
+    ("question_text", "questionText"),
+    ("images", "images"),
+    ("choices", "choices"),
+    ("answer", "answer"),
+    ("explanation", "explanation"),
+    ("is_ox", "isOX"),
+)
+
+
+@dataclass(slots=True)
+class Question:
+    """questions.json 항목 하나. __slots__라 문제마다 dict를 두지 않는다 (큰 코퍼스용)."""
+
+    id: int
+    day: str
+    original_number: int
+    subject: str
+    question_text: str
+    images: list[str]
+    choices: list[str]
+    answer: int
+    explanation: str
+    is_ox: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Question:
+        """questions.json 항목에서 생성 (duplicateGroup 등 추가 필드는 무시)."""
+        return cls(*(data[key] for _, key in QUESTION_FIELDS))
+
+    def to_dict(self) -> dict:
+        """questions.json 항목 (build_question과 같은 필드 순서)."""
+        return {key: getattr(self, attr) for attr, key in QUESTION_FIELDS}
+
+
+def day_spec(pdf: str | os.PathLike, config: dict) -> dict:
+    """exams.json의 일차 항목(id, expectedCount, subjects 필수)과 PDF 경로로 make_day 설정 생성.
+    idOffset은 기본 0, imagePrefix는 기본 id."""
+    return make_day(
+        config["id"],
+        config.get("name", config["id"]),
+        Path(pdf),
+        config["expectedCount"],
+        config.get("idOffset", 0),
+        config.get("imagePrefix", config["id"]),
+        config["subjects"],
+        config.get("oxRanges", []),
+        config.get("exam"),
+    )
+
+
+def extract(
+    pdf: str | os.PathLike,
+    config: dict,
+    *,
+    image_dir: Path | None = None,
+    cache_dir: Path | None = None,
+    encode_threads: int = 1,
+) -> Iterator[Question]:
+    """PDF 하나를 페이지 순서대로 읽으며 완성된 문제부터 내보냄 (--stream과 같은 분할/파싱).
+    config: exams.json의 일차 항목 (day_spec 참고).
+    image_dir가 주어지면 이미지를 그 폴더에 저장하고 images에 "images/{이름}"을 넣는다.
+    None이면 이미지를 저장하지 않는다 (images는 빈 목록).
+    encode_threads > 1이면 이미지 변환이 뒤에서 진행되므로 파일은 반복이 끝나야 모두 완성된다.
+    PDF 간 이미지 공유(dedupe_images)와 PDF 캐시 기록은 CLI 빌드에서만 한다."""
+    spec = day_spec(pdf, config)
+    doc = fitz.open(str(spec["pdf"]))
+    writer = None
+    if image_dir is not None:
+        image_dir.mkdir(parents=True, exist_ok=True)
+        writer = QuestionImageWriter(doc, spec["imagePrefix"], encode_threads, cache_dir, spec["id"], image_dir)
+    try:
+        for q_num, q_raw, _pages, image_items in iter_questions(doc, spec["expectedCount"]):
+            images = writer.save(q_num, image_items) if writer is not None else []
+            yield Question.from_dict(build_question(spec, q_num, q_raw, images))
+    finally:
+        if writer is not None:
+            writer.close()
+        doc.close()
+
+
+class QuestionWriter(Protocol):
+    """export()에 넘길 출력. write/close만 있으면 어떤 객체든 사용 가능."""
+
+    def write(self, question: Question) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class JsonLinesWriter:
+    """문제를 한 줄에 하나씩 기록 (--jsonl과 같은 형식)."""
 
-    day1_questions = process_pdf(DAY1_PDF, "day1", 0, 124)
-    day2_questions = process_pdf(DAY2_PDF, "day2", 124, 89)
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, "w", encoding="utf-8")
 
-    all_questions = day1_questions + day2_questions
-    meta = build_meta(len(day1_questions), len(day2_questions))
-    issues = validate(all_questions)
+    def write(self, question: Question) -> None:
+        self.file.write(json.dumps(question.to_dict(), ensure_ascii=False) + "\n")
 
-    output = {"meta": meta, "questions": all_questions}
+    def close(self) -> None:
+        self.file.close()
+
+
+class QuestionsJsonWriter:
+    """모아 두었다가 close()에서 questions.json 형식({"meta", "questions"})으로 저장.
+    meta는 build_meta로 만든 일차/과목 정보 (없으면 빈 객체)."""
+
+    def __init__(self, path: Path, meta: dict | None = None, compact: bool = False):
+        self.path = path
+        self.meta = meta or {}
+        self.compact = compact
+        self.questions: list[dict] = []
+
+    def write(self, question: Question) -> None:
+        self.questions.append(question.to_dict())
+
+    def close(self) -> None:
+        write_json_output(self.path, {"meta": self.meta, "questions": self.questions}, self.compact)
+
+
+def export(questions: Iterable[Question], *writers: QuestionWriter) -> int:
+    """문제마다 모든 writer에 넘기고, 끝나면(예외가 나도) writer를 닫음.
+    Returns: 문제 수"""
+    count = 0
+    try:
+        for question in questions:
+            for writer in writers:
+                writer.write(question)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 문제집 → questions.json + 이미지")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="병렬 처리 프로세스 수 (기본 1 = 직렬, 0 = CPU 코어 수)",
+    )
+    parser.add_argument(
+        "--encode-threads", type=int, default=0,
+        help="직렬 모드에서 이미지 변환 스레드 수 (기본 0 = CPU 코어 수)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="증분 빌드 캐시를 쓰지 않고 전부 다시 생성")
+    parser.add_argument(
+        "--shards", action="store_true",
+        help="questions.json과 함께 manifest.json + 일차/과목별 샤드(shards/*.json)도 생성",
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="JSON을 최소화하고 최대 압축 .gz/.br 파일도 함께 생성 (.br은 brotli 패키지 필요)",
+    )
+    parser.add_argument(
+        "--dict-encode", action="store_true",
+        help="반복 문자열(일차/과목 id, 이미지 선지 문구)을 strings 표 인덱스로 치환",
+    )
+    parser.add_argument(
+        "--search-index", action="store_true",
+        help="검색 색인 search.json 생성 (--shards와 함께 쓰면 샤드별 색인도 생성)",
+    )
+    parser.add_argument(
+        "--near-duplicates", action="store_true",
+        help="MinHash/LSH로 유사 문제를 묶어 duplicateGroup 필드와 duplicates.json 보고서 생성 (numpy 필요)",
+    )
+    parser.add_argument(
+        "--image-bundles", action="store_true",
+        help="과목별 이미지 묶음(bundles/*.bin)과 오프셋 색인(bundles.json) 생성 (개별 파일도 유지)",
+    )
+    parser.add_argument(
+        "--progress-stats", type=Path, metavar="STATS_JSON",
+        help="scripts/progress_stats.py 집계 결과의 문제별 통계(시도/정답률/난이도/선택 분포)를 stats로 병합",
+    )
+    parser.add_argument(
+        "--delta", action="store_true",
+        help="이전 빌드 대비 변경분 패치(patches/)와 사슬 색인 생성, questions.json에 version 기록 "
+        "(--hashed-assets와 함께 사용 불가)",
+    )
+    parser.add_argument(
+        "--hashed-assets", action="store_true",
+        help="출력의 내용 해시 이름 사본(assets/)과 매니페스트(assets.json) 생성 (immutable 캐시용)",
+    )
+    parser.add_argument(
+        "--variants", action="store_true",
+        help="작은 폭/WebP/AVIF 이미지 변형을 만들고 images[]에 크기/placeholder 정보 기록",
+    )
+    parser.add_argument(
+        "--vector-figures", action="store_true",
+        help="get_images에 없는 벡터 그림(심전도/그래프/표)을 찾아 그 영역만 렌더링해 images[]에 추가",
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="페이지를 하나씩 읽으며 완성된 문제부터 파싱/이미지 저장 (직렬 전용, 메모리 사용량 고정)",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="PDF/설정 파일 변경을 감시하며 바뀐 문제만 다시 처리해 출력 갱신 (직렬 전용, Ctrl+C로 종료)",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=WATCH_INTERVAL,
+        help=f"--watch의 변경 확인 간격 초 (기본 {WATCH_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--config", type=Path,
+        help="시험/일차/과목 범위/OX 범위 설정 JSON (기본: data/의 1일차/2일차, scripts/exams.example.json 참고)",
+    )
+    parser.add_argument(
+        "--jsonl", type=Path,
+        help="코퍼스 배치 모드: 일차마다 문제를 이 JSON Lines 파일에 바로 기록 (메타는 .meta.json)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="단계/PDF/이미지별 시간·메모리·바이트를 questions.profile.json에 기록",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=PROFILE_TOP,
+        help=f"보고서에 남길 가장 느린 문제/이미지 수 (기본 {PROFILE_TOP})",
+    )
+    parser.add_argument(
+        "--cprofile", action="store_true",
+        help="--profile과 함께 cProfile 결과도 .prof로 저장 (python -m pstats로 확인)",
+    )
+    args = parser.parse_args()
+    if args.stream and args.workers != 1:
+        parser.error("--stream은 --workers 1(직렬)에서만 사용 가능")
+    if args.watch and (args.workers != 1 or args.stream or args.jsonl):
+        parser.error("--watch는 --workers 1(직렬)에서만, --stream/--jsonl 없이 사용 가능")
+    if args.jsonl:
+        # 배치 모드는 questions.json을 쓰지 않으므로 그 결과물에 붙는 옵션은 적용할 곳이 없음
+        ignored = [
+            flag for flag, on in (
+                ("--variants", args.variants), ("--shards", args.shards),
+                ("--search-index", args.search_index), ("--image-bundles", args.image_bundles),
+                ("--hashed-assets", args.hashed_assets), ("--delta", args.delta),
+                ("--compact", args.compact), ("--dict-encode", args.dict_encode),
+            ) if on
+        ]
+        if ignored:
+            parser.error(f"--jsonl 배치 모드에서는 {', '.join(ignored)}을(를) 사용할 수 없음")
+    if args.delta and args.hashed_assets:
+        # 패치와 version은 해시 전 경로 기준이라, 해시 이름 이미지를 참조하는 사본에 적용하면 어긋남
+        # (내용만 바뀐 이미지는 패치에 나타나지도 않아 지워진 해시 파일을 계속 참조)
+        parser.error("--delta는 --hashed-assets와 함께 사용할 수 없음")
+    if args.vector_figures and (args.stream or args.watch):
+        parser.error("--vector-figures는 --stream/--watch와 함께 사용할 수 없음")
+    if args.near_duplicates and near_duplicates is None:
+        parser.error("--near-duplicates에는 numpy가 필요 (pip install numpy)")
+    if not (args.profile or args.cprofile):
+        build(args)
+        return
+
+    start_profile()
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with profile_stage("total"):
+            build(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+    if args.jsonl:
+        report_path = args.jsonl.with_name(f"{args.jsonl.stem}.profile.json")
+    else:
+        report_path = OUT_DIR / "questions.profile.json"
+    report = profile_report(args.profile_top)
+    write_json_output(report_path, report)
+    print_profile_summary(report)
+    print(f"프로파일 저장: {report_path}")
+    if profiler is not None:
+        prof_path = report_path.with_suffix(".prof")
+        profiler.dump_stats(prof_path)
+        print(f"cProfile 저장: {prof_path}")
+
+
+def build(args: argparse.Namespace) -> None:
+    """main의 인자대로 추출부터 출력까지 실행."""
+    cache_dir = None if args.no_cache else CACHE_DIR
+    workers = args.workers or os.cpu_count() or 1
+    encode_threads = args.encode_threads or os.cpu_count() or 1
+    days = load_corpus(args.config)
+
+    IMG_DIR.mkdir(parents=True, exist_ok=True)
+    if args.watch:
+        watch(args, cache_dir, encode_threads)
+        return
+    shared_images: dict[str, str] = {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def process(spec: dict) -> list[dict]:
+        with profile_stage("pdf", spec["id"]):
+            return process_pdf(
+                spec, pool, workers, encode_threads, cache_dir, shared_images, args.stream, args.vector_figures
+            )
+
+    try:
+        if args.jsonl:
+            question_stats = load_question_stats(args.progress_stats) if args.progress_stats else None
+            issues = run_batch(days, args.jsonl, process, args.near_duplicates, question_stats)
+            print(f"\n{issues}개 이슈 발견 - 수동 확인 필요" if issues else "\n모든 검증 통과!")
+            return
+        results = [process(spec) for spec in days]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    write_outputs(args, days, results, cache_dir, max(workers, encode_threads))
+
+
+def write_outputs(
+    args: argparse.Namespace, days: list[dict], results: list[list[dict]], cache_dir: Path | None, threads: int
+) -> None:
+    """일차별 문제 목록으로 questions.json과 선택 출력(변형/유사 문제/검색 색인/샤드)을 씀.
+    build와 --watch의 재빌드가 함께 사용."""
+    all_questions = [q for questions in results for q in questions]
+    report_image_sharing(all_questions)
+    out_questions = all_questions
+    stale_outputs: list[str] = []  # 이번 빌드에서 끈 선택 출력 중 이전 빌드가 남긴 것
+    if args.near_duplicates:
+        with profile_stage("near_duplicates"):
+            clusters = near_duplicates.cluster_questions(all_questions, *question_signatures(all_questions))
+        out_questions = attach_duplicate_groups(out_questions, near_duplicates.duplicate_groups(clusters))
+        write_duplicate_report(OUT_DIR / "duplicates.json", clusters, len(all_questions))
+    else:
+        stale_outputs += remove_stale_output(OUT_DIR / "duplicates.json")
+    if args.progress_stats:
+        question_stats = load_question_stats(args.progress_stats)
+        out_questions = attach_question_stats(out_questions, question_stats)
+        print(f"학습 통계 병합: {len(question_stats)}문제 ({args.progress_stats})")
+    variant_files: set[str] = set()
+    if args.variants:
+        with profile_stage("variants"):
+            image_info = build_all_variants(all_questions, cache_dir, threads)
+        out_questions = attach_image_info(out_questions, image_info)
+        variants = [v for info in image_info.values() for v in info["variants"]]
+        variant_files = {Path(v["src"]).name for v in variants}
+        print(
+            f"이미지 변형: {len(variants)}개, {sum(v['bytes'] for v in variants) / 1024:.1f} KB "
+            f"(폭 {', '.join(map(str, VARIANT_WIDTHS))} + 원본)"
+        )
+    with profile_stage("prune"):
+        removed = prune_unreferenced_images(referenced_image_names(all_questions) | variant_files)
+    if removed:
+        print(f"참조되지 않는 이미지 {removed}개 삭제")
+    meta = build_meta(days, [len(questions) for questions in results])
+    with profile_stage("validate"):
+        issues = validate(all_questions, [i for spec, qs in zip(days, results) for i in expected_ids(spec, len(qs))])
+
+    output = {"meta": meta, "questions": out_questions}
+    if args.dict_encode:
+        output = {"meta": meta, **encode_strings(out_questions)}
     out_path = OUT_DIR / "questions.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    if args.delta:
+        # 덮어쓰기 전에 이전 빌드를 읽어 둠. version으로 클라이언트가 저장된 사본의 빌드를 안다
+        previous = load_previous_bank(out_path)
+        version = bank_version(meta, out_questions)
+        output = {"version": version, **output}  # 맨 앞 키: 클라이언트가 앞부분만 받아(Range) 버전 확인
+    with profile_stage("write"):
+        sizes = write_json_output(out_path, output, args.compact)
 
     print(f"\n저장 완료: {out_path}")
-    print(f"파일 크기: {out_path.stat().st_size / 1024:.1f} KB")
+    if args.compact or args.dict_encode:
+        pretty = len(dump_json({"meta": meta, "questions": out_questions}, compact=False))
+        print(f"파일 크기: 기존 형식 {pretty / 1024:.1f} KB → {format_sizes(sizes)}")
+        if args.compact and brotli is None:
+            print("  brotli 패키지가 없어 .br 생략 (pip install brotli)")
+    else:
+        print(f"파일 크기: {out_path.stat().st_size / 1024:.1f} KB")
+
+    if args.delta:
+        with profile_stage("delta"):
+            patch_index_path, patch = write_delta(previous, meta, out_questions, version, args.compact)
+        if patch is None:
+            print(f"변경분: 이전 빌드와 같음 ({patch_index_path})")
+        else:
+            patch_path = PATCH_DIR / f"{patch['from']}-{patch['to']}.json"
+            print(
+                f"변경분: 추가 {len(patch['added'])}, 삭제 {len(patch['removed'])}, 변경 {len(patch['changed'])}문제 "
+                f"→ {patch_path.stat().st_size / 1024:.1f} KB (전체 {out_path.stat().st_size / 1024:.1f} KB)"
+            )
+    else:
+        stale_outputs += remove_stale_output(PATCH_DIR)
+
+    if args.search_index:
+        with profile_stage("search"):
+            index = build_search_index(all_questions)
+            search_path = OUT_DIR / "search.json"
+            sizes = write_json_output(search_path, index, args.compact)
+        print(f"검색 색인: {search_path} (용어 {len(index['terms'])}개, {format_sizes(sizes)})")
+    else:
+        stale_outputs += remove_stale_output(OUT_DIR / "search.json")
+
+    if args.image_bundles:
+        with profile_stage("bundles"):
+            bundle_path, bundle_index = write_image_bundles(all_questions, args.compact)
+        total = sum(bundle["bytes"] for bundle in bundle_index["bundles"])
+        print(
+            f"이미지 묶음: {bundle_path} + 과목 {len(bundle_index['bundles'])}개, {total / 1024:.1f} KB "
+            f"(이미지 {len(bundle_index['images'])}개)"
+        )
+    else:
+        stale_outputs += remove_stale_output(OUT_DIR / "bundles.json", BUNDLE_DIR)
+
+    if args.shards:
+        with profile_stage("shards"):
+            manifest_path = write_shards(meta, out_questions, args.compact, args.dict_encode, args.search_index)
+        shard_count = sum(1 for p in SHARD_DIR.glob("*.json") if not p.name.endswith(".search.json"))
+        print(f"샤드 저장: {manifest_path} ({manifest_path.stat().st_size / 1024:.1f} KB) + 샤드 {shard_count}개")
+    else:
+        stale_outputs += remove_stale_output(OUT_DIR / "manifest.json", SHARD_DIR)
+
+    if args.hashed_assets:
+        files = sorted(p for p in IMG_DIR.iterdir() if p.suffix in IMAGE_SUFFIXES)
+        documents = []
+        if args.image_bundles:
+            files += [OUT_DIR / bundle["url"] for bundle in bundle_index["bundles"]]
+            documents.append(bundle_path)
+        if args.search_index:
+            documents.append(search_path)
+        if args.shards:
+            documents += sorted(SHARD_DIR.glob("*.json")) + [manifest_path]
+        documents.append(out_path)
+        with profile_stage("hashed_assets"):
+            asset_manifest_path, asset_manifest, removed = write_hashed_assets(files, documents, args.compact)
+        total = sum(asset["bytes"] for asset in asset_manifest["assets"])
+        print(
+            f"해시 파일: {asset_manifest_path} + {len(asset_manifest['assets'])}개, {total / 1024:.1f} KB"
+            + (f" (이전 빌드 {removed}개 삭제)" if removed else "")
+        )
+    else:
+        stale_outputs += remove_stale_output(OUT_DIR / "assets.json", ASSET_DIR)
+
+    if stale_outputs:
+        print(f"이전 빌드의 선택 출력 삭제: {', '.join(stale_outputs)}")
 
     if issues > 0:
         print(f"\n{issues}개 이슈 발견 - 수동 확인 필요")
@@ -529,4 +2994,5 @@ def main():
 
 
 if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")  # Windows cp949 콘솔
     main()
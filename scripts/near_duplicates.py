@@ -0,0 +1,219 @@
+"""
+유사 문제(근사 중복) 탐지
+여러 해 시험을 합치면 같은 문제가 표현만 조금 바뀌어 반복 출제된다.
+본문 + 선지를 글자 shingle로 나누고 MinHash 서명 → LSH 밴딩으로 후보 쌍만 골라
+서명으로 추정한 Jaccard 유사도가 기준 이상인 문제끼리 묶는다 (모든 쌍 비교 없이 거의 선형).
+extract_questions.py --near-duplicates가 빌드 시 duplicateGroup 필드와 보고서를 생성하고,
+단독 실행으로 기존 questions.json / JSON Lines의 군집과 소요 시간을 확인할 수 있다.
+
+사용법: python scripts/near_duplicates.py [public/data/questions.json | out.jsonl]
+                                         [--threshold 0.8] [--out duplicates.json] [--show N]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from search_index import IMAGE_CHOICE
+
+SHINGLE_SIZE = 5  # 글자 단위 (공백/문장부호 제거 후)
+NUM_PERM = 128
+BANDS = 16  # 밴드당 8행 → 후보가 될 확률 50% 지점이 Jaccard 약 0.71
+THRESHOLD = 0.8  # 서명으로 추정한 Jaccard가 이 이상이면 같은 군집
+SEED = 1
+CHUNK_ROWS = 1 << 15  # 서명 계산 시 한 번에 펼치는 shingle 수 (메모리 NUM_PERM x CHUNK_ROWS x 8바이트)
+NON_WORD = re.compile(r"[^0-9a-z가-힣]+")
+
+
+# ─── shingle / MinHash ──────────────────────────────────────────
+
+def dedupe_text(q: dict) -> str:
+    """본문 + 선지 (이미지 선지 자리표시 문구 제외, 해설은 비교하지 않음)."""
+    choices = [c for c in q["choices"] if not IMAGE_CHOICE.fullmatch(c)]
+    return "\n".join([q["questionText"], *choices])
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """NFKC + 소문자 정규화, 공백/문장부호 제거 후 k글자 shingle의 crc32 (중복 제거, uint64).
+    k글자보다 짧으면 전체를 shingle 하나로 취급, 빈 텍스트는 빈 배열."""
+    text = NON_WORD.sub("", unicodedata.normalize("NFKC", text).lower())
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    grams = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+    return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def permutations(num_perm: int = NUM_PERM, seed: int = SEED) -> tuple[np.ndarray, np.ndarray]:
+    """multiply-shift 해시 h(x) = (a*x + b) mod 2^64 >> 32 의 계수 (a는 홀수)."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(texts: list[str], num_perm: int = NUM_PERM, seed: int = SEED) -> tuple[np.ndarray, np.ndarray]:
+    """문서마다 MinHash 서명. shingle을 모두 이어 붙여 CHUNK_ROWS 단위로 해시한 뒤
+    문서 경계(reduceat)로 최솟값을 구한다.
+    Returns: (서명 (n, num_perm) uint32, shingle이 있는 문서 여부 (n,) bool)"""
+    hashes = [shingle_hashes(t) for t in texts]
+    valid = np.array([len(h) > 0 for h in hashes], dtype=bool)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    docs = np.flatnonzero(valid)
+    if not len(docs):
+        return signatures, valid
+    a, b = permutations(num_perm, seed)
+    lengths = np.array([len(hashes[i]) for i in docs])
+    ends = np.cumsum(lengths)
+    lo = 0
+    while lo < len(docs):
+        # 한 덩어리에 최소 한 문서, CHUNK_ROWS를 넘지 않는 만큼
+        base = ends[lo - 1] if lo else 0
+        hi = max(lo + 1, int(np.searchsorted(ends, base + CHUNK_ROWS, side="right")))
+        flat = np.concatenate([hashes[i] for i in docs[lo:hi]])
+        values = a[:, None] * flat  # (num_perm, shingle) — 행마다 연속이라 reduceat이 빠름
+        values += b[:, None]
+        starts = np.concatenate(([0], ends[lo:hi - 1] - base))
+        # >> 32는 단조라 최솟값을 구한 뒤 적용해도 같음
+        signatures[docs[lo:hi]] = (np.minimum.reduceat(values, starts, axis=1) >> np.uint64(32)).T
+        lo = hi
+    return signatures, valid
+
+
+def stack_signatures(parts: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """일차(배치)별 minhash_signatures 결과를 이어 붙임."""
+    return np.concatenate([s for s, _ in parts]), np.concatenate([v for _, v in parts])
+
+
+# ─── LSH 군집 ───────────────────────────────────────────────────
+
+def find_root(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_clusters(
+    signatures: np.ndarray, valid: np.ndarray, threshold: float = THRESHOLD, bands: int = BANDS
+) -> list[list[int]]:
+    """LSH 밴딩으로 같은 버킷에 들어간 문서만 버킷 첫 문서와 비교해 union-find로 묶음.
+    버킷마다 (크기 - 1)번만 비교하므로 같은 문구가 수백 번 나와도 선형.
+    Returns: 크기 2 이상 군집의 행 인덱스 목록 (군집 안/군집끼리 행 순서)"""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = list(range(n))
+    docs = np.flatnonzero(valid)
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[docs, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        heads = docs[first[inverse.ravel()]]
+        for i in np.flatnonzero(heads != docs):
+            doc, head = int(docs[i]), int(heads[i])
+            root_doc, root_head = find_root(parent, doc), find_root(parent, head)
+            if root_doc == root_head:
+                continue
+            if np.count_nonzero(signatures[doc] == signatures[head]) >= threshold * num_perm:
+                parent[max(root_doc, root_head)] = min(root_doc, root_head)
+
+    groups: dict[int, list[int]] = {}
+    for i in docs.tolist():
+        groups.setdefault(find_root(parent, i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def cluster_questions(
+    questions: list[dict], signatures: np.ndarray, valid: np.ndarray, threshold: float = THRESHOLD
+) -> list[dict]:
+    """questions와 같은 순서의 서명으로 군집 보고서 생성.
+    군집 id는 군집 안 가장 작은 문제 id. similarity는 대표 문제(첫 문제)와의 추정 Jaccard.
+    Returns: [{"id", "questions": [{"id", "day", "subject", "originalNumber", "similarity"}, ...]}, ...]"""
+    clusters = []
+    for members in find_clusters(signatures, valid, threshold):
+        head = signatures[members[0]]
+        clusters.append({
+            "id": min(questions[i]["id"] for i in members),
+            "questions": [
+                {
+                    "id": questions[i]["id"],
+                    "day": questions[i]["day"],
+                    "subject": questions[i]["subject"],
+                    "originalNumber": questions[i]["originalNumber"],
+                    "similarity": round(float(np.mean(signatures[i] == head)), 3),
+                }
+                for i in members
+            ],
+        })
+    return clusters
+
+
+def duplicate_groups(clusters: list[dict]) -> dict[int, int]:
+    """문제 id → 군집 id (군집에 속한 문제만)."""
+    return {q["id"]: c["id"] for c in clusters for q in c["questions"]}
+
+
+def build_report(clusters: list[dict], total: int, threshold: float = THRESHOLD) -> dict:
+    return {
+        "threshold": threshold,
+        "numPerm": NUM_PERM,
+        "bands": BANDS,
+        "shingleSize": SHINGLE_SIZE,
+        "totalQuestions": total,
+        "duplicateQuestions": sum(len(c["questions"]) for c in clusters),
+        "clusters": clusters,
+    }
+
+
+def print_clusters(clusters: list[dict], show: int = 10) -> None:
+    dup = sum(len(c["questions"]) for c in clusters)
+    print(f"유사 문제 군집: {len(clusters)}개 ({dup}문제)")
+    for c in sorted(clusters, key=lambda c: -len(c["questions"]))[:show]:
+        members = ", ".join(f"{q['day']} Q{q['originalNumber']}({q['similarity']:.2f})" for q in c["questions"][:6])
+        more = len(c["questions"]) - 6
+        print(f"  #{c['id']}: {members}{f' 외 {more}개' if more > 0 else ''}")
+
+
+# ─── 단독 실행 ──────────────────────────────────────────────────
+
+def load_questions(path: Path) -> list[dict]:
+    """questions.json 또는 extract_questions.py --jsonl 출력."""
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return json.loads(path.read_text(encoding="utf-8"))["questions"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash/LSH 유사 문제 군집")
+    default_path = Path(__file__).resolve().parent.parent / "public" / "data" / "questions.json"
+    parser.add_argument("path", nargs="?", type=Path, default=default_path, help="questions.json 또는 .jsonl")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"추정 Jaccard 기준 (기본 {THRESHOLD})")
+    parser.add_argument("--out", type=Path, help="군집 보고서 JSON 경로")
+    parser.add_argument("--show", type=int, default=10, help="출력할 군집 수 (큰 순)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.path)
+    t0 = time.perf_counter()
+    signatures, valid = minhash_signatures([dedupe_text(q) for q in questions])
+    t1 = time.perf_counter()
+    clusters = cluster_questions(questions, signatures, valid, args.threshold)
+    t2 = time.perf_counter()
+
+    print(f"{len(questions)}문제: 서명 {(t1 - t0) * 1000:.1f} ms, LSH 군집 {(t2 - t1) * 1000:.1f} ms")
+    print_clusters(clusters, args.show)
+    if args.out:
+        report = build_report(clusters, len(questions), args.threshold)
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"보고서 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")  # Windows cp949 콘솔
+    main()
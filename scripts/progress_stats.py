@@ -0,0 +1,260 @@
+"""
+학습 기록 집계
+학생들이 내보낸 진행 기록(설정 > 내보내기 JSON)을 파일 하나씩 읽어 history/srData를
+열 단위 배열(array → NumPy)에 이어 붙이고, 수천 개 파일을 한 번에 집계한다.
+파일의 dict는 읽은 직후 버리므로 메모리는 기록 수 × 열 크기만큼만 쓴다.
+  - 문제별 난이도: 시도 수, 정답률, 첫 시도 정답률, 평균 ease, 보정된 난이도
+  - 과목별 정답률
+  - 선지 혼동: 문제별 선택 분포, 정답 × 선택 행렬 (selected가 기록된 항목만)
+  - 망각 곡선: 같은 문제를 다시 풀기까지의 간격 구간별 정답률 (전체/과목별)
+결과는 extract_questions.py --progress-stats로 문제 항목에 병합할 수 있는 JSON.
+
+사용법: python scripts/progress_stats.py exports/ [more.json ...]
+                                        [--questions public/data/questions.json]
+                                        [--out data/progress_stats.json] [--show N]
+"""
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+QUESTIONS_JSON = BASE_DIR / "public" / "data" / "questions.json"
+DEFAULT_OUT = BASE_DIR / "data" / "progress_stats.json"
+
+STATS_VERSION = 1
+PRIOR_WEIGHT = 5  # 난이도 보정: 전체 정답률을 이만큼의 가상 시도로 섞음 (시도가 적은 문제 안정화)
+MAX_CHOICES = 5
+DAY_MS = 86_400_000
+FORGET_EDGES = [0, 1 / 24, 1, 2, 4, 8, 16, 32]  # 일, 마지막 구간은 32일 이상
+
+
+# ─── 입력 (내보낸 진행 기록 → 열 배열) ───────────────────────────
+
+def iter_export_paths(paths: list[Path]):
+    """파일은 그대로, 폴더는 하위의 *.json을 이름 순으로."""
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob("*.json"))
+        else:
+            yield path
+
+
+def load_columns(paths: list[Path]) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray], int, int]:
+    """진행 기록을 한 파일씩 읽어 열 배열로 이어 붙임. 학습자 번호는 읽은 파일 순서.
+    Returns: (history 열 {"learner", "question", "correct", "timestamp", "selected"},
+              srData 열 {"learner", "question", "ease", "interval", "reps"}, 학습자 수, 건너뛴 파일 수)
+    selected는 선택한 선지 번호 (기록되지 않은 항목은 0)."""
+    hist = {
+        "learner": array("i"), "question": array("i"), "correct": array("b"),
+        "timestamp": array("q"), "selected": array("b"),
+    }
+    sr = {"learner": array("i"), "question": array("i"), "ease": array("f"), "interval": array("i"), "reps": array("i")}
+    learners = skipped = 0
+    for path in iter_export_paths(paths):
+        try:
+            progress = json.loads(path.read_bytes())
+            history = progress.get("history", [])
+            cards = progress.get("srData", {})
+        except (OSError, ValueError, AttributeError):
+            skipped += 1
+            continue
+        row = learners
+        learners += 1
+        hist["learner"].extend([row] * len(history))
+        hist["question"].extend(h["questionId"] for h in history)
+        hist["correct"].extend(bool(h["correct"]) for h in history)
+        hist["timestamp"].extend(h["timestamp"] for h in history)
+        hist["selected"].extend(h.get("selected") or 0 for h in history)
+        sr["learner"].extend([row] * len(cards))
+        sr["question"].extend(int(k) for k in cards)
+        sr["ease"].extend(c["ease"] for c in cards.values())
+        sr["interval"].extend(c["interval"] for c in cards.values())
+        sr["reps"].extend(c["repetitions"] for c in cards.values())
+    return (
+        {k: np.frombuffer(v, dtype=v.typecode) for k, v in hist.items()},
+        {k: np.frombuffer(v, dtype=v.typecode) for k, v in sr.items()},
+        learners,
+        skipped,
+    )
+
+
+def load_question_info(path: Path | None) -> dict[int, tuple[str, int]]:
+    """questions.json(--dict-encode 포함)의 문제 id → (과목, 정답). 없으면 빈 사전."""
+    if path is None or not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    strings = data.get("strings", [])
+    return {
+        q["id"]: (strings[q["subject"]] if isinstance(q["subject"], int) else q["subject"], q["answer"])
+        for q in data["questions"]
+    }
+
+
+# ─── 집계 ───────────────────────────────────────────────────────
+
+def ratio(num: np.ndarray, den: np.ndarray) -> list[float | None]:
+    """num/den (소수 넷째 자리), den이 0이면 None."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.round(num / den, 4)
+    return [None if d == 0 else float(v) for v, d in zip(r, den)]
+
+
+def analyze(hist: dict[str, np.ndarray], sr: dict[str, np.ndarray], info: dict[int, tuple[str, int]]) -> dict:
+    """열 배열로 문제/과목/선지/망각 곡선 통계 계산 (정렬 한 번 + bincount)."""
+    ids, inverse = np.unique(np.concatenate([hist["question"], sr["question"]]), return_inverse=True)
+    q_idx, sr_idx = inverse[:len(hist["question"])], inverse[len(hist["question"]):]
+    n = len(ids)
+    correct = hist["correct"].astype(np.int64)
+
+    # 학습자/문제별 시간순 → 첫 시도와 직전 시도 간격
+    order = np.lexsort((hist["timestamp"], q_idx, hist["learner"]))
+    learner_s, q_s = hist["learner"][order], q_idx[order]
+    correct_s, time_s = correct[order], hist["timestamp"][order]
+    repeat = np.zeros(len(order), dtype=bool)
+    repeat[1:] = (learner_s[1:] == learner_s[:-1]) & (q_s[1:] == q_s[:-1])
+
+    attempts = np.bincount(q_idx, minlength=n)
+    right = np.bincount(q_idx, weights=correct, minlength=n)
+    first = np.bincount(q_s[~repeat], minlength=n)
+    first_right = np.bincount(q_s[~repeat], weights=correct_s[~repeat], minlength=n)
+    overall = right.sum() / max(attempts.sum(), 1)
+    smoothed = (right + PRIOR_WEIGHT * overall) / (attempts + PRIOR_WEIGHT)
+    cards = np.bincount(sr_idx, minlength=n)
+    ease_sum = np.bincount(sr_idx, weights=sr["ease"], minlength=n)
+
+    # 선지 선택 분포 (selected 1~5만)
+    has_pick = (hist["selected"] >= 1) & (hist["selected"] <= MAX_CHOICES)
+    picks = np.bincount(
+        q_idx[has_pick] * MAX_CHOICES + hist["selected"][has_pick] - 1, minlength=n * MAX_CHOICES
+    ).reshape(n, MAX_CHOICES)
+    answers = np.array([info.get(int(i), ("", 0))[1] for i in ids], dtype=np.int64)
+    matrix = np.zeros((MAX_CHOICES, MAX_CHOICES), dtype=np.int64)
+    known = (answers >= 1) & (answers <= MAX_CHOICES)
+    for a in range(1, MAX_CHOICES + 1):
+        matrix[a - 1] = picks[known & (answers == a)].sum(axis=0)
+
+    # 과목 (questions.json에 없는 문제는 unknown)
+    subject_names = sorted({s for s, _ in info.values()} | {"unknown"})
+    subject_code = {s: i for i, s in enumerate(subject_names)}
+    q_subject = np.array([subject_code[info.get(int(i), ("unknown", 0))[0]] for i in ids], dtype=np.int64)
+    s_attempts = np.bincount(q_subject, weights=attempts, minlength=len(subject_names))
+    s_right = np.bincount(q_subject, weights=right, minlength=len(subject_names))
+
+    # 망각 곡선: 다시 푼 시도의 정답 여부를 직전 시도와의 간격 구간별로
+    gap_days = (time_s[1:] - time_s[:-1])[repeat[1:]] / DAY_MS
+    bins = np.searchsorted(FORGET_EDGES, gap_days, side="right") - 1
+    again_right = correct_s[1:][repeat[1:]]
+    again_subject = q_subject[q_s[1:][repeat[1:]]]
+    n_bins = len(FORGET_EDGES)
+    cell = again_subject * n_bins + bins
+    f_attempts = np.bincount(cell, minlength=len(subject_names) * n_bins).reshape(-1, n_bins)
+    f_right = np.bincount(cell, weights=again_right, minlength=len(subject_names) * n_bins).reshape(-1, n_bins)
+
+    used = [i for i, s in enumerate(subject_names) if s_attempts[i] > 0]
+    return {
+        "version": STATS_VERSION,
+        "attempts": int(attempts.sum()),
+        "accuracy": round(float(overall), 4),
+        # 문제별 열 (id와 같은 순서)
+        "questions": {
+            "id": ids.tolist(),
+            "attempts": attempts.tolist(),
+            "accuracy": ratio(right, attempts),
+            "firstAccuracy": ratio(first_right, first),
+            "difficulty": np.round(1 - smoothed, 4).tolist(),
+            "ease": ratio(ease_sum, cards),
+            "picks": picks.tolist(),
+        },
+        "subjects": {
+            "id": [subject_names[i] for i in used],
+            "attempts": [int(s_attempts[i]) for i in used],
+            "accuracy": [ratio(s_right[i:i + 1], s_attempts[i:i + 1])[0] for i in used],
+        },
+        "choiceMatrix": matrix.tolist(),  # [정답 - 1][선택 - 1]
+        "forgetting": {
+            "edgesDays": FORGET_EDGES,
+            "attempts": f_attempts.sum(axis=0).tolist(),
+            "accuracy": ratio(f_right.sum(axis=0), f_attempts.sum(axis=0)),
+            "subjects": {
+                subject_names[i]: {"attempts": f_attempts[i].tolist(), "accuracy": ratio(f_right[i], f_attempts[i])}
+                for i in used
+            },
+        },
+    }
+
+
+# ─── 출력 ───────────────────────────────────────────────────────
+
+def format_gap(days: float) -> str:
+    return f"{round(days * 24)}시간" if days < 1 else f"{days:g}일"
+
+
+def print_report(stats: dict, show: int) -> None:
+    qs = stats["questions"]
+    print(f"전체 정답률 {stats['accuracy']:.3f} ({stats['attempts']}회)")
+
+    print(f"\n어려운 문제 상위 {show}개 (난이도 = 1 - 보정 정답률)")
+    print(f"{'id':>6} {'시도':>7} {'정답률':>7} {'첫 시도':>7} {'난이도':>7}")
+    for i in sorted(range(len(qs["id"])), key=lambda i: -qs["difficulty"][i])[:show]:
+        acc, first = qs["accuracy"][i], qs["firstAccuracy"][i]
+        print(
+            f"{qs['id'][i]:>6} {qs['attempts'][i]:>7} {'-' if acc is None else f'{acc:.3f}':>7} "
+            f"{'-' if first is None else f'{first:.3f}':>7} {qs['difficulty'][i]:>7.3f}"
+        )
+
+    subjects = stats["subjects"]
+    print("\n과목별 정답률")
+    for sid, n, acc in sorted(zip(subjects["id"], subjects["attempts"], subjects["accuracy"]), key=lambda x: x[2]):
+        print(f"  {sid:<14} {acc:.3f} ({n}회)")
+
+    matrix = stats["choiceMatrix"]
+    if any(map(sum, matrix)):
+        print("\n정답 × 선택 (selected가 기록된 시도)")
+        print("     " + "".join(f"{c:>7}" for c in range(1, MAX_CHOICES + 1)))
+        for a, row in enumerate(matrix, 1):
+            print(f"  {a}: " + "".join(f"{v:>7}" for v in row))
+
+    forgetting = stats["forgetting"]
+    print("\n망각 곡선 (직전 시도와의 간격 → 다시 풀었을 때 정답률)")
+    edges = forgetting["edgesDays"]
+    for i, (n, acc) in enumerate(zip(forgetting["attempts"], forgetting["accuracy"])):
+        label = f"{format_gap(edges[i])}~{format_gap(edges[i + 1])}" if i + 1 < len(edges) else f"{format_gap(edges[i])}~"
+        print(f"  {label:<12} {'-' if acc is None else f'{acc:.3f}':>7} ({n}회)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보낸 학습 기록 집계 (난이도/과목/선지 혼동/망각 곡선)")
+    parser.add_argument("paths", type=Path, nargs="+", help="진행 기록 JSON 또는 그 폴더")
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_JSON, help="과목/정답 조회용 문제 목록")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="집계 결과 JSON (--progress-stats 입력)")
+    parser.add_argument("--show", type=int, default=10, help="출력할 어려운 문제 수")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    hist, sr, learners, skipped = load_columns(args.paths)
+    t1 = time.perf_counter()
+    stats = analyze(hist, sr, load_question_info(args.questions))
+    stats["learners"] = learners
+    t2 = time.perf_counter()
+
+    print(
+        f"학습자 {learners}명, 풀이 {len(hist['question'])}회, 카드 {len(sr['question'])}개: "
+        f"읽기 {t1 - t0:.2f}초, 집계 {(t2 - t1) * 1000:.0f} ms"
+        + (f" (읽지 못한 파일 {skipped}개)" if skipped else "")
+    )
+    print_report(stats, args.show)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(stats, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    print(f"\n결과 저장: {args.out} ({args.out.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")  # Windows cp949 콘솔
+    main()
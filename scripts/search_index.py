@@ -0,0 +1,139 @@
+"""
+문제 전문 검색 색인
+한글은 글자 bigram, 라틴 문자/숫자는 단어(약물/질환명 등) 단위로 역색인을 만들고
+용어마다 문서 번호 목록(postings)을 차이값으로 저장.
+extract_questions.py --search-index가 빌드 시 생성하고, 같은 색인을 search()로
+오프라인에서 질의해 관련도와 지연 시간을 확인할 수 있다 (src/lib/search.ts와 같은 규칙).
+
+사용법: python scripts/search_index.py "급성 심근경색" [--index public/data/search.json]
+                                      [--limit N] [--repeat N]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import re
+import sys
+import time
+import unicodedata
+from itertools import accumulate
+from pathlib import Path
+
+INDEX_VERSION = 1
+HANGUL_RUN = re.compile(r"[가-힣]+")
+LATIN_TOKEN = re.compile(r"[a-z0-9]+")
+MIN_LATIN = 2  # 한 글자 영문/숫자(선지 번호, 단위 등)는 색인하지 않음
+IMAGE_CHOICE = re.compile(r"\(보기 \d - 이미지 참조\)")
+
+
+def tokenize(text: str) -> list[str]:
+    """NFKC + 소문자 정규화 후 한글 bigram(한 글자 덩어리는 그대로)과 라틴 단어."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    terms: list[str] = []
+    for run in HANGUL_RUN.findall(text):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms += [run[i:i + 2] for i in range(len(run) - 1)]
+    terms += [t for t in LATIN_TOKEN.findall(text) if len(t) >= MIN_LATIN]
+    return terms
+
+
+def document_text(q: dict) -> str:
+    """본문 + 선지 + 해설 (이미지 선지 자리표시 문구 제외)."""
+    choices = [c for c in q["choices"] if not IMAGE_CHOICE.fullmatch(c)]
+    return "\n".join([q["questionText"], *choices, q["explanation"]])
+
+
+def delta_encode(values: list[int]) -> list[int]:
+    return [v - prev for prev, v in zip([0] + values, values)]
+
+
+def build_index(questions: list[dict]) -> dict:
+    """questions.json 항목으로 역색인 생성.
+    Returns: {"version", "docs": [문제 id], "terms": [정렬된 용어],
+              "postings": [[docs 인덱스 차이값, ...], ...]}  (terms와 같은 순서)"""
+    postings: dict[str, list[int]] = {}
+    for i, q in enumerate(questions):
+        for term in set(tokenize(document_text(q))):
+            postings.setdefault(term, []).append(i)  # i가 증가하므로 정렬 상태 유지
+    terms = sorted(postings)
+    return {
+        "version": INDEX_VERSION,
+        "docs": [q["id"] for q in questions],
+        "terms": terms,
+        "postings": [delta_encode(postings[t]) for t in terms],
+    }
+
+
+def load_index(path: Path) -> dict:
+    index = json.loads(path.read_text(encoding="utf-8"))
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(f"{path}: 지원하지 않는 색인 버전 {index.get('version')}")
+    return index
+
+
+def expand_term(index: dict, term: str) -> range:
+    """용어의 terms 인덱스 범위. 라틴 단어와 한 글자 한글은 접두사로 확장
+    ("amox" → amoxicillin, "심" → 심근/심부전/...)."""
+    terms = index["terms"]
+    lo = bisect.bisect_left(terms, term)
+    if len(term) > 1 and HANGUL_RUN.fullmatch(term):
+        return range(lo, lo + 1 if lo < len(terms) and terms[lo] == term else lo)
+    hi = lo
+    while hi < len(terms) and terms[hi].startswith(term):
+        hi += 1
+    return range(lo, hi)
+
+
+def search(index: dict, query: str, limit: int = 20) -> list[tuple[int, float]]:
+    """질의의 용어마다 idf를 더해 점수를 매김 (용어를 많이, 드문 용어일수록 높음).
+    Returns: [(문제 id, 점수), ...] 점수 내림차순, 같으면 문제 순서"""
+    n_docs = len(index["docs"])
+    scores: dict[int, float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        matched: set[int] = set()
+        for t in expand_term(index, term):
+            matched.update(accumulate(index["postings"][t]))
+        if not matched:
+            continue
+        idf = math.log(1 + n_docs / len(matched))
+        for doc in matched:
+            scores[doc] = scores.get(doc, 0.0) + idf
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(index["docs"][doc], score) for doc, score in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 색인 질의 (관련도/지연 시간 확인)")
+    parser.add_argument("query", help="검색어")
+    default_index = Path(__file__).resolve().parent.parent / "public" / "data" / "search.json"
+    parser.add_argument("--index", type=Path, default=default_index, help="색인 파일 (기본 public/data/search.json)")
+    parser.add_argument("--limit", type=int, default=10, help="결과 수")
+    parser.add_argument("--repeat", type=int, default=100, help="지연 시간 측정 반복 횟수")
+    args = parser.parse_args()
+
+    index = load_index(args.index)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        hits = search(index, args.query, args.limit)
+    elapsed = (time.perf_counter() - t0) / args.repeat
+
+    questions = {}
+    questions_path = args.index.with_name("questions.json")
+    if questions_path.exists():
+        data = json.loads(questions_path.read_text(encoding="utf-8"))
+        questions = {q["id"]: q for q in data.get("questions", [])}
+
+    print(f"용어: {' '.join(dict.fromkeys(tokenize(args.query)))}")
+    print(f"결과 {len(hits)}개, 질의당 {elapsed * 1000:.3f} ms ({len(index['docs'])}문제, 용어 {len(index['terms'])}개)")
+    for qid, score in hits:
+        q = questions.get(qid)
+        preview = q["questionText"][:60] if q else ""
+        print(f"  {qid:>5}  {score:6.2f}  {preview}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")  # Windows cp949 콘솔
+    main()
@@ -0,0 +1,420 @@
+"""
+SM-2 간격 반복 시뮬레이터
+src/lib/spacedRepetition.ts의 reviewCard를 NumPy로 옮겨 학습자×문제 행렬 전체를
+하루 단위로 한 번에 갱신. 합성 학습자(또는 내보낸 진행 기록)로 일별 복습량과
+기억 유지율을 예측해 ease 범위/초기 간격/ease 갱신식 변경을 실제 학생 없이 비교한다.
+
+사용법: python scripts/sm2_sim.py [--learners 10000] [--days 90] [--new-per-day 20]
+                                 [--questions public/data/questions.json | --cards N]
+                                 [--progress export.json ...] [--param easeMin=1.5 ...]
+                                 [--out result.json] [--seed N]
+        python scripts/sm2_sim.py --parity [--cases N] [--allow-skip]   (TS reviewCard와 결과 비교)
+"""
+
+import argparse
+import json
+import math
+import shutil
+import subprocess
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+QUESTIONS_JSON = BASE_DIR / "public" / "data" / "questions.json"
+TS_SCHEDULER = BASE_DIR / "src" / "lib" / "spacedRepetition.ts"
+
+# ─── 스케줄러 (spacedRepetition.ts) ──────────────────────────────
+
+# reviewCard에 하드코딩된 값. --param 이름=값으로 바꿔 비교
+DEFAULT_PARAMS = {
+    "easeInit": 2.5,
+    "easeMin": 1.3,
+    "easeMax": 3.0,
+    "failInterval": 1,
+    "firstInterval": 1,
+    "secondInterval": 3,
+    "easeBonus": 0.1,  # ease + bonus - (5-q) * (a + (5-q) * b)
+    "easeA": 0.08,
+    "easeB": 0.02,
+}
+CONFIDENCE_MAP = {"again": 0, "hard": 2, "good": 4, "easy": 5}  # types/index.ts와 같음
+PASS_Q = 3  # q < 3이면 실패
+
+
+def js_round(x):
+    """JS Math.round (0.5는 올림). np.round는 짝수 쪽으로 반올림해 결과가 달라짐."""
+    return np.floor(x + 0.5)
+
+
+def review_card(card: dict, confidence: str, params: dict = DEFAULT_PARAMS) -> dict:
+    """reviewCard를 한 줄씩 옮긴 스칼라 버전 (벡터 버전의 기준). nextReview 대신 interval."""
+    q = CONFIDENCE_MAP[confidence]
+    ease, interval, repetitions = card["ease"], card["interval"], card["repetitions"]
+    if q < PASS_Q:
+        repetitions = 0
+        interval = params["failInterval"]
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = params["firstInterval"]
+        elif repetitions == 2:
+            interval = params["secondInterval"]
+        else:
+            interval = math.floor(interval * ease + 0.5)
+    ease = max(
+        params["easeMin"],
+        min(params["easeMax"], ease + params["easeBonus"] - (5 - q) * (params["easeA"] + (5 - q) * params["easeB"])),
+    )
+    return {"ease": ease, "interval": interval, "repetitions": repetitions}
+
+
+def review(
+    ease: np.ndarray, interval: np.ndarray, reps: np.ndarray, q: np.ndarray, params: dict = DEFAULT_PARAMS
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """reviewCard의 벡터 버전. 같은 모양의 배열(q: 0/2/4/5)을 받아 새 배열 반환.
+    연산 순서를 TS와 같게 두어 float64에서 결과가 비트 단위로 같다."""
+    fail = q < PASS_Q
+    reps = np.where(fail, 0, reps + 1)
+    grown = js_round(interval * ease).astype(interval.dtype)
+    interval = np.where(
+        fail,
+        params["failInterval"],
+        np.where(reps == 1, params["firstInterval"], np.where(reps == 2, params["secondInterval"], grown)),
+    )
+    d = 5 - q
+    ease = np.minimum(params["easeMax"], ease + params["easeBonus"] - d * (params["easeA"] + d * params["easeB"]))
+    return np.maximum(params["easeMin"], ease), interval, reps
+
+
+# ─── 기억 모델 (가정) ───────────────────────────────────────────
+# 스케줄러를 평가하기 위한 단순한 학습자 모델:
+# 회상 확률 = 0.9 ** (경과일 / 안정도), 성공하면 안정도가 늘고 실패하면 줄어듦.
+# 숙련도(학습자 능력 - 문제 난이도)가 클수록 처음 정답률과 안정도 증가 폭이 큼.
+
+ABILITY_SD = 0.5
+DIFFICULTY_SD = 0.7
+FIRST_BIAS = 0.3  # 처음 보는 문제의 정답률 sigmoid(bias + 숙련도)
+STABILITY_INIT = 1.5  # 일
+STABILITY_GROWTH = 1.8
+LAPSE_FACTOR = 0.4
+STABILITY_MIN = 0.5
+EASY_RECALL = 0.95  # 회상 확률이 이 이상이면 easy, GOOD_RECALL 이상이면 good, 그 아래 성공은 hard
+GOOD_RECALL = 0.75
+NEW = np.iinfo(np.int32).max  # due 배열에서 아직 보지 않은 문제 (due <= 오늘에 걸리지 않음)
+LN_09 = np.float32(math.log(0.9))
+
+
+def sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def confidence_from_recall(recalled: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """회상 결과 → 자신감 버튼 점수 (again 0 / hard 2 / good 4 / easy 5)."""
+    q = np.where(p >= EASY_RECALL, 5, np.where(p >= GOOD_RECALL, 4, 2))
+    return np.where(recalled, q, 0)
+
+
+def new_state(n_learners: int, n_cards: int, params: dict) -> dict:
+    return {
+        "ease": np.full((n_learners, n_cards), params["easeInit"], dtype=np.float64),
+        "interval": np.zeros((n_learners, n_cards), dtype=np.int32),
+        "reps": np.zeros((n_learners, n_cards), dtype=np.int32),
+        "due": np.full((n_learners, n_cards), NEW, dtype=np.int32),
+        "last": np.zeros((n_learners, n_cards), dtype=np.int32),
+        "stability": np.full((n_learners, n_cards), STABILITY_INIT, dtype=np.float32),
+    }
+
+
+def simulate(
+    state: dict,
+    skill: np.ndarray,
+    days: int,
+    new_per_day: int,
+    params: dict = DEFAULT_PARAMS,
+    rng: np.random.Generator | None = None,
+) -> dict:
+    """days일 동안 매일 복습 대상(due ≤ 오늘) + 새 문제 new_per_day개(문제 순서대로, getNewCards)를
+    학습. skill: 학습자×문제 숙련도. state는 제자리에서 갱신.
+    Returns: 일별 통계 {"due": {mean, p50, p90, max}, "reviews", "new", "recallRate", "retention"}"""
+    rng = rng or np.random.default_rng()
+    # 1차원 보기로 다뤄 선택한 칸만 모아 갱신 (2차원 팬시 인덱싱보다 빠름)
+    flat = {k: v.reshape(-1) for k, v in state.items()}
+    p_first = sigmoid(FIRST_BIAS + skill).astype(np.float32).reshape(-1)
+    growth = (1 + STABILITY_GROWTH * np.exp(skill * 0.5)).astype(np.float32).reshape(-1)
+    stats = {"due": {"mean": [], "p50": [], "p90": [], "max": []}, "reviews": [], "new": [], "recallRate": [], "retention": []}
+
+    no_new = np.zeros_like(state["due"], dtype=bool)
+    retr = np.empty(flat["stability"].shape, dtype=np.float32)  # 유지율 계산용 작업 버퍼
+    for day in range(days):
+        due = state["due"] <= day
+        unseen = state["due"] == NEW
+        if new_per_day > 0 and unseen.any():
+            new = unseen & (np.cumsum(unseen, axis=1, dtype=np.int32) <= new_per_day)
+        else:
+            new = no_new
+
+        due_counts = due.sum(axis=1)
+        stats["due"]["mean"].append(float(due_counts.mean()))
+        p50, p90 = np.percentile(due_counts, [50, 90])
+        stats["due"]["p50"].append(float(p50))
+        stats["due"]["p90"].append(float(p90))
+        stats["due"]["max"].append(int(due_counts.max()))
+
+        idx = np.flatnonzero(due | new)
+        is_new = new.reshape(-1)[idx]
+        stability = flat["stability"][idx]
+        elapsed = (day - flat["last"][idx]).astype(np.float32)
+        p = np.where(is_new, p_first[idx], np.exp(LN_09 * elapsed / stability))
+        recalled = rng.random(len(idx), dtype=np.float32) < p
+        q = confidence_from_recall(recalled, p)
+
+        ease, interval, reps = review(flat["ease"][idx], flat["interval"][idx], flat["reps"][idx], q, params)
+        flat["ease"][idx] = ease
+        flat["interval"][idx] = interval
+        flat["reps"][idx] = reps
+        flat["due"][idx] = day + interval
+        flat["last"][idx] = day
+        flat["stability"][idx] = np.where(
+            recalled,
+            np.where(is_new, stability, stability * growth[idx]),
+            np.maximum(STABILITY_MIN, stability * LAPSE_FACTOR),
+        )
+
+        reviewed_due = ~is_new
+        stats["reviews"].append(int(reviewed_due.sum()))
+        stats["new"].append(int(is_new.sum()))
+        stats["recallRate"].append(float(recalled[reviewed_due].mean()) if reviewed_due.any() else None)
+        # 하루를 마친 뒤 본 적 있는 모든 문제의 평균 회상 확률
+        seen = flat["due"] != NEW
+        n_seen = int(np.count_nonzero(seen))
+        np.subtract(day + 1, flat["last"], out=retr, casting="unsafe")
+        np.divide(retr, flat["stability"], out=retr)
+        np.multiply(retr, LN_09, out=retr)
+        np.exp(retr, out=retr)
+        stats["retention"].append(float(retr.sum(where=seen, dtype=np.float64) / n_seen) if n_seen else None)
+    return stats
+
+
+# ─── 입력 (합성 / 내보낸 진행 기록) ──────────────────────────────
+
+def load_card_ids(questions_path: Path | None, n_cards: int | None, progress: list[dict]) -> list[int]:
+    if n_cards:
+        return list(range(1, n_cards + 1))
+    if questions_path is not None and questions_path.exists():
+        data = json.loads(questions_path.read_text(encoding="utf-8"))
+        return [q["id"] for q in data["questions"]]
+    ids = {int(k) for p in progress for k in p.get("srData", {})}
+    if not ids:
+        sys.exit("문제 목록이 없습니다: --questions 또는 --cards를 지정하세요")
+    return sorted(ids)
+
+
+def state_from_progress(
+    progress: list[dict], n_learners: int, card_ids: list[int], params: dict, today: date
+) -> tuple[dict, np.ndarray]:
+    """내보낸 진행 기록(설정 > 내보내기 JSON)으로 초기 상태를 채움. 학습자 수가 파일보다
+    많으면 기록을 돌려 씀. 학습자 능력은 history 정답률의 logit으로 추정.
+    Returns: (state, 학습자 능력)"""
+    state = new_state(n_learners, len(card_ids), params)
+    col = {cid: i for i, cid in enumerate(card_ids)}
+    ability = np.zeros(n_learners, dtype=np.float32)
+    for row in range(n_learners):
+        p = progress[row % len(progress)]
+        for key, card in p.get("srData", {}).items():
+            c = col.get(int(key))
+            if c is None:
+                continue
+            due = (date.fromisoformat(card["nextReview"]) - today).days
+            state["ease"][row, c] = card["ease"]
+            state["interval"][row, c] = card["interval"]
+            state["reps"][row, c] = card["repetitions"]
+            state["due"][row, c] = max(due, 0)
+            state["last"][row, c] = due - card["interval"]
+            # 복습 시점에 회상 확률 약 0.9가 되도록 간격을 안정도로 사용
+            state["stability"][row, c] = max(card["interval"], STABILITY_MIN)
+        history = p.get("history", [])
+        if history:
+            acc = min(max(sum(h["correct"] for h in history) / len(history), 0.05), 0.95)
+            ability[row] = math.log(acc / (1 - acc)) - FIRST_BIAS
+    return state, ability
+
+
+# ─── TS 구현과 비교 (--parity) ──────────────────────────────────
+
+# typescript 패키지(devDependencies)로 spacedRepetition.ts와 import하는 파일을 변환해 실행
+TS_RUNNER = r"""
+const fs = require("fs"), path = require("path"), Module = require("module");
+const root = process.argv[1];
+const ts = require(path.join(root, "node_modules", "typescript"));
+const cache = {};
+function resolve(spec, from) {
+  const base = spec.startsWith("@/") ? path.join(root, "src", spec.slice(2)) : path.resolve(path.dirname(from), spec);
+  for (const f of [base + ".ts", path.join(base, "index.ts")]) if (fs.existsSync(f)) return f;
+  return null;
+}
+function load(file) {
+  if (cache[file]) return cache[file].exports;
+  const out = ts.transpileModule(fs.readFileSync(file, "utf8"), {
+    compilerOptions: { module: ts.ModuleKind.CommonJS, target: ts.ScriptTarget.ES2020 },
+  }).outputText;
+  const m = new Module(file);
+  m.filename = file;
+  cache[file] = m;
+  m.require = (spec) => { const f = resolve(spec, file); return f ? load(f) : require(spec); };
+  m._compile(out, file);
+  return m.exports;
+}
+const { reviewCard } = load(path.join(root, "src", "lib", "spacedRepetition.ts"));
+const cases = JSON.parse(fs.readFileSync(0, "utf8"));
+const out = cases.map(([card, c]) => {
+  const r = reviewCard({ ...card, nextReview: "2000-01-01" }, c);
+  return [r.ease, r.interval, r.repetitions];
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def ts_available() -> bool:
+    """TS 비교에 필요한 node와 node_modules/typescript가 있는지."""
+    return shutil.which("node") is not None and (BASE_DIR / "node_modules" / "typescript").exists()
+
+
+def run_ts_reviews(cases: list[tuple[dict, str]]) -> list[list] | None:
+    """node + typescript로 TS reviewCard 결과를 얻음. 둘 중 하나가 없으면 None."""
+    if not ts_available():
+        return None
+    proc = subprocess.run(
+        [shutil.which("node"), "-e", TS_RUNNER, str(BASE_DIR)],
+        input=json.dumps(cases), capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def parity_check(n_cases: int, seed: int) -> int:
+    """무작위 카드 상태 × 자신감으로 벡터 버전 / 스칼라 버전 / TS를 비교.
+    Returns: 불일치 수"""
+    rng = np.random.default_rng(seed)
+    confidences = list(CONFIDENCE_MAP)
+    cases = []
+    for _ in range(n_cases):
+        card = {
+            "ease": float(np.round(rng.uniform(1.2, 3.1), int(rng.integers(1, 6)))),
+            "interval": int(rng.choice([0, 1, 2, 3, 5, 8, 13, 21, 100, 365])),
+            "repetitions": int(rng.integers(0, 8)),
+        }
+        cases.append((card, confidences[int(rng.integers(0, 4))]))
+
+    scalar = [review_card(card, c) for card, c in cases]
+    ease, interval, reps = review(
+        np.array([card["ease"] for card, _ in cases]),
+        np.array([card["interval"] for card, _ in cases], dtype=np.int64),
+        np.array([card["repetitions"] for card, _ in cases], dtype=np.int64),
+        np.array([CONFIDENCE_MAP[c] for _, c in cases]),
+    )
+    vector = [{"ease": float(e), "interval": int(i), "repetitions": int(r)} for e, i, r in zip(ease, interval, reps)]
+    mismatches = sum(a != b for a, b in zip(scalar, vector))
+    print(f"벡터 vs 스칼라: {n_cases - mismatches}/{n_cases} 일치")
+
+    ts = run_ts_reviews(cases)
+    if ts is None:
+        print(f"TS 비교 생략 (--allow-skip): node와 node_modules/typescript가 없음 — {TS_SCHEDULER}")
+        return mismatches
+    ts_cards = [{"ease": e, "interval": i, "repetitions": r} for e, i, r in ts]
+    ts_mismatches = 0
+    for (card, c), a, b in zip(cases, scalar, ts_cards):
+        if a != b:
+            ts_mismatches += 1
+            if ts_mismatches <= 5:
+                print(f"  불일치: {card} {c}: Python={a} TS={b}")
+    print(f"스칼라 vs TS: {n_cases - ts_mismatches}/{n_cases} 일치")
+    return mismatches + ts_mismatches
+
+
+def parse_param(value: str) -> tuple[str, float]:
+    name, _, num = value.partition("=")
+    if name not in DEFAULT_PARAMS:
+        raise argparse.ArgumentTypeError(f"알 수 없는 파라미터: {name} ({', '.join(DEFAULT_PARAMS)})")
+    return name, float(num)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SM-2 스케줄러 시뮬레이션 (학습자×문제 행렬)")
+    parser.add_argument("--learners", type=int, help="학습자 수 (기본 10000, --progress면 파일 수)")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--new-per-day", type=int, default=20, help="하루 새 문제 수 (앱은 제한 없음)")
+    parser.add_argument("--questions", type=Path, default=QUESTIONS_JSON, help="문제 목록 (문제 id/순서)")
+    parser.add_argument("--cards", type=int, help="questions.json 대신 문제 수만 지정")
+    parser.add_argument("--progress", type=Path, nargs="+", default=[], help="내보낸 진행 기록 JSON")
+    parser.add_argument("--param", type=parse_param, action="append", default=[], help="스케줄러 값 변경 (이름=값)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="일별 통계 JSON")
+    parser.add_argument("--parity", action="store_true", help="TS reviewCard와 결과 비교 후 종료")
+    parser.add_argument("--cases", type=int, default=20000, help="--parity 비교 사례 수")
+    parser.add_argument(
+        "--allow-skip", action="store_true",
+        help="--parity에서 node/typescript가 없으면 TS 비교를 생략 (기본은 실패)",
+    )
+    args = parser.parse_args()
+
+    if args.parity and not args.allow_skip and not ts_available():
+        parser.error("--parity에는 node와 node_modules/typescript가 필요 (npm install, 생략하려면 --allow-skip)")
+    if args.parity:
+        sys.exit(1 if parity_check(args.cases, args.seed) else 0)
+
+    params = {**DEFAULT_PARAMS, **dict(args.param)}
+    rng = np.random.default_rng(args.seed)
+    progress = [json.loads(p.read_text(encoding="utf-8")) for p in args.progress]
+    card_ids = load_card_ids(args.questions, args.cards, progress)
+    n_learners = args.learners or (len(progress) if progress else 10000)
+
+    if progress:
+        state, ability = state_from_progress(progress, n_learners, card_ids, params, date.today())
+        ability += rng.normal(0, ABILITY_SD / 4, n_learners).astype(np.float32)  # 같은 기록을 돌려 쓸 때 분산
+    else:
+        state = new_state(n_learners, len(card_ids), params)
+        ability = rng.normal(0, ABILITY_SD, n_learners).astype(np.float32)
+    difficulty = rng.normal(0, DIFFICULTY_SD, len(card_ids)).astype(np.float32)
+    skill = ability[:, None] - difficulty[None, :]
+
+    t0 = time.perf_counter()
+    stats = simulate(state, skill, args.days, args.new_per_day, params, rng)
+    elapsed = time.perf_counter() - t0
+
+    print(f"학습자 {n_learners} × 문제 {len(card_ids)}, {args.days}일: {elapsed:.2f}초")
+    changed = {k: v for k, v in params.items() if v != DEFAULT_PARAMS[k]}
+    if changed:
+        print(f"변경한 파라미터: {changed}")
+    print(f"{'일':>4} {'복습(평균)':>10} {'p90':>6} {'최대':>6} {'정답률':>7} {'유지율':>7}")
+    step = max(1, args.days // 15)
+    for day in list(range(0, args.days, step)) + ([args.days - 1] if (args.days - 1) % step else []):
+        rate = stats["recallRate"][day]
+        ret = stats["retention"][day]
+        print(
+            f"{day + 1:>4} {stats['due']['mean'][day]:>10.1f} {stats['due']['p90'][day]:>6.0f} "
+            f"{stats['due']['max'][day]:>6} {'-' if rate is None else f'{rate:.3f}':>7} "
+            f"{'-' if ret is None else f'{ret:.3f}':>7}"
+        )
+
+    if args.out:
+        result = {
+            "learners": n_learners,
+            "cards": len(card_ids),
+            "days": args.days,
+            "newPerDay": args.new_per_day,
+            "seed": args.seed,
+            "params": params,
+            "seconds": elapsed,
+            "daily": stats,
+        }
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        print(f"결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")  # Windows cp949 콘솔
+    main()
@@ -1,7 +1,58 @@
-import { useState } from "react";
+import { useState, type ComponentProps } from "react";
+import { useImageSrc } from "@/hooks/useImageSrc";
+import type { QuestionImage } from "@/types";
 
 interface Props {
-  images: string[];
+  images: (string | QuestionImage)[];
+}
+
+// 미리보기 표시 폭 (max-w-full sm:max-w-[500px])
+const PREVIEW_SIZES = "(min-width: 640px) 500px, 100vw";
+const PREVIEW_CLASS =
+  "max-w-full sm:max-w-[500px] rounded border border-gray-200 cursor-pointer hover:opacity-90 transition-opacity";
+
+function dataUrl(src: string): string {
+  return `${import.meta.env.BASE_URL}data/${src}`;
+}
+
+function srcSet(image: QuestionImage, type: string): string {
+  return image.variants
+    .filter((v) => v.type === type)
+    .map((v) => `${dataUrl(v.src)} ${v.width}w`)
+    .join(", ");
+}
+
+// 변형 없는 이미지: 이미지 묶음 빌드면 묶음에서 꺼내 표시 (아니면 개별 파일)
+function BundledImage({ src, ...props }: { src: string } & Omit<ComponentProps<"img">, "src">) {
+  const resolved = useImageSrc(src);
+  return resolved ? <img src={resolved} {...props} /> : null;
+}
+
+function PreviewImage({ image, onClick }: { image: QuestionImage; onClick: () => void }) {
+  // 작은 폭/현대 포맷 변형 중 브라우저가 고르고, 로딩 전에는 크기만큼 placeholder 표시
+  const jpegSet = [srcSet(image, "image/jpeg"), `${dataUrl(image.src)} ${image.width}w`]
+    .filter(Boolean)
+    .join(", ");
+  return (
+    <picture>
+      {["image/avif", "image/webp"].map((type) => {
+        const set = srcSet(image, type);
+        return set ? <source key={type} type={type} srcSet={set} sizes={PREVIEW_SIZES} /> : null;
+      })}
+      <img
+        src={dataUrl(image.src)}
+        srcSet={jpegSet}
+        sizes={PREVIEW_SIZES}
+        width={image.width}
+        height={image.height}
+        alt="문제 이미지"
+        loading="lazy"
+        className={`${PREVIEW_CLASS} h-auto bg-cover`}
+        style={{ backgroundColor: image.color, backgroundImage: `url(${image.placeholder})` }}
+        onClick={onClick}
+      />
+    </picture>
+  );
 }
 
 export default function ImageViewer({ images }: Props) {
@@ -12,16 +63,20 @@ export default function ImageViewer({ images }: Props) {
   return (
     <>
       <div className="flex flex-wrap gap-2 my-3">
-        {images.map((src) => (
-          <img
-            key={src}
-            src={`${import.meta.env.BASE_URL}data/${src}`}
-            alt="문제 이미지"
-            loading="lazy"
-            className="max-w-full sm:max-w-[500px] rounded border border-gray-200 cursor-pointer hover:opacity-90 transition-opacity"
-            onClick={() => setExpanded(src)}
-          />
-        ))}
+        {images.map((image) =>
+          typeof image === "string" ? (
+            <BundledImage
+              key={image}
+              src={image}
+              alt="문제 이미지"
+              loading="lazy"
+              className={PREVIEW_CLASS}
+              onClick={() => setExpanded(image)}
+            />
+          ) : (
+            <PreviewImage key={image.src} image={image} onClick={() => setExpanded(image.src)} />
+          )
+        )}
       </div>
       {expanded && (
         <div
@@ -35,8 +90,8 @@ export default function ImageViewer({ images }: Props) {
           >
             &times;
           </button>
-          <img
-            src={`${import.meta.env.BASE_URL}data/${expanded}`}
+          <BundledImage
+            src={expanded}
             alt="확대 이미지"
             className="max-w-[95vw] max-h-[90vh] object-contain"
             onClick={(e) => e.stopPropagation()}
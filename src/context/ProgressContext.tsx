@@ -11,7 +11,7 @@ import { loadProgress, saveProgress, saveProgressImmediate } from "@/lib/storage
 import { todayStr } from "@/lib/utils";
 
 type Action =
-  | { type: "RECORD_ANSWER"; questionId: number; correct: boolean }
+  | { type: "RECORD_ANSWER"; questionId: number; correct: boolean; selected?: number }
   | { type: "UPDATE_SR"; questionId: number; card: Progress["srData"][string] }
   | { type: "SET_SEQUENTIAL"; day: string; index: number }
   | { type: "IMPORT"; data: Progress };
@@ -23,6 +23,7 @@ function reducer(state: Progress, action: Action): Progress {
         questionId: action.questionId,
         correct: action.correct,
         timestamp: Date.now(),
+        ...(action.selected !== undefined && { selected: action.selected }),
       };
       const today = todayStr();
       const stats = { ...state.stats };
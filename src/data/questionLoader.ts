@@ -1,12 +1,238 @@
-import type { QuestionsData } from "@/types";
+import type {
+  AssetManifest,
+  ImageBundleIndex,
+  PatchIndex,
+  Question,
+  QuestionPatch,
+  QuestionShard,
+  QuestionsData,
+  QuestionsManifest,
+  SearchIndex,
+} from "@/types";
+
+// extract_questions.py --dict-encode: 반복 문자열이 strings 표의 인덱스로 저장됨
+interface EncodedQuestion extends Omit<Question, "day" | "subject" | "choices"> {
+  day: string | number;
+  subject: string | number;
+  choices: (string | number)[];
+}
+
+interface EncodedQuestions {
+  version?: string; // --delta 빌드
+  strings?: string[];
+  questions: EncodedQuestion[];
+}
+
+// --delta 빌드의 문제 은행 사본 (다음 방문 때 패치만 받아 갱신)
+const BANK_KEY = "pseudoanki_questions";
+
+interface StoredBank extends QuestionsData {
+  version: string;
+}
 
 let cached: QuestionsData | null = null;
+let assets: Promise<AssetManifest | null> | null = null;
+let manifest: Promise<QuestionsManifest | null> | null = null;
+let bundleIndex: Promise<ImageBundleIndex | null> | null = null;
+const shardCache = new Map<string, Promise<Question[]>>();
+const searchCache = new Map<string, Promise<SearchIndex | null>>();
+
+// 해시 파일명 빌드(extract_questions.py --hashed-assets)가 아니면 null.
+// assets.json만 매번 재검증하고, 해시 이름 파일은 내용이 바뀌면 URL도 바뀌므로 캐시를 그대로 씀
+function loadAssetManifest(): Promise<AssetManifest | null> {
+  if (!assets) {
+    const base = import.meta.env.BASE_URL;
+    assets = fetch(`${base}data/assets.json`, { cache: "no-cache" })
+      .then((res) => (res.ok ? (res.json() as Promise<AssetManifest>) : null))
+      .catch(() => null);
+  }
+  return assets;
+}
+
+// data/ 기준 고정 이름의 실제 URL (해시 이름이 있으면 그쪽)
+async function dataFileUrl(name: string): Promise<string> {
+  const m = await loadAssetManifest();
+  return `${import.meta.env.BASE_URL}data/${m?.entries[name] ?? name}`;
+}
+
+function decodeQuestions({ strings, questions }: EncodedQuestions): Question[] {
+  if (!strings) return questions as Question[];
+  const str = (v: string | number) => (typeof v === "number" ? strings[v] : v);
+  return questions.map((q) => ({
+    ...q,
+    day: str(q.day),
+    subject: str(q.subject),
+    choices: q.choices.map(str),
+  }));
+}
+
+function readStoredBank(): StoredBank | null {
+  try {
+    const raw = localStorage.getItem(BANK_KEY);
+    return raw ? (JSON.parse(raw) as StoredBank) : null;
+  } catch {
+    return null;
+  }
+}
+
+function storeBank(bank: StoredBank): void {
+  try {
+    localStorage.setItem(BANK_KEY, JSON.stringify(bank));
+  } catch {
+    // 용량 초과 등: 다음 방문 때 전체를 다시 받음
+  }
+}
+
+// scripts/extract_questions.py의 apply_patch와 같은 규칙
+function applyPatch(questions: Question[], patch: QuestionPatch): Question[] {
+  const removed = new Set(patch.removed);
+  const changes = new Map(patch.changed.map((c) => [c.id, c]));
+  let result = questions
+    .filter((q) => !removed.has(q.id))
+    .map((q) => {
+      const change = changes.get(q.id);
+      if (!change) return q;
+      const next: Record<string, unknown> = { ...q };
+      for (const key of change.unset ?? []) delete next[key];
+      return { ...next, ...change.set } as Question;
+    })
+    .concat(patch.added);
+  if (patch.order) {
+    const byId = new Map(result.map((q) => [q.id, q]));
+    result = patch.order.map((id) => byId.get(id)!);
+  }
+  return result;
+}
+
+// questions.json의 version (맨 앞 키)만 앞부분 Range 요청으로 확인.
+// --delta 없는 빌드(version 없음)거나 서버가 Range를 지원하지 않으면 null
+async function fetchBankVersion(): Promise<string | null> {
+  const res = await fetch(await dataFileUrl("questions.json"), {
+    cache: "no-cache",
+    headers: { Range: "bytes=0-127" },
+  });
+  if (res.status !== 206) {
+    await res.body?.cancel();
+    return null;
+  }
+  const match = /^\s*\{\s*"version"\s*:\s*"([^"]+)"/.exec(await res.text());
+  return match ? match[1] : null;
+}
+
+// 저장된 사본에서 최신 빌드까지의 패치 사슬을 받아 적용.
+// 사본이 없거나 사슬에 사본 버전이 없으면(너무 오래됨) null → 전체를 받음.
+// 패치 색인은 지금 배포된 questions.json과 버전이 같을 때만 믿음 (이전 --delta 빌드가 남긴 색인 대비)
+async function loadPatchedBank(): Promise<QuestionsData | null> {
+  const stored = readStoredBank();
+  if (!stored) return null;
+  const base = import.meta.env.BASE_URL;
+  try {
+    const [res, version] = await Promise.all([
+      fetch(`${base}data/patches/index.json`, { cache: "no-cache" }),
+      fetchBankVersion(),
+    ]);
+    if (!res.ok) return null;
+    const index = (await res.json()) as PatchIndex;
+    if (!version || index.current !== version) return null;
+    if (index.current === stored.version) return stored;
+    const start = index.patches.findIndex((p) => p.from === stored.version);
+    if (start < 0) return null;
+    const patches = await Promise.all(
+      index.patches.slice(start).map(async (entry) => {
+        const r = await fetch(`${base}data/${entry.url}`);
+        if (!r.ok) throw new Error(`Failed to load ${entry.url}`);
+        return (await r.json()) as QuestionPatch;
+      })
+    );
+    let bank = stored;
+    for (const patch of patches) {
+      bank = { version: patch.to, meta: patch.meta ?? bank.meta, questions: applyPatch(bank.questions, patch) };
+    }
+    if (bank.version !== version) return null;
+    storeBank(bank);
+    return bank;
+  } catch {
+    return null;
+  }
+}
 
 export async function loadQuestions(): Promise<QuestionsData> {
   if (cached) return cached;
-  const base = import.meta.env.BASE_URL;
-  const res = await fetch(`${base}data/questions.json`);
+  const patched = await loadPatchedBank();
+  if (patched) {
+    cached = { meta: patched.meta, questions: patched.questions };
+    return cached;
+  }
+  const res = await fetch(await dataFileUrl("questions.json"));
   if (!res.ok) throw new Error("Failed to load questions.json");
-  cached = (await res.json()) as QuestionsData;
+  const raw = (await res.json()) as EncodedQuestions & Pick<QuestionsData, "meta">;
+  cached = { meta: raw.meta, questions: decodeQuestions(raw) };
+  if (raw.version) storeBank({ version: raw.version, ...cached });
   return cached;
 }
+
+// 샤드 빌드(extract_questions.py --shards)가 아니면 null
+export function loadManifest(): Promise<QuestionsManifest | null> {
+  if (!manifest) {
+    manifest = dataFileUrl("manifest.json")
+      .then((url) => fetch(url))
+      .then((res) => (res.ok ? (res.json() as Promise<QuestionsManifest>) : null))
+      .catch(() => null);
+  }
+  return manifest;
+}
+
+function loadShard(shard: QuestionShard): Promise<Question[]> {
+  let pending = shardCache.get(shard.url);
+  if (!pending) {
+    const base = import.meta.env.BASE_URL;
+    pending = fetch(`${base}data/${shard.url}`).then(async (res) => {
+      if (!res.ok) throw new Error(`Failed to load ${shard.url}`);
+      const raw = (await res.json()) as EncodedQuestions | Question[];
+      return Array.isArray(raw) ? raw : decodeQuestions(raw);
+    });
+    shardCache.set(shard.url, pending);
+  }
+  return pending;
+}
+
+// 선택한 일차/과목의 샤드만 받아옴. 매니페스트가 없으면 전체를 받아 필터링
+export async function loadQuestionsFor(day = "all", subject = "all"): Promise<QuestionsData> {
+  const m = cached ? null : await loadManifest();
+  if (!m) {
+    const data = await loadQuestions();
+    const questions = data.questions.filter(
+      (q) => (day === "all" || q.day === day) && (subject === "all" || q.subject === subject)
+    );
+    return { meta: data.meta, questions };
+  }
+  const shards = m.shards.filter(
+    (s) => (day === "all" || s.day === day) && (subject === "all" || s.subject === subject)
+  );
+  const parts = await Promise.all(shards.map(loadShard));
+  return { meta: m.meta, questions: parts.flat() };
+}
+
+// 검색 색인 빌드(extract_questions.py --search-index)가 아니면 null
+export function loadSearchIndex(url = "search.json"): Promise<SearchIndex | null> {
+  let pending = searchCache.get(url);
+  if (!pending) {
+    pending = dataFileUrl(url)
+      .then((href) => fetch(href))
+      .then((res) => (res.ok ? (res.json() as Promise<SearchIndex>) : null))
+      .catch(() => null);
+    searchCache.set(url, pending);
+  }
+  return pending;
+}
+
+// 이미지 묶음 빌드(extract_questions.py --image-bundles)가 아니면 null
+export function loadImageBundleIndex(): Promise<ImageBundleIndex | null> {
+  if (!bundleIndex) {
+    bundleIndex = dataFileUrl("bundles.json")
+      .then((url) => fetch(url))
+      .then((res) => (res.ok ? (res.json() as Promise<ImageBundleIndex>) : null))
+      .catch(() => null);
+  }
+  return bundleIndex;
+}
@@ -0,0 +1,19 @@
+import { useEffect, useState } from "react";
+import { resolveImage } from "@/lib/imageBundles";
+
+// 묶음에서 이미지를 꺼내는 동안은 undefined (빈 src로 깨진 이미지가 보이지 않게)
+export function useImageSrc(src: string): string | undefined {
+  const [resolved, setResolved] = useState<{ src: string; url: string } | null>(null);
+
+  useEffect(() => {
+    let active = true;
+    resolveImage(src).then((url) => {
+      if (active) setResolved({ src, url });
+    });
+    return () => {
+      active = false;
+    };
+  }, [src]);
+
+  return resolved?.src === src ? resolved.url : undefined;
+}
@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import type { QuestionsData, Question } from "@/types";
-import { loadQuestions } from "@/data/questionLoader";
+import { loadQuestions, loadQuestionsFor } from "@/data/questionLoader";
 
 export function useQuestions() {
   const [data, setData] = useState<QuestionsData | null>(null);
@@ -16,6 +16,27 @@ export function useQuestions() {
   return { data, loading };
 }
 
+// 샤드 빌드면 선택한 일차/과목의 샤드만 받음 (아니면 전체를 받아 필터링)
+export function useQuestionsFor(day: string, subject: string) {
+  const [data, setData] = useState<QuestionsData | null>(null);
+  const [loading, setLoading] = useState(true);
+
+  useEffect(() => {
+    let active = true;
+    setLoading(true);
+    loadQuestionsFor(day, subject).then((d) => {
+      if (!active) return;
+      setData(d);
+      setLoading(false);
+    });
+    return () => {
+      active = false;
+    };
+  }, [day, subject]);
+
+  return { data, loading };
+}
+
 export function filterBySubject(questions: Question[], subject: string): Question[] {
   return questions.filter((q) => q.subject === subject);
 }
@@ -0,0 +1,69 @@
+import { loadImageBundleIndex } from "@/data/questionLoader";
+import type { ImageBundle } from "@/types";
+
+// 이 크기 이하의 과목 묶음은 통째로 한 번 받고, 더 크면 이미지마다 Range 요청
+const WHOLE_BUNDLE_BYTES = 4 * 1024 * 1024;
+
+const bundleCache = new Map<string, Promise<Blob>>();
+const urlCache = new Map<string, Promise<string>>();
+
+function dataUrl(src: string): string {
+  return `${import.meta.env.BASE_URL}data/${src}`;
+}
+
+function fetchBundle(bundle: ImageBundle): Promise<Blob> {
+  let pending = bundleCache.get(bundle.url);
+  if (!pending) {
+    pending = fetch(dataUrl(bundle.url)).then((res) => {
+      if (!res.ok) throw new Error(`Failed to load ${bundle.url}`);
+      return res.blob();
+    });
+    // 실패하면 다음 요청에서 다시 시도
+    pending.catch(() => bundleCache.delete(bundle.url));
+    bundleCache.set(bundle.url, pending);
+  }
+  return pending;
+}
+
+async function fetchRange(bundle: ImageBundle, offset: number, length: number): Promise<Blob> {
+  const res = await fetch(dataUrl(bundle.url), {
+    headers: { Range: `bytes=${offset}-${offset + length - 1}` },
+  });
+  if (res.status === 206) return res.blob();
+  if (!res.ok) throw new Error(`Failed to load ${bundle.url}`);
+  // Range를 무시하는 서버(200)는 묶음 전체를 보냄 → 다음부터는 캐시된 묶음에서 잘라 씀
+  const whole = res.blob();
+  bundleCache.set(bundle.url, whole);
+  return (await whole).slice(offset, offset + length);
+}
+
+async function bundleImageUrl(src: string): Promise<string> {
+  const index = await loadImageBundleIndex();
+  const entry = index?.images[src];
+  if (!index || !entry) return dataUrl(src);
+  const [i, offset, length] = entry;
+  const bundle = index.bundles[i];
+  const blob =
+    bundle.bytes <= WHOLE_BUNDLE_BYTES || bundleCache.has(bundle.url)
+      ? (await fetchBundle(bundle)).slice(offset, offset + length)
+      : await fetchRange(bundle, offset, length);
+  return URL.createObjectURL(new Blob([blob], { type: "image/jpeg" }));
+}
+
+// "images/..." 이미지의 표시용 URL. 묶음 빌드면 묶음에서 꺼낸 object URL,
+// 아니거나 묶음을 못 받으면 개별 파일 URL
+export function resolveImage(src: string): Promise<string> {
+  let pending = urlCache.get(src);
+  if (!pending) {
+    pending = bundleImageUrl(src).catch(() => dataUrl(src));
+    urlCache.set(src, pending);
+  }
+  return pending;
+}
+
+// 과목 퀴즈 시작 시 해당 과목 묶음을 미리 받아 둠 (묶음 빌드가 아니면 아무것도 안 함)
+export async function prefetchSubjectImages(subject: string): Promise<void> {
+  const index = await loadImageBundleIndex();
+  const bundle = index?.bundles.find((b) => b.subject === subject);
+  if (bundle && bundle.bytes <= WHOLE_BUNDLE_BYTES) await fetchBundle(bundle).catch(() => undefined);
+}
@@ -0,0 +1,70 @@
+import type { SearchIndex } from "@/types";
+
+// scripts/search_index.py와 같은 토큰화/점수 규칙 (색인은 빌드 시 생성)
+const HANGUL_RUN = /[가-힣]+/g;
+const LATIN_TOKEN = /[a-z0-9]+/g;
+const MIN_LATIN = 2;
+
+export interface SearchHit {
+  id: number;
+  score: number;
+}
+
+export function tokenize(text: string): string[] {
+  const norm = text.normalize("NFKC").toLowerCase();
+  const terms: string[] = [];
+  for (const run of norm.match(HANGUL_RUN) ?? []) {
+    if (run.length === 1) terms.push(run);
+    else for (let i = 0; i < run.length - 1; i++) terms.push(run.slice(i, i + 2));
+  }
+  for (const token of norm.match(LATIN_TOKEN) ?? []) {
+    if (token.length >= MIN_LATIN) terms.push(token);
+  }
+  return terms;
+}
+
+function lowerBound(terms: string[], term: string): number {
+  let lo = 0;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < term) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// 라틴 단어와 한 글자 한글은 접두사로 확장 ("amox" → amoxicillin)
+function expandTerm(terms: string[], term: string): [number, number] {
+  const lo = lowerBound(terms, term);
+  if (term.length > 1 && /^[가-힣]+$/.test(term)) {
+    return [lo, terms[lo] === term ? lo + 1 : lo];
+  }
+  let hi = lo;
+  while (hi < terms.length && terms[hi].startsWith(term)) hi++;
+  return [lo, hi];
+}
+
+// 질의 용어마다 idf를 더한 점수 내림차순 (같으면 문제 순서)
+export function searchQuestions(index: SearchIndex, query: string, limit = 20): SearchHit[] {
+  const nDocs = index.docs.length;
+  const scores = new Map<number, number>();
+  for (const term of new Set(tokenize(query))) {
+    const matched = new Set<number>();
+    const [lo, hi] = expandTerm(index.terms, term);
+    for (let t = lo; t < hi; t++) {
+      let doc = 0;
+      for (const delta of index.postings[t]) {
+        doc += delta;
+        matched.add(doc);
+      }
+    }
+    if (matched.size === 0) continue;
+    const idf = Math.log(1 + nDocs / matched.size);
+    for (const doc of matched) scores.set(doc, (scores.get(doc) ?? 0) + idf);
+  }
+  return [...scores.entries()]
+    .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+    .slice(0, limit)
+    .map(([doc, score]) => ({ id: index.docs[doc], score }));
+}
@@ -7,6 +7,17 @@ export function shuffle<T>(arr: T[]): T[] {
   return a;
 }
 
+/** 같은 duplicateGroup(유사 문제 군집)은 처음 나온 문제 하나만 남긴다. */
+export function uniqueByDuplicateGroup<T extends { duplicateGroup?: number }>(arr: T[]): T[] {
+  const seen = new Set<number>();
+  return arr.filter((q) => {
+    if (q.duplicateGroup === undefined) return true;
+    if (seen.has(q.duplicateGroup)) return false;
+    seen.add(q.duplicateGroup);
+    return true;
+  });
+}
+
 export function todayStr(): string {
   return new Date().toISOString().slice(0, 10);
 }
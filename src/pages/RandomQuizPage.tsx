@@ -2,7 +2,7 @@ import { useState, useCallback, useMemo } from "react";
 import { useQuestions } from "@/hooks/useQuestions";
 import { useQuiz } from "@/hooks/useQuiz";
 import { useProgress } from "@/context/ProgressContext";
-import { shuffle } from "@/lib/utils";
+import { shuffle, uniqueByDuplicateGroup } from "@/lib/utils";
 import QuestionCard from "@/components/QuestionCard";
 import ProgressBar from "@/components/ProgressBar";
 import SubjectFilter from "@/components/SubjectFilter";
@@ -28,7 +28,7 @@ export default function RandomQuizPage() {
     let qs = data.questions;
     if (day !== "all") qs = qs.filter((q) => q.day === day);
     if (subject !== "all") qs = qs.filter((q) => q.subject === subject);
-    return qs;
+    return uniqueByDuplicateGroup(qs); // 유사 문제는 한 번만 출제
   }, [data, day, subject]);
 
   const [quizQuestions, setQuizQuestions] = useState<Question[]>([]);
@@ -49,6 +49,7 @@ export default function RandomQuizPage() {
         type: "RECORD_ANSWER",
         questionId: quiz.current.id,
         correct: quiz.selectedAnswer === quiz.current.answer,
+        selected: quiz.selectedAnswer,
       });
     }
   }, [quiz, dispatch]);
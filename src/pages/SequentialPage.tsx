@@ -1,14 +1,14 @@
 import { useState, useMemo, useCallback } from "react";
-import { useQuestions } from "@/hooks/useQuestions";
+import { useQuestionsFor } from "@/hooks/useQuestions";
 import { useProgress } from "@/context/ProgressContext";
 import QuestionCard from "@/components/QuestionCard";
 import ProgressBar from "@/components/ProgressBar";
 import LoadingSpinner from "@/components/LoadingSpinner";
 
 export default function SequentialPage() {
-  const { data, loading } = useQuestions();
   const { progress, dispatch } = useProgress();
   const [day, setDay] = useState<"day1" | "day2">("day1");
+  const { data, loading } = useQuestionsFor(day, "all");
   const [selectedAnswer, setSelectedAnswer] = useState<number | null>(null);
   const [revealed, setRevealed] = useState(false);
   const [jumpInput, setJumpInput] = useState("");
@@ -38,6 +38,7 @@ export default function SequentialPage() {
       type: "RECORD_ANSWER",
       questionId: current.id,
       correct: selectedAnswer === current.answer,
+      selected: selectedAnswer,
     });
   }, [selectedAnswer, current, dispatch]);
 
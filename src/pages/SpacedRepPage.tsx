@@ -68,6 +68,7 @@ export default function SpacedRepPage() {
         type: "RECORD_ANSWER",
         questionId: current.id,
         correct: selectedAnswer === current.answer,
+        selected: selectedAnswer ?? undefined,
       });
 
       setSelectedAnswer(null);
@@ -1,18 +1,23 @@
-import { useState, useMemo } from "react";
-import { useQuestions } from "@/hooks/useQuestions";
+import { useState, useMemo, useEffect } from "react";
+import { useQuestionsFor } from "@/hooks/useQuestions";
 import { formatLabText } from "@/lib/utils";
+import { prefetchSubjectImages } from "@/lib/imageBundles";
+import { searchQuestions } from "@/lib/search";
+import { loadSearchIndex } from "@/data/questionLoader";
 import SubjectFilter from "@/components/SubjectFilter";
 import FormattedQuestionText from "@/components/FormattedQuestionText";
 import ImageViewer from "@/components/ImageViewer";
 import LoadingSpinner from "@/components/LoadingSpinner";
-import type { Question } from "@/types";
+import type { Question, SearchIndex } from "@/types";
 
 export default function StudyPage() {
-  const { data, loading } = useQuestions();
   const [day, setDay] = useState("all");
   const [subject, setSubject] = useState("all");
+  const { data, loading } = useQuestionsFor(day, subject);
   const [currentIndex, setCurrentIndex] = useState(0);
   const [jumpInput, setJumpInput] = useState("");
+  const [searchIndex, setSearchIndex] = useState<SearchIndex | null>(null);
+  const [query, setQuery] = useState("");
 
   const filtered = useMemo(() => {
     if (!data) return [] as Question[];
@@ -22,6 +27,26 @@ export default function StudyPage() {
     return qs;
   }, [data, day, subject]);
 
+  // 과목을 고르면 그 과목 이미지 묶음을 한 번에 받아 둠
+  useEffect(() => {
+    if (subject !== "all") prefetchSubjectImages(subject);
+  }, [subject]);
+
+  // 검색 색인 빌드(--search-index)일 때만 검색창 표시
+  useEffect(() => {
+    loadSearchIndex().then(setSearchIndex);
+  }, []);
+
+  // 현재 일차/과목 필터 안의 문제만, 점수 순으로
+  const hits = useMemo(() => {
+    if (!searchIndex || !query.trim()) return [];
+    const position = new Map(filtered.map((q, i) => [q.id, i]));
+    return searchQuestions(searchIndex, query, 200)
+      .filter((hit) => position.has(hit.id))
+      .slice(0, 10)
+      .map((hit) => position.get(hit.id)!);
+  }, [searchIndex, query, filtered]);
+
   const current = filtered[currentIndex] ?? null;
 
   function goTo(idx: number) {
@@ -92,6 +117,37 @@ export default function StudyPage() {
             </button>
           </div>
 
+          {searchIndex && (
+            <div className="mb-3">
+              <input
+                type="search"
+                placeholder="검색 (문제/선지/해설)"
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg text-sm min-h-[40px]"
+              />
+              {query.trim() && (
+                <ul className="mt-1 border border-gray-200 rounded-lg divide-y divide-gray-100 bg-white">
+                  {hits.length === 0 ? (
+                    <li className="px-3 py-2 text-sm text-gray-500">검색 결과가 없습니다.</li>
+                  ) : (
+                    hits.map((idx) => (
+                      <li key={filtered[idx].id}>
+                        <button
+                          onClick={() => { goTo(idx); setQuery(""); }}
+                          className="w-full text-left px-3 py-2 text-sm text-gray-700 truncate"
+                        >
+                          <span className="text-gray-400 mr-2">#{filtered[idx].id}</span>
+                          {filtered[idx].questionText}
+                        </button>
+                      </li>
+                    ))
+                  )}
+                </ul>
+              )}
+            </div>
+          )}
+
           <div className="flex items-center justify-end text-xs text-gray-400 mb-2">
             <span>
               #{current.id} · {current.day === "day1" ? "1일차" : "2일차"} Q
@@ -37,6 +37,7 @@ export default function WrongAnswerPage() {
         type: "RECORD_ANSWER",
         questionId: quiz.current.id,
         correct: quiz.selectedAnswer === quiz.current.answer,
+        selected: quiz.selectedAnswer,
       });
     }
   }, [quiz, dispatch]);
@@ -1,14 +1,43 @@
+export interface ImageVariant {
+  src: string;
+  width: number;
+  height: number;
+  type: string; // MIME
+  bytes: number;
+}
+
+// extract_questions.py --variants 빌드의 images[] 항목 (기본 빌드는 경로 문자열)
+export interface QuestionImage {
+  src: string;
+  width: number;
+  height: number;
+  bytes: number;
+  color: string;
+  placeholder: string; // 저해상도 data URI
+  variants: ImageVariant[];
+}
+
+// extract_questions.py --progress-stats: 내보낸 학습 기록 집계 (scripts/progress_stats.py)
+export interface QuestionStats {
+  attempts: number;
+  accuracy: number;
+  difficulty: number; // 1 - 보정 정답률 (시도가 적으면 전체 정답률 쪽으로)
+  picks?: number[]; // 선지별 선택 수
+}
+
 export interface Question {
   id: number;
   day: string;
   originalNumber: number;
   subject: string;
   questionText: string;
-  images: string[];
+  images: (string | QuestionImage)[];
   choices: string[];
   answer: number; // 1-indexed
   explanation: string;
   isOX: boolean;
+  duplicateGroup?: number; // --near-duplicates 빌드: 유사 문제 군집 id (군집 안 가장 작은 문제 id)
+  stats?: QuestionStats; // --progress-stats 빌드
 }
 
 export interface DayMeta {
@@ -33,6 +62,71 @@ export interface QuestionsData {
   questions: Question[];
 }
 
+export interface QuestionShard {
+  url: string; // data/ 기준 상대 경로
+  day: string;
+  subject: string;
+  count: number;
+  bytes: number;
+  sha256: string;
+  search?: string; // --search-index 빌드의 샤드 검색 색인
+}
+
+// extract_questions.py --search-index: postings는 docs 인덱스의 차이값 목록 (terms와 같은 순서)
+export interface SearchIndex {
+  version: number;
+  docs: number[];
+  terms: string[];
+  postings: number[][];
+}
+
+// extract_questions.py --image-bundles: images는 "images/..." → [bundles 인덱스, 오프셋, 길이]
+export interface ImageBundle {
+  subject: string;
+  url: string; // data/ 기준 상대 경로
+  count: number;
+  bytes: number;
+  sha256: string;
+}
+
+export interface ImageBundleIndex {
+  version: number;
+  bundles: ImageBundle[];
+  images: Record<string, [number, number, number]>;
+}
+
+// extract_questions.py --hashed-assets: entries는 고정 이름 → 내용 해시 이름 (data/ 기준)
+export interface AssetManifest {
+  version: number;
+  entries: Record<string, string>;
+  assets: { url: string; bytes: number; sha256: string }[];
+}
+
+// extract_questions.py --delta: 이전 빌드 → 이번 빌드 변경분 (changed는 바뀐 필드만)
+export interface QuestionPatch {
+  version: number;
+  from: string;
+  to: string;
+  added: Question[];
+  removed: number[];
+  changed: { id: number; set: Partial<Question>; unset?: string[] }[];
+  order?: number[]; // (남은 문제 + added) 순서가 새 순서와 다를 때만
+  meta?: QuestionsData["meta"];
+}
+
+// current는 최신 빌드, patches는 최근 패치 사슬 (오래된 것부터)
+export interface PatchIndex {
+  version: number;
+  current: string;
+  patches: { from: string; to: string; url: string; bytes: number }[];
+}
+
+export interface QuestionsManifest {
+  version: number;
+  meta: QuestionsData["meta"];
+  shards: QuestionShard[];
+}
+
 export interface SRCard {
   ease: number;
   interval: number;
@@ -44,6 +138,7 @@ export interface HistoryEntry {
   questionId: number;
   correct: boolean;
   timestamp: number;
+  selected?: number; // 고른 선지 번호 (scripts/progress_stats.py의 선지 혼동 집계)
 }
 
 export interface Progress {